@@ -1,107 +1,58 @@
-import os
-import tempfile
-import traceback
-from PyQt5.QtWidgets import QMessageBox, QProgressDialog, QApplication
-from dropbox_client import list_folder, download_file, upload_json, download_json
-from gpt_client import analyze_pdfs
+from pipeline import NoPdfError, run_analysis
 
 class Analyzer:
-    """PDF 분석 관리 클래스"""
-    
+    """PDF 분석 관리 클래스 (파이프라인은 pipeline.run_analysis, 여기서는 Qt 진행 대화상자 연결)"""
+
+    # 폴더 분석 파이프라인 (GUI 없이 실행 가능)
+    run = staticmethod(run_analysis)
+
     @staticmethod
-    def analyze_folder(folder, parent=None):
+    def analyze_folder(folder, parent=None, on_finished=None, on_done=None):
         """
-        지정된 폴더의 PDF 파일을 분석
-        
+        지정된 폴더의 PDF 파일 분석을 백그라운드에서 시작
+
+        진행 대화상자는 모달이 아니므로 분석 중에도 다른 입찰을 열거나
+        분석을 추가로 시작할 수 있습니다.
+
         Args:
             folder: 분석할 폴더명
             parent: 부모 위젯 (QMessageBox 표시용)
-            
+            on_finished: 분석 성공 시 호출할 함수 (folder 인자)
+            on_done: 성공/실패/취소와 관계없이 작업이 끝나면 호출할 함수
+
         Returns:
-            성공 여부 (boolean)
+            Job (cancel()로 취소 가능)
         """
-        try:
-            files = list_folder(f"입찰 2025/{folder}")
-            pdfs = [f for f in files if f.lower().endswith(".pdf")]
-            if not pdfs:
-                QMessageBox.warning(parent, "PDF 없음", f"{folder} 폴더에 PDF 파일이 없습니다.")
-                return False
-            
-            # 진행 상태 대화상자 생성
-            progress = QProgressDialog("PDF 분석 중...", "취소", 0, 100, parent)
-            progress.setWindowTitle("PDF 분석")
-            progress.setModal(True)
-            progress.show()
-            
-            # 작업 진행률 업데이트 함수
-            def update_progress(value):
-                progress.setValue(value)
-                QApplication.processEvents()
-                # 사용자가 취소 버튼을 눌렀는지 확인
-                return not progress.wasCanceled()
-            
-            temp_dir = tempfile.mkdtemp()
-            paths = []
-            
-            # 다운로드 진행 상태 표시
-            progress.setLabelText("PDF 파일 다운로드 중...")
-            for i, pdf in enumerate(pdfs):
-                progress.setValue(int(i / len(pdfs) * 20))  # 다운로드는 20%까지
-                QApplication.processEvents()
-                if progress.wasCanceled():
-                    return False  # 사용자가 취소함
-                    
-                local = os.path.join(temp_dir, pdf)
-                download_file(f"입찰 2025/{folder}/{pdf}", local)
-                paths.append(local)
-            
-            # 분석 진행 상태 표시
-            progress.setLabelText("PDF 내용 분석 중...")
-            progress.setValue(20)  # 다운로드 완료, 분석 시작
-            QApplication.processEvents()
-                
-            try:
-                analysis = analyze_pdfs(paths)
-            except ValueError as e:
+        # Qt는 대화상자를 띄울 때만 임포트 (헤드리스 실행 시 Qt를 불러오지 않음)
+        from PyQt5.QtWidgets import QMessageBox, QProgressDialog
+        from job_executor import Job, job_executor, attach_progress_dialog
+
+        progress = QProgressDialog("PDF 분석 중...", "취소", 0, 100, parent)
+        progress.setWindowTitle(f"PDF 분석 - {folder}")
+        progress.setModal(False)
+        progress.setAutoClose(False)
+        progress.show()
+
+        job = Job(f"analyze:{folder}", Analyzer.run, folder)
+        attach_progress_dialog(job, progress)
+
+        def on_result(analysis):
+            QMessageBox.information(parent, "분석 완료", f"{folder} 분석이 완료되었습니다.")
+            if on_finished:
+                on_finished(folder)
+
+        def on_error(error, trace):
+            if isinstance(error, NoPdfError):
+                QMessageBox.warning(parent, "PDF 없음", str(error))
+            elif isinstance(error, ValueError):
                 # JSON 파싱 에러 상세 표시
-                error_msg = str(e)
-                QMessageBox.critical(parent, "GPT 응답 파싱 오류", f"API 응답을 파싱할 수 없습니다:\n{error_msg}")
-                return False
-            except Exception as e:
+                QMessageBox.critical(parent, "GPT 응답 파싱 오류", f"API 응답을 파싱할 수 없습니다:\n{error}")
+            else:
                 # 기타 분석 에러 상세 표시
-                error_msg = traceback.format_exc()
-                QMessageBox.critical(parent, "PDF 분석 오류", f"분석 중 에러 발생:\n{str(e)}\n\n{error_msg}")
-                return False
-            
-            # 업로드 진행 상태 표시    
-            progress.setLabelText("분석 결과 업로드 중...")
-            progress.setValue(80)  # 분석 완료, 업로드 시작
-            QApplication.processEvents()
-                
-            # 분석 결과 업로드
-            upload_json(f"입찰 2025/{folder}/analysis.json", analysis)
-            
-            # smpp.json 업데이트
-            progress.setLabelText("메타데이터 업데이트 중...")
-            progress.setValue(90)  # 업로드 완료, 메타데이터 업데이트 시작
-            
-            smpp = download_json("입찰 2025/smpp.json")
-            for item in smpp:
-                if item.get("folder_name") == folder:
-                    info = item.get("announcement_info", {})
-                    ann = analysis.get("announcement_info", {})
-                    info["등록마감"] = ann.get("등록마감", info.get("등록마감"))
-                    info["공고명"] = ann.get("공고명", info.get("공고명"))
-                    info["추정가격"] = ann.get("추정가격", info.get("추정가격"))
-                    info["입찰내용 요약"] = analysis.get("project_summary", info.get("입찰내용 요약"))
-                    item["analysis_status"] = "completed"
-                    break
-            upload_json("입찰 2025/smpp.json", smpp)
-            
-            # 완료
-            progress.setValue(100)
-            QMessageBox.information(parent, "분석 완료", f"{folder} 분석이 완료되었습니다.")
-            return True
-        except Exception as e:
-            QMessageBox.critical(parent, "분석 에러", str(e))
-            return False 
\ No newline at end of file
+                QMessageBox.critical(parent, "PDF 분석 오류", f"분석 중 에러 발생:\n{error}\n\n{trace}")
+
+        job.signals.result.connect(on_result)
+        job.signals.error.connect(on_error)
+        if on_done:
+            job.signals.finished.connect(on_done)
+        return job_executor.start(job)
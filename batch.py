@@ -0,0 +1,162 @@
+# batch.py
+# GUI 없이 smpp.json의 분석 대기(pending) 입찰 폴더를 한꺼번에 분석하는 명령행 진입점
+#
+# 사용 예:
+#   python batch.py                      # 대기 중인 모든 폴더 분석, 요약 JSON을 표준 출력으로
+#   python batch.py --workers 8 --forms  # 8개 폴더씩 동시에, 서식 추출까지
+#   python batch.py --folders A B --output summary.json
+
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from settings import settings
+from task_context import JobCancelled, TaskContext
+
+logger = logging.getLogger("batch")
+
+class BatchContext(TaskContext):
+    """헤드리스 TaskContext - 진행/로그를 logging으로 남기고, 진행 단계 설명이 바뀔 때마다 단계별 소요 시간을 기록합니다."""
+
+    def __init__(self, folder: str, cancel_event: threading.Event):
+        super().__init__(cancel_event=cancel_event)
+        self.folder = folder
+        self._stage = None
+        self._stage_started = time.monotonic()
+        self.stages: Dict[str, float] = {}
+
+    def _enter(self, stage: Optional[str]) -> None:
+        now = time.monotonic()
+        if self._stage:
+            self.stages[self._stage] = round(self.stages.get(self._stage, 0) + now - self._stage_started, 3)
+        self._stage = stage
+        self._stage_started = now
+
+    def emit(self, kind, value):
+        if kind == "progress":
+            _, text = value
+            if text and text != self._stage:
+                self._enter(text)
+                logger.info(f"[{self.folder}] {text}")
+        elif kind == "log":
+            logger.info(f"[{self.folder}] {value}")
+
+    def finish(self) -> None:
+        self._enter(None)
+
+def pending_folders() -> List[str]:
+    """smpp.json(원격 rev가 바뀐 경우에만 다시 받음)에서 analysis_status가 pending인 폴더 목록"""
+    from smpp_index import smpp_index
+    smpp_index.refresh()
+    return [
+        item["folder_name"] for item in smpp_index.entries()
+        if item.get("analysis_status") == "pending" and item.get("folder_name")
+    ]
+
+def process_folder(folder: str, cancel_event: threading.Event, forms: bool = False) -> Dict:
+    """
+    폴더 하나를 분석(다운로드 → 텍스트 추출 → GPT → 업로드)하고 요약을 반환합니다.
+
+    예외는 밖으로 내보내지 않고 요약의 status/error에 기록합니다.
+    """
+    from pipeline import NoPdfError, run_analysis, run_form_extraction
+
+    ctx = BatchContext(folder, cancel_event)
+    summary = {"folder": folder, "status": "completed", "error": None}
+    started = time.monotonic()
+    try:
+        run_analysis(ctx, folder)
+        if forms:
+            ctx.progress(100, "서식 추출")
+            for _, title, message in run_form_extraction(ctx, folder):
+                ctx.log(f"{title}: {message}")
+    except JobCancelled:
+        summary["status"] = "cancelled"
+    except NoPdfError as e:
+        summary.update(status="no_pdf", error=str(e))
+    except Exception as e:
+        logger.exception(f"[{folder}] 분석 실패")
+        summary.update(status="failed", error=f"{type(e).__name__}: {e}")
+    ctx.finish()
+    summary["seconds"] = round(time.monotonic() - started, 3)
+    summary["stages"] = ctx.stages
+    logger.info(f"[{folder}] {summary['status']} ({summary['seconds']}초)")
+    return summary
+
+def run_batch(folders: List[str], workers: int, forms: bool = False) -> Dict:
+    """
+    여러 폴더를 workers개씩 동시에 분석하고 전체 요약을 반환합니다.
+
+    Ctrl+C를 누르면 진행 중인 폴더는 다음 확인 지점에서 취소되고,
+    시작하지 않은 폴더는 cancelled로 기록됩니다.
+    """
+    cancel_event = threading.Event()
+    started = time.monotonic()
+    results: Dict[str, Dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(process_folder, folder, cancel_event, forms): folder for folder in folders}
+        try:
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        except KeyboardInterrupt:
+            logger.warning("중단 요청 - 진행 중인 폴더를 취소합니다.")
+            cancel_event.set()
+            for future, folder in futures.items():
+                if future.cancel():
+                    results[folder] = {"folder": folder, "status": "cancelled", "error": None, "seconds": 0, "stages": {}}
+            for future in futures:
+                if not future.cancelled():
+                    results[futures[future]] = future.result()
+
+    ordered = [results[folder] for folder in folders]
+    counts: Dict[str, int] = {}
+    for result in ordered:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {
+        "workers": workers,
+        "folders": len(folders),
+        "counts": counts,
+        "seconds": round(time.monotonic() - started, 3),
+        "results": ordered,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="분석 대기 중인 입찰 폴더를 GUI 없이 일괄 분석합니다.")
+    parser.add_argument("--workers", type=int, default=settings.BATCH_WORKERS,
+                        help=f"동시에 처리할 폴더 수 (기본 BATCH_WORKERS={settings.BATCH_WORKERS})")
+    parser.add_argument("--folders", nargs="+", help="smpp.json 대신 지정한 폴더만 분석")
+    parser.add_argument("--limit", type=int, help="처리할 최대 폴더 수")
+    parser.add_argument("--forms", action="store_true", help="분석 후 서식 페이지 추출까지 실행")
+    parser.add_argument("--dry-run", action="store_true", help="처리할 폴더 목록만 출력")
+    parser.add_argument("--output", help="요약 JSON을 저장할 파일 (기본: 표준 출력)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s", stream=sys.stderr)
+
+    # 표준 출력은 요약 JSON 전용 - 처리 중 라이브러리 등이 print하는 내용은 stderr로 보냄
+    with redirect_stdout(sys.stderr):
+        folders = args.folders or pending_folders()
+        if args.limit:
+            folders = folders[:args.limit]
+        if args.dry_run:
+            summary = {"folders": len(folders), "pending": folders}
+        else:
+            logger.info(f"일괄 분석 시작: {len(folders)}개 폴더, 동시 {args.workers}개")
+            summary = run_batch(folders, args.workers, forms=args.forms)
+
+    text = json.dumps(summary, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0 if all(r["status"] != "failed" for r in summary.get("results", [])) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+# bid_table.py
+# 입찰 목록 테이블용 모델/뷰 구성요소 (QAbstractTableModel + 버튼 델리게이트)
+
+import re
+from PyQt5.QtWidgets import (
+    QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
+)
+from PyQt5.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QPersistentModelIndex,
+    QSortFilterProxyModel, QEvent, pyqtSignal
+)
+
+# 검색 대상 문자열 (공고명 + 요약 등)
+SEARCH_ROLE = Qt.UserRole
+# 버튼 컬럼의 활성화 여부
+BUTTON_ENABLED_ROLE = Qt.UserRole + 1
+
+# 한 번에 뷰에 노출하는 행 수 (스크롤이 끝에 닿으면 다음 묶음을 가져옴)
+FETCH_BATCH = 200
+
+COL_NO, COL_DEADLINE, COL_TITLE, COL_PRICE, COL_PDF, COL_STATUS, COL_SUMMARY = range(7)
+HEADERS = ["No", "등록마감", "공고명", "추정가격", "PDF", "분석", "요약"]
+BUTTON_COLUMNS = (COL_TITLE, COL_STATUS)
+
+def _status_text(status):
+    if status == "completed":
+        return "분석완료"
+    if status == "pending":
+        return "분석가능"
+    return status or ""
+
+def _number(text):
+    """'1,234,000원' 같은 문자열에서 정렬용 숫자를 뽑습니다."""
+    digits = re.sub(r"[^\d]", "", str(text or ""))
+    return int(digits) if digits else -1
+
+class BidTableModel(QAbstractTableModel):
+    """
+    smpp.json 항목 목록을 그대로 들고 있는 테이블 모델
+
+    셀 위젯을 만들지 않고 data()에서 필요한 값만 계산하므로, 메모리는 항목 수가 아니라
+    화면에 보이는 행 수에 비례합니다. 행은 FETCH_BATCH 단위로 노출합니다.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = []
+        self._fetched = 0
+        # 현재 정렬 상태 (컬럼 -1이면 smpp.json 원본 순서)
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+
+    # --- 데이터 교체 ---
+    def set_entries(self, entries):
+        """
+        항목 목록을 교체합니다.
+
+        현재 정렬 기준을 적용한 뒤, 기존 행의 순서가 그대로면 내용이 바뀐 행만
+        dataChanged로 알리고 새 항목은 끝에 추가합니다. 순서가 달라진 경우
+        (삭제, 정렬 키 변경 등)에만 모델을 리셋합니다.
+        """
+        entries = self._sorted(entries)
+        old = self.entries
+        old_order = [item.get("folder_name") for item in old]
+        new_order = [item.get("folder_name") for item in entries]
+        if not old or new_order[:len(old_order)] != old_order:
+            # 정렬/검색으로 이미 전체를 노출한 상태였다면 리셋 후에도 유지
+            fetched_all = bool(old) and self._fetched == len(old)
+            self.beginResetModel()
+            self.entries = list(entries)
+            self._fetched = len(self.entries) if fetched_all else min(FETCH_BATCH, len(self.entries))
+            self.endResetModel()
+            return
+
+        self.entries = list(entries)
+        last = self.columnCount() - 1
+        for row in range(min(len(old), self._fetched)):
+            if old[row] != self.entries[row]:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, last))
+        # 모든 행이 노출된 상태였다면 새 항목도 바로 노출
+        if self._fetched == len(old) and len(self.entries) > len(old):
+            self.beginInsertRows(QModelIndex(), len(old), len(self.entries) - 1)
+            self._fetched = len(self.entries)
+            self.endInsertRows()
+
+    def entry(self, row):
+        return self.entries[row]
+
+    # --- 정렬 ---
+    def _sort_key(self, item):
+        # smpp.json에 명시적인 null이 있어도 문자열끼리 비교되도록 빈 값으로 바꿈
+        info = item.get("announcement_info") or {}
+        col = self._sort_column
+        if col == COL_NO:
+            return _number(item.get("no"))
+        if col == COL_PRICE:
+            return _number(info.get("추정가격"))
+        if col == COL_DEADLINE:
+            return info.get("등록마감") or ""
+        if col == COL_TITLE:
+            return info.get("공고명") or ""
+        if col == COL_PDF:
+            return bool(item.get("has_pdfs"))
+        if col == COL_STATUS:
+            return _status_text(item.get("analysis_status"))
+        return info.get("입찰내용 요약") or ""
+
+    def _sorted(self, entries):
+        if self._sort_column < 0:
+            return list(entries)
+        return sorted(entries, key=self._sort_key,
+                      reverse=self._sort_order == Qt.DescendingOrder)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        항목 목록 자체를 정렬합니다.
+
+        키는 행마다 한 번만 계산하므로, 비교할 때마다 data()를 부르는
+        프록시 정렬보다 훨씬 빠릅니다.
+        """
+        self._sort_column = column
+        self._sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        self.entries = self._sorted(self.entries)
+        self.layoutChanged.emit()
+
+    # --- 지연 로딩 ---
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetched < len(self.entries)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(FETCH_BATCH, len(self.entries) - self._fetched)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._fetched, self._fetched + count - 1)
+        self._fetched += count
+        self.endInsertRows()
+
+    def fetch_all(self):
+        """정렬/검색은 전체 항목을 대상으로 해야 하므로 남은 행을 모두 노출합니다."""
+        if self._fetched < len(self.entries):
+            self.beginInsertRows(QModelIndex(), self._fetched, len(self.entries) - 1)
+            self._fetched = len(self.entries)
+            self.endInsertRows()
+
+    # --- QAbstractTableModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._fetched
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self.entries[index.row()]
+        info = item.get("announcement_info") or {}
+        col = index.column()
+
+        if role == Qt.DisplayRole:
+            if col == COL_NO:
+                return str(item.get("no", ""))
+            if col == COL_DEADLINE:
+                return info.get("등록마감", "")
+            if col == COL_TITLE:
+                return info.get("공고명", "")
+            if col == COL_PRICE:
+                return info.get("추정가격", "")
+            if col == COL_PDF:
+                return "Yes" if item.get("has_pdfs") else "No"
+            if col == COL_STATUS:
+                return _status_text(item.get("analysis_status", ""))
+            if col == COL_SUMMARY:
+                return info.get("입찰내용 요약", "")
+        elif role == Qt.ToolTipRole:
+            if col in (COL_TITLE, COL_SUMMARY):
+                return info.get("입찰내용 요약", "") or None
+        elif role == SEARCH_ROLE:
+            return " ".join([
+                str(item.get("no", "")),
+                info.get("공고명") or "",
+                info.get("입찰내용 요약") or "",
+                item.get("folder_name") or "",
+            ])
+        elif role == BUTTON_ENABLED_ROLE:
+            if col == COL_TITLE:
+                return item.get("analysis_status") == "completed"
+            return True
+        return None
+
+class BidFilterProxyModel(QSortFilterProxyModel):
+    """
+    정렬/검색용 프록시 모델
+
+    정렬은 원본 모델에 맡기고(프록시는 원본 순서 유지), 검색어 매칭은
+    Qt(C++) 쪽에서 SEARCH_ROLE 값으로 처리합니다. 정렬이나 검색을 시작하면
+    원본 모델의 나머지 행을 모두 가져옵니다.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFilterRole(SEARCH_ROLE)
+        self.setFilterKeyColumn(COL_NO)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().fetch_all()
+        self.sourceModel().sort(column, order)
+
+    def set_search_text(self, text):
+        if text:
+            self.sourceModel().fetch_all()
+        self.setFilterFixedString(text)
+
+class ButtonDelegate(QStyledItemDelegate):
+    """
+    셀을 QPushButton 모양으로 그리고 클릭을 clicked(index) 시그널로 알리는 델리게이트
+
+    실제 위젯을 만들지 않으므로 행 수와 관계없이 비용이 들지 않습니다.
+    """
+    clicked = pyqtSignal(QModelIndex)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pressed = None
+
+    def _button_option(self, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(1, 1, -1, -1)
+        button.text = index.data(Qt.DisplayRole) or ""
+        button.state = QStyle.State_Raised
+        if index.data(BUTTON_ENABLED_ROLE):
+            button.state |= QStyle.State_Enabled
+        if self._pressed is not None and self._pressed == QPersistentModelIndex(index):
+            button.state |= QStyle.State_Sunken
+        return button
+
+    def paint(self, painter, option, index):
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, self._button_option(option, index), painter, widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+            if index.data(BUTTON_ENABLED_ROLE):
+                self._pressed = QPersistentModelIndex(index)
+                return True
+        elif event.type() == QEvent.MouseButtonRelease and self._pressed is not None:
+            pressed, self._pressed = self._pressed, None
+            if pressed == QPersistentModelIndex(index) and option.rect.contains(event.pos()):
+                self.clicked.emit(index)
+            return True
+        return super().editorEvent(event, model, option, index)
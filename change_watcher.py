@@ -0,0 +1,93 @@
+# change_watcher.py
+# Dropbox longpoll 기반 입찰 폴더 변경 감시
+
+import logging
+import threading
+import dropbox
+from PyQt5.QtCore import QObject, pyqtSignal
+from dropbox_client import get_latest_cursor, wait_for_changes, list_changes, relative_path, relative_display_parts
+
+logger = logging.getLogger(__name__)
+
+# longpoll 대기 시간(초) - Dropbox가 최대 90초의 지터를 더합니다
+LONGPOLL_TIMEOUT = 90
+# 오류 발생 시 재시도 전 대기 시간(초)
+RETRY_DELAY = 30
+
+class ChangeWatcher(QObject):
+    """
+    입찰 루트 폴더의 변경을 백그라운드에서 감시하는 워커
+
+    files_list_folder_longpoll로 변경을 기다렸다가 files_list_folder_continue로
+    변경 항목만 받아, 입찰 폴더 단위로 묶어 시그널로 알립니다.
+    """
+    folders_changed = pyqtSignal(list)  # 추가되었거나 내용이 바뀐 입찰 폴더명
+    folders_removed = pyqtSignal(list)  # 삭제된 입찰 폴더명
+    smpp_changed = pyqtSignal()         # smpp.json 새 rev
+    error = pyqtSignal(str)
+
+    def __init__(self, root="입찰 2025"):
+        super().__init__()
+        self.root = root
+        self.thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """감시 스레드 시작"""
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """감시 중지 (진행 중인 longpoll이 끝나면 스레드 종료)"""
+        self._stop.set()
+
+    def _run(self):
+        cursor = None
+        while not self._stop.is_set():
+            try:
+                if cursor is None:
+                    cursor = get_latest_cursor(self.root, recursive=True)
+                changes, backoff = wait_for_changes(cursor, timeout=LONGPOLL_TIMEOUT)
+                if changes and not self._stop.is_set():
+                    entries, cursor = list_changes(cursor)
+                    self._dispatch(entries)
+                if backoff:
+                    self._stop.wait(backoff)
+            except Exception as e:
+                logger.warning(f"변경 감시 오류: {e}")
+                self.error.emit(str(e))
+                # cursor가 만료되었을 수 있으므로 새로 발급
+                cursor = None
+                self._stop.wait(RETRY_DELAY)
+
+    def _dispatch(self, entries):
+        """변경 항목을 입찰 폴더 단위로 분류해 시그널을 보냅니다."""
+        changed, removed = set(), set()
+        smpp_changed = False
+        for entry in entries:
+            rel = relative_path(entry, self.root)
+            if not rel:
+                continue
+            if rel == "smpp.json":
+                smpp_changed = True
+                continue
+            # rel은 소문자이므로 폴더명은 path_display의 root 다음 구성요소에서 가져옴
+            # (하위 항목의 path_display는 상위 폴더의 대소문자가 다를 수 있어 받는 쪽에서 대소문자 무시로 맞춤)
+            parts = relative_display_parts(entry, self.root)
+            if not parts:
+                continue
+            name, rest = parts[0], parts[1:]
+            if isinstance(entry, dropbox.files.DeletedMetadata) and not rest:
+                removed.add(name)
+            elif rest or isinstance(entry, dropbox.files.FolderMetadata):
+                changed.add(name)
+        if smpp_changed:
+            self.smpp_changed.emit()
+        if removed:
+            self.folders_removed.emit(sorted(removed))
+        if changed - removed:
+            self.folders_changed.emit(sorted(changed - removed))
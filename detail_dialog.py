@@ -1,15 +1,14 @@
-import os
 import re
 import json
-import tempfile
-import shutil
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QTreeWidget, QTreeWidgetItem,
     QPushButton, QMessageBox, QApplication, QTextEdit,
     QHBoxLayout
 )
 from PyQt5.QtCore import Qt
-from dropbox_client import list_folder, download_json, download_file, upload_json, upload_file
+from dropbox_client import iter_folder, relative_path, download_json
+from job_executor import Job, job_executor
+from pipeline import run_form_extraction
 from toc_guide_generator import TocGuideGenerator
 from manual_toc_guide import ManualTocGuideDialog
 
@@ -108,8 +107,18 @@ class DetailDialog(QDialog):
     def load_analysis_data(self):
         """분석 데이터 로드 및 트리 위젯에 표시"""
         try:
-            # 현재 폴더의 JSON 파일 목록 가져오기
-            folder_contents = list_folder(f"입찰 2025/{self.folder}")
+            # 입찰 폴더 전체 트리를 한 번의 재귀 목록 스트림으로 가져오기
+            root_path = f"입찰 2025/{self.folder}"
+            folder_contents = []
+            forms_files = []
+            for entry in iter_folder(root_path, recursive=True):
+                rel = relative_path(entry, root_path)
+                if not rel:
+                    continue
+                if "/" not in rel:
+                    folder_contents.append(entry.name)
+                elif rel.startswith("서식/") and rel.count("/") == 1:
+                    forms_files.append(entry.name)
             json_files = [f for f in folder_contents if f.lower().endswith('.json')]
             
             # 트리위젯 생성
@@ -119,15 +128,14 @@ class DetailDialog(QDialog):
             # 서식 파일 리스트 노드 추가
             forms_node = QTreeWidgetItem(["서식파일", ""])
             
-            # 서식 폴더 확인 및 파일 리스트 불러오기
+            # 서식 폴더 확인 및 파일 리스트 표시
             has_forms_folder = False
             try:
                 # 서식 폴더가 있는지 확인
                 has_forms_folder = "서식" in folder_contents
                 
                 if has_forms_folder:
-                    # 서식 폴더 내 파일 목록 가져오기
-                    forms_files = list_folder(f"입찰 2025/{self.folder}/서식")
+                    # 서식 폴더 내 PDF 파일 (재귀 목록에서 이미 수집됨)
                     pdf_files = [f for f in forms_files if f.lower().endswith('.pdf')]
                     
                     if pdf_files:
@@ -202,250 +210,51 @@ class DetailDialog(QDialog):
                 parent_node.setText(0, str(data))
     
     def extract_form_templates(self):
-        """서식 분석 기능 호출 - 모든 PDF를 분석하여 서식 찾기"""
-        try:
-            # 해당 폴더의 PDF 파일 목록 가져오기
-            files = list_folder(f"입찰 2025/{self.folder}")
-            pdfs = [f for f in files if f.lower().endswith(".pdf")]
-            
-            if not pdfs:
-                QMessageBox.warning(self, "PDF 없음", f"{self.folder} 폴더에 PDF 파일이 없습니다.")
-                return
-                
-            # 로그 대화상자 생성
-            log_dialog = QDialog(self)
-            log_dialog.setWindowTitle("서식 분석 로그")
-            log_dialog.resize(700, 400)
-            log_layout = QVBoxLayout(log_dialog)
-            
-            log_text = QTextEdit()
-            log_text.setReadOnly(True)
-            log_layout.addWidget(log_text)
-            
-            # 로그 콜백 함수
-            def log_callback(message):
-                log_text.append(message)
-                log_text.moveCursor(log_text.textCursor().End)
-                QApplication.processEvents()  # UI 업데이트 처리
-            
-            # 최초 로그 메시지
-            log_callback(f"서식 분석 시작: {self.folder} ({len(pdfs)}개 PDF 파일)")
-            log_dialog.show()
-            
-            # pdf_client 모듈 사용
-            from pdf_client import analyze_form_templates
-            
-            # 분석 실행 (임시 폴더에 PDF 다운로드 후 분석)
-            temp_dir = tempfile.mkdtemp()
-            local_paths = []
-
-            # PDF 파일 다운로드
-            for i, pdf in enumerate(pdfs):
-                log_callback(f"PDF 다운로드 중: {pdf}")
-                local_path = os.path.join(temp_dir, pdf)
-                download_file(f"입찰 2025/{self.folder}/{pdf}", local_path)
-                local_paths.append(local_path)
-                QApplication.processEvents()  # UI 업데이트
-            
-            # 서식 분석 실행
-            log_callback("서식 페이지 분석 중...")
-            
-            # 분석 및 결과 저장 (프로그레스바 없이 로그 콜백만 사용)
-            result = analyze_form_templates(
-                local_paths, 
-                progress_callback=None,  # 프로그레스바 콜백 제거
-                log_callback=log_callback,
-                folder_name=self.folder  # 현재 폴더명 전달
-            )
-                
-            if not result or not result.get('forms'):
-                log_callback("서식 페이지를 찾을 수 없습니다.")
-                
-                # 결과 없음으로 JSON 저장
-                # PDF 파일 목록 확인
-                analyzed_files = result.get('analyzed_files', []) if result else []
-                if not analyzed_files:
-                    analyzed_files = [{"filename": pdf} for pdf in pdfs]
-                
-                result_json = {
-                    "doc": self.folder, 
-                    "forms": [], 
-                    "message": "서식 페이지를 찾을 수 없습니다.",
-                    "analyzed_files": analyzed_files
-                }
-                
-                # 결과 저장 - pdf_client에서 이미 저장한 경우 생략
-                json_saved = False
-                for path in local_paths:
-                    forms_dir = os.path.dirname(path)
-                    result_path = os.path.join(forms_dir, "서식분석결과.json")
-                    if os.path.exists(result_path):
-                        json_saved = True
-                        break
-                
-                if not json_saved:
-                    # 공고명 폴더에 저장
-                    try:
-                        with open(os.path.join(temp_dir, "서식분석결과.json"), "w", encoding="utf-8") as f:
-                            json.dump(result_json, f, ensure_ascii=False, indent=2)
-                        log_callback(f"서식분석결과.json 파일 저장: {temp_dir}")
-                        # Dropbox에 업로드
-                        upload_json(f"입찰 2025/{self.folder}/서식분석결과.json", result_json)
-                        log_callback(f"서식분석결과.json 파일 Dropbox 업로드 완료")
-                        QMessageBox.information(self, "알림", 
-                            "서식 페이지를 찾을 수 없습니다.\n서식분석결과.json 파일이 Dropbox에 저장되었습니다.")
-                    except Exception as e:
-                        error_msg = f"JSON 저장 오류: {e}"
-                        log_callback(error_msg)
-                        # Dropbox에 업로드
-                        upload_json(f"입찰 2025/{self.folder}/서식분석결과.json", result_json)
-                        log_callback(f"서식분석결과.json 파일 Dropbox 업로드 완료")
-                        QMessageBox.information(self, "알림", 
-                            "서식 페이지를 찾을 수 없습니다.\n서식분석결과.json 파일이 Dropbox에 저장되었습니다.")
-                
-                # 세부창 다시 로드 (새로운 데이터 표시)
-                self.load_analysis_data()
-                
-                # 로그 대화상자는 열어둠 (사용자가 닫을 수 있음)
-                return
-                
-            # 서식 파일 생성 완료 확인
-            forms_saved = False
-            for form in result.get('forms', []):
-                if form.get('final_path') and os.path.exists(form.get('final_path')):
-                    forms_saved = True
-                    break
-            
-            if forms_saved:
-                # 이미 pdf_client.py에서 서식 파일 저장 완료
-                forms_dir = os.path.dirname(result['forms'][0].get('final_path'))
-                log_callback(f"서식 파일 저장 완료: {len(result.get('forms', []))}개 파일")
-                QMessageBox.information(self, "완료", 
-                    f"서식 페이지 분석 완료: {len(result.get('forms', []))}개 서식 PDF가 '{forms_dir}'에 저장되었습니다.")
-            else:
-                # 서식 파일이 저장되지 않은 경우 (백업 처리)
-                try:
-                    # 원본 PDF 폴더에 저장
-                    if local_paths:
-                        original_dir = os.path.dirname(local_paths[0])
-                        forms_dir = os.path.join(original_dir, "서식")
-                        os.makedirs(forms_dir, exist_ok=True)
-                        log_callback(f"서식 폴더 생성: {forms_dir}")
-                        
-                        # 각 서식 파일 추출 및 저장
-                        saved_count = 0
-                        for form in result.get('forms', []):
-                            page = form.get('page')
-                            if page is None:
-                                continue
-                                
-                            output_path = form.get('output_path')
-                            if output_path and os.path.exists(output_path):
-                                # 이미 생성된 파일 복사
-                                filename = os.path.basename(output_path)
-                                dest_path = os.path.join(forms_dir, filename)
-                                shutil.copy2(output_path, dest_path)
-                                log_callback(f"서식 파일 복사: {filename}")
-                                saved_count += 1
-                            else:
-                                # 페이지 추출 시도 (필요 시 PyPDF2 임포트)
-                                try:
-                                    from PyPDF2 import PdfReader, PdfWriter
-                                    for pdf_path in local_paths:
-                                        try:
-                                            reader = PdfReader(pdf_path)
-                                            if page <= len(reader.pages):
-                                                # 파일명 생성
-                                                filename = form.get('filename', f"{page}p_서식.pdf")
-                                                filename = re.sub(r'[\\/*?:"<>|]', "", filename)
-                                                dest_path = os.path.join(forms_dir, filename)
-                                                
-                                                # 0-기반 인덱스로 변환
-                                                page_idx = page - 1
-                                                
-                                                # 단일 페이지 추출
-                                                writer = PdfWriter()
-                                                writer.add_page(reader.pages[page_idx])
-                                                
-                                                # 파일로 저장
-                                                with open(dest_path, "wb") as out_file:
-                                                    writer.write(out_file)
-                                                
-                                                log_callback(f"서식 파일 생성: {filename}")
-                                                saved_count += 1
-                                                break
-                                        except Exception as e:
-                                            error_msg = f"서식 추출 오류 (페이지 {page}): {e}"
-                                            log_callback(error_msg)
-                                except ImportError:
-                                    log_callback("PyPDF2 라이브러리를 찾을 수 없습니다. pip install PyPDF2로 설치하세요.")
-                        
-                        # 결과 JSON 파일 저장
-                        result_path = os.path.join(temp_dir, "서식분석결과.json")
-                        with open(result_path, "w", encoding="utf-8") as f:
-                            json.dump(result, f, ensure_ascii=False, indent=2)
-                        
-                        log_callback(f"서식분석결과.json 파일 저장: {result_path}")
-                        
-                        # Dropbox에 업로드
-                        upload_json(f"입찰 2025/{self.folder}/서식분석결과.json", result)
-                        log_callback(f"서식분석결과.json 파일 Dropbox 업로드 완료")
-                        
-                        # 완료 메시지 표시
-                        QMessageBox.information(self, "완료", 
-                            f"서식 페이지 분석 완료: {saved_count}개 서식 PDF가 '{forms_dir}'에 저장되었습니다.")
-                    else:
-                        # Dropbox API 사용
-                        forms_dir = f"입찰 2025/{self.folder}/서식"
-                        saved_count = 0
-                        log_callback(f"Dropbox 폴더 생성: {forms_dir}")
-                        
-                        # 각 서식 파일을 Dropbox에 업로드
-                        for form in result.get('forms', []):
-                            output_path = form.get('output_path')
-                            if not output_path or not os.path.exists(output_path):
-                                continue
-                                
-                            filename = os.path.basename(output_path)
-                            remote_path = f"{forms_dir}/{filename}"
-                            
-                            try:
-                                # 파일 업로드
-                                upload_file(remote_path, output_path)
-                                log_callback(f"서식 파일 업로드: {filename}")
-                                saved_count += 1
-                            except Exception as e:
-                                error_msg = f"파일 업로드 오류: {e}"
-                                log_callback(error_msg)
-                        
-                        # 결과 JSON 파일 저장
-                        upload_json(f"입찰 2025/{self.folder}/서식/서식분석결과.json", result)
-                        log_callback(f"서식분석결과.json 파일 업로드 완료")
-                        
-                        # 완료 메시지 표시
-                        QMessageBox.information(self, "완료", 
-                            f"서식 페이지 분석 완료: {saved_count}개 서식 PDF가 Dropbox에 저장되었습니다.")
-                    
-                except Exception as e:
-                    error_msg = f"서식 파일 저장 중 오류 발생: {str(e)}"
-                    log_callback(error_msg)
-                    QMessageBox.warning(self, "저장 오류", error_msg)
-                    # 로컬 경로 비상 대책 안내
-                    temp_forms_dir = os.path.join(temp_dir, "서식")
-                    if os.path.exists(temp_forms_dir) and os.listdir(temp_forms_dir):
-                        log_callback(f"임시 저장 위치: {temp_forms_dir}")
-                        QMessageBox.information(self, "임시 저장 위치", 
-                            f"서식 파일이 다음 임시 폴더에 저장되어 있습니다:\n{temp_forms_dir}\n"
-                            f"이 폴더의 내용을 수동으로 복사하세요.")
-            
-            # 세부창 데이터 다시 로드
+        """서식 분석 기능 호출 - 모든 PDF를 분석하여 서식 찾기 (백그라운드)"""
+        # 로그 대화상자 생성
+        log_dialog = QDialog(self)
+        log_dialog.setWindowTitle("서식 분석 로그")
+        log_dialog.resize(700, 400)
+        log_layout = QVBoxLayout(log_dialog)
+        
+        log_text = QTextEdit()
+        log_text.setReadOnly(True)
+        log_layout.addWidget(log_text)
+        
+        cancel_btn = QPushButton("취소")
+        log_layout.addWidget(cancel_btn)
+        
+        # 로그 콜백 함수 (작업 스레드의 로그가 시그널로 전달됨)
+        def log_callback(message):
+            log_text.append(message)
+            log_text.moveCursor(log_text.textCursor().End)
+        
+        job = Job(f"forms:{self.folder}", run_form_extraction, self.folder)
+        job.signals.log.connect(log_callback)
+        cancel_btn.clicked.connect(job.cancel)
+        
+        def on_result(notices):
+            for level, title, message in notices:
+                if level == "warning":
+                    QMessageBox.warning(self, title, message)
+                else:
+                    QMessageBox.information(self, title, message)
+            # 세부창 데이터 다시 로드 (새로운 데이터 표시)
             self.load_analysis_data()
-            
-            # 로그 대화상자는 열어둠 (사용자가 닫을 수 있음)
-                
-        except Exception as e:
-            error_msg = f"서식 분석 오류: {str(e)}"
-            QMessageBox.critical(self, "서식 분석 오류", error_msg) 
+        
+        def on_error(error, trace):
+            if isinstance(error, FileNotFoundError):
+                QMessageBox.warning(self, "PDF 없음", str(error))
+            else:
+                QMessageBox.critical(self, "서식 분석 오류", f"서식 분석 오류: {error}")
+        
+        job.signals.result.connect(on_result)
+        job.signals.error.connect(on_error)
+        job.signals.cancelled.connect(lambda: log_callback("서식 분석이 취소되었습니다."))
+        # 로그 대화상자는 열어둠 (사용자가 닫을 수 있음)
+        job.signals.finished.connect(lambda: cancel_btn.setEnabled(False))
+        log_dialog.show()
+        job_executor.start(job)
     
     def generate_toc_guide(self):
         """목차 가이드 생성"""
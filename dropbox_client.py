@@ -1,8 +1,20 @@
 # dropbox_client.py
 import os
 import json
+import atexit
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+import logging
 from dotenv import dotenv_values
 import dropbox
+import requests
+
+logger = logging.getLogger(__name__)
 
 # .env 파일에서 설정값을 로드하고 키를 소문자로 변환하여 반환합니다.
 def load_config():
@@ -15,19 +27,116 @@ APP_SECRET    = cfg.get("dropbox_app_secret")   or os.getenv("DROPBOX_APP_SECRET
 ACCESS_TOKEN  = cfg.get("dropbox_access_token") or os.getenv("DROPBOX_ACCESS_TOKEN")
 REFRESH_TOKEN = cfg.get("dropbox_refresh_token")or os.getenv("DROPBOX_REFRESH_TOKEN")
 
-if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN, REFRESH_TOKEN]):
-    raise RuntimeError("Dropbox OAuth 설정이 올바르게 되어 있지 않습니다. 확인 필요")
+# 공유 HTTP 커넥션 풀 크기 (스레드 수보다 크게 잡아야 커넥션 대기가 없습니다)
+MAX_CONNECTIONS = int(cfg.get("dropbox_max_connections") or os.getenv("DROPBOX_MAX_CONNECTIONS") or 8)
+# files_list_folder 페이지 크기
+LIST_PAGE_SIZE = 2000
+# 다운로드 캐시 위치 및 최대 크기 (MB)
+CACHE_DIR = cfg.get("dropbox_cache_dir") or os.getenv("DROPBOX_CACHE_DIR") or os.path.join(
+    os.path.expanduser("~"), ".govbid_cache", "dropbox")
+CACHE_MAX_MB = int(cfg.get("dropbox_cache_max_mb") or os.getenv("DROPBOX_CACHE_MAX_MB") or 2048)
+# 스트리밍 전송 청크 크기 - 파일 크기와 관계없이 메모리 사용량은 이 값으로 제한됩니다
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# 일괄 다운로드 동시 실행 수
+DOWNLOAD_CONCURRENCY = int(cfg.get("dropbox_download_concurrency") or os.getenv("DROPBOX_DOWNLOAD_CONCURRENCY") or 4)
+# 일괄 업로드 동시 실행 수
+UPLOAD_CONCURRENCY = int(cfg.get("dropbox_upload_concurrency") or os.getenv("DROPBOX_UPLOAD_CONCURRENCY") or 4)
+# 전송 중 네트워크 오류 시 이어받기/이어올리기 재시도 횟수
+TRANSFER_RETRIES = 3
+# 이어서 재시도할 네트워크 오류 종류
+_RETRYABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.Timeout,
+)
+
+class DropboxClientManager:
+    """
+    프로세스 전역에서 하나의 인증된 Dropbox 세션을 유지하는 관리자입니다.
+
+    - 클라이언트는 최초 사용 시 한 번만 생성하고, 매 호출마다 check_user()를 하지 않습니다.
+    - 모든 스레드가 requests 세션(커넥션 풀)을 공유합니다.
+    - 액세스 토큰은 만료가 임박했을 때만 갱신합니다 (잠금으로 중복 갱신 방지).
+    """
+
+    def __init__(self, max_connections: int = MAX_CONNECTIONS):
+        self.max_connections = max_connections
+        self._lock = threading.Lock()
+        self._session = None
+        self._dbx = None
+        self._clients_created = 0
+        self._token_refreshes = 0
+        self._calls = 0
+
+    def client(self) -> dropbox.Dropbox:
+        """공유 Dropbox 클라이언트를 반환합니다 (필요 시 토큰을 지연 갱신)."""
+        with self._lock:
+            if self._dbx is None:
+                # 설정 확인은 임포트 시점이 아니라 첫 사용 시점에 (설정 없이도 앱/모듈은 뜨도록)
+                if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN, REFRESH_TOKEN]):
+                    raise RuntimeError("Dropbox OAuth 설정이 올바르게 되어 있지 않습니다. 확인 필요")
+                self._session = dropbox.create_session(max_connections=self.max_connections)
+                self._dbx = dropbox.Dropbox(
+                    oauth2_access_token=ACCESS_TOKEN,
+                    oauth2_refresh_token=REFRESH_TOKEN,
+                    app_key=APP_KEY,
+                    app_secret=APP_SECRET,
+                    session=self._session,
+                )
+                self._clients_created += 1
+            expiration = self._dbx._oauth2_access_token_expiration
+            self._dbx.check_and_refresh_access_token()
+            if self._dbx._oauth2_access_token_expiration != expiration:
+                self._token_refreshes += 1
+            self._calls += 1
+            return self._dbx
+
+    def reset(self) -> None:
+        """세션을 닫고 다음 호출 시 새로 생성되도록 초기화합니다."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._dbx = None
 
-# Dropbox 클라이언트 객체를 생성하고 인증을 확인하여 반환합니다.
+    def stats(self) -> dict:
+        """
+        커넥션 재사용 통계를 반환합니다.
+
+        requests는 urllib3 커넥션 풀을 사용하므로, 풀별 요청 수와 새로 연 커넥션 수의
+        차이가 재사용된 커넥션 수입니다.
+        """
+        with self._lock:
+            requests_sent = 0
+            connections_opened = 0
+            if self._session is not None:
+                pool_manager = self._session.get_adapter("https://").poolmanager
+                for key in list(pool_manager.pools.keys()):
+                    pool = pool_manager.pools.get(key)
+                    if pool is None:
+                        continue
+                    requests_sent += pool.num_requests
+                    connections_opened += pool.num_connections
+            return {
+                "clients_created": self._clients_created,
+                "token_refreshes": self._token_refreshes,
+                "client_calls": self._calls,
+                "http_requests": requests_sent,
+                "connections_opened": connections_opened,
+                "connections_reused": max(0, requests_sent - connections_opened),
+            }
+
+# 프로세스 전역 클라이언트 관리자
+client_manager = DropboxClientManager()
+
+# 공유 Dropbox 클라이언트를 반환합니다. (기존 호출부 호환용)
 def get_dbx():
-    dbx = dropbox.Dropbox(
-        oauth2_access_token=ACCESS_TOKEN,
-        oauth2_refresh_token=REFRESH_TOKEN,
-        app_key=APP_KEY,
-        app_secret=APP_SECRET,
-    )
-    dbx.check_user()
-    return dbx
+    return client_manager.client()
+
+def connection_stats() -> dict:
+    """공유 Dropbox 세션의 커넥션 재사용 통계를 반환합니다."""
+    return client_manager.stats()
 
 # 경로 정규화 유틸리티
 def _normalize_path(p: str) -> str:
@@ -35,68 +144,584 @@ def _normalize_path(p: str) -> str:
     p = p.strip()
     return p if p.startswith("/") else f"/{p}"
 
-def list_folder(path: str) -> list[str]:
-    """Dropbox에서 지정 폴더의 항목 이름 목록을 반환합니다."""
+def iter_folder(path: str, recursive: bool = False, page_size: int = LIST_PAGE_SIZE) -> Iterator[dropbox.files.Metadata]:
+    """
+    Dropbox 폴더 항목을 cursor를 따라가며 하나씩 반환하는 제너레이터입니다.
+
+    files_list_folder의 첫 페이지 이후 has_more인 동안 files_list_folder_continue로
+    다음 페이지를 가져옵니다. 항목은 SDK 메타데이터 객체 그대로 반환되므로
+    파일(FileMetadata)은 size, rev, content_hash, server_modified를 포함합니다.
+
+    Args:
+        path: Dropbox 폴더 경로
+        recursive: True이면 하위 폴더까지 한 번의 스트림으로 모두 반환
+        page_size: 페이지당 최대 항목 수 (Dropbox 권장 상한 2000)
+    """
     dbx = get_dbx()
     p = _normalize_path(path)
-    res = dbx.files_list_folder(p)
-    return [entry.name for entry in res.entries]
+    res = dbx.files_list_folder(p, recursive=recursive, limit=page_size)
+    while True:
+        for entry in res.entries:
+            yield entry
+        if not res.has_more:
+            break
+        res = dbx.files_list_folder_continue(res.cursor)
+
+def get_latest_cursor(path: str, recursive: bool = False) -> str:
+    """현재 시점 이후의 변경만 받기 위한 폴더 cursor를 반환합니다 (항목 목록은 받지 않음)."""
+    res = get_dbx().files_list_folder_get_latest_cursor(_normalize_path(path), recursive=recursive)
+    return res.cursor
+
+def wait_for_changes(cursor: str, timeout: int = 90) -> tuple[bool, Optional[int]]:
+    """
+    files_list_folder_longpoll로 cursor 이후 변경이 생길 때까지 대기합니다.
+
+    Returns:
+        (변경 여부, 다음 호출 전 대기해야 할 backoff 초 또는 None)
+    """
+    res = get_dbx().files_list_folder_longpoll(cursor, timeout=timeout)
+    return res.changes, res.backoff
+
+def list_changes(cursor: str) -> tuple[list[dropbox.files.Metadata], str]:
+    """cursor 이후 변경된 항목(삭제는 DeletedMetadata)과 새 cursor를 반환합니다."""
+    dbx = get_dbx()
+    entries = []
+    while True:
+        res = dbx.files_list_folder_continue(cursor)
+        entries.extend(res.entries)
+        cursor = res.cursor
+        if not res.has_more:
+            return entries, cursor
+
+def relative_path(entry: dropbox.files.Metadata, root: str) -> str:
+    """항목의 path_lower에서 root 이후의 상대 경로를 반환합니다 (소문자)."""
+    root_lower = _normalize_path(root).lower().rstrip("/")
+    return entry.path_lower[len(root_lower):].lstrip("/")
+
+def relative_display_parts(entry: dropbox.files.Metadata, root: str) -> list[str]:
+    """
+    항목의 path_display에서 root 이후의 경로 구성요소 목록을 반환합니다 (원래 대소문자).
+
+    path_lower와 path_display는 길이가 같다는 보장이 없으므로(유니코드 대소문자 변환 등)
+    문자 위치가 아니라 root의 구성요소 수만큼 앞부분을 잘라냅니다.
+    """
+    depth = len([part for part in _normalize_path(root).split("/") if part])
+    parts = [part for part in (entry.path_display or "").split("/") if part]
+    return parts[depth:]
+
+def list_folder(path: str) -> list[str]:
+    """Dropbox에서 지정 폴더의 항목 이름 목록을 반환합니다 (모든 페이지 포함)."""
+    return [entry.name for entry in iter_folder(path)]
+
+def list_files(path: str, suffix: str = "") -> list[dropbox.files.FileMetadata]:
+    """지정 폴더의 파일 메타데이터 목록을 반환합니다 (suffix로 확장자 필터, 대소문자 무시)."""
+    suffix = suffix.lower()
+    return [
+        entry for entry in iter_folder(path)
+        if isinstance(entry, dropbox.files.FileMetadata) and entry.name.lower().endswith(suffix)
+    ]
 
 def download_json(path: str) -> list[dict]:
     """Dropbox에서 JSON 파일을 다운로드하여 파싱한 후 반환합니다."""
+    data, _ = download_json_with_rev(path)
+    return data
+
+def download_json_with_rev(path: str, rev: Optional[str] = None) -> tuple[list[dict], str]:
+    """JSON 파일을 다운로드해 (파싱 결과, 다운로드한 rev)를 반환합니다. rev를 지정하면 해당 버전을 받습니다."""
     dbx = get_dbx()
     p = _normalize_path(path)
-    _, res = dbx.files_download(p)
-    return json.loads(res.content.decode("utf-8"))
+    metadata, res = dbx.files_download(p, rev=rev)
+    return json.loads(res.content.decode("utf-8")), metadata.rev
+
+def get_metadata(path: str) -> dropbox.files.Metadata:
+    """파일/폴더 메타데이터를 조회합니다 (다운로드 없이 rev, content_hash 확인용)."""
+    return get_dbx().files_get_metadata(_normalize_path(path))
+
+def _download_to(remote_path: str, local_path: str,
+                 chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+                 is_cancelled: Optional[Callable[[], bool]] = None) -> dropbox.files.FileMetadata:
+    """
+    파일을 청크 단위로 스트리밍 다운로드해 저장하고, 파일 메타데이터를 반환합니다.
+
+    응답 본문 전체를 메모리에 올리지 않고 chunk_size씩 local_path.part에 기록한 뒤
+    완료되면 local_path로 교체합니다. 전송 중 연결이 끊기면 받은 위치부터 Range 요청으로
+    이어받으며, 이때 처음 받은 rev로 고정해 다른 버전의 내용이 섞이지 않도록 합니다.
+    is_cancelled가 True를 반환하면 청크 사이에서 중단하고 TransferCancelled를 발생시킵니다.
+    """
+    dbx = get_dbx()
+    p = _normalize_path(remote_path)
+    part_path = local_path + ".part"
+    metadata = None
+    offset = 0
+    attempt = 0
+    try:
+        with open(part_path, "wb") as f:
+            while True:
+                headers = {"Range": f"bytes={offset}-"} if offset else None
+                try:
+                    md, res = dbx.files_download(
+                        p, rev=metadata.rev if metadata else None, extra_headers=headers)
+                    metadata = metadata or md
+                    try:
+                        for chunk in res.iter_content(chunk_size):
+                            if is_cancelled and is_cancelled():
+                                raise TransferCancelled()
+                            f.write(chunk)
+                            offset += len(chunk)
+                    finally:
+                        res.close()
+                    break
+                except _RETRYABLE_ERRORS as e:
+                    attempt += 1
+                    if attempt > TRANSFER_RETRIES:
+                        raise
+                    logger.warning(f"다운로드 중단, {offset} 바이트부터 이어받기 재시도 ({attempt}/{TRANSFER_RETRIES}): {e}")
+        os.replace(part_path, local_path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    return metadata
 
 def download_file(remote_path: str, local_path: str) -> None:
     """Dropbox에서 파일을 다운로드하여 로컬에 저장합니다."""
-    dbx = get_dbx()
+    _download_to(remote_path, local_path)
+
+class DownloadCache:
+    """
+    Dropbox content_hash를 키로 하는 로컬 다운로드 캐시입니다.
+
+    같은 내용의 파일은 폴더나 파일명이 달라도 한 번만 저장되며, 전체 크기가
+    max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제합니다(LRU).
+    인덱스는 cache_dir/index.json에 보관되어 프로그램을 다시 시작해도 유지됩니다.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._index = OrderedDict()
+        self._total_bytes = 0
+        self._dirty = False  # 적중으로 바뀐 사용 순서를 아직 저장하지 않았는지
+        self._load_index()
+        atexit.register(self.flush)
+
+    def _load_index(self) -> None:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                items = json.load(f)
+        except (OSError, ValueError):
+            items = {}
+        # 마지막 사용 시각 순서로 정렬해 LRU 순서를 복원
+        for key, info in sorted(items.items(), key=lambda kv: kv[1].get("last_used", 0)):
+            if os.path.exists(self._blob_path(key)):
+                self._index[key] = info
+                self._total_bytes += info.get("size", 0)
+
+    def _save_index(self) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp_path, self._index_path)
+        self._dirty = False
+
+    def flush(self) -> None:
+        """적중으로 바뀐 사용 순서를 index.json에 저장합니다 (종료 시 자동 호출)."""
+        with self._lock:
+            if self._dirty:
+                try:
+                    self._save_index()
+                except OSError:
+                    pass
+
+    def _blob_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def lookup(self, content_hash: str) -> Optional[str]:
+        """
+        캐시된 파일 경로를 반환하고, 없으면 None을 반환합니다.
+
+        적중 시 사용 순서만 메모리에서 갱신하고 index.json은 다음 store()나 flush() 때 저장합니다.
+        반환한 파일은 잠금 해제 후 다른 스레드의 정리(_evict)로 지워질 수 있습니다.
+        """
+        with self._lock:
+            info = self._index.get(content_hash)
+            blob = self._blob_path(content_hash)
+            if info is None or not os.path.exists(blob):
+                if info is not None:
+                    self._total_bytes -= info.get("size", 0)
+                    del self._index[content_hash]
+                self.misses += 1
+                return None
+            info["last_used"] = time.time()
+            self._index.move_to_end(content_hash)
+            self.hits += 1
+            self._dirty = True
+            return blob
+
+    def store(self, metadata: dropbox.files.FileMetadata, src_path: str) -> None:
+        """다운로드한 파일을 캐시에 복사하고 크기 제한에 맞게 오래된 항목을 정리합니다."""
+        key = metadata.content_hash
+        if not key or metadata.size > self.max_bytes:
+            return
+        blob = self._blob_path(key)
+        # 복사는 잠금 밖에서 스레드별 임시 파일로 수행 (동시 다운로드 직렬화 방지)
+        part = f"{blob}.{threading.get_ident()}.part"
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        try:
+            shutil.copyfile(src_path, part)
+        except OSError:
+            if os.path.exists(part):
+                os.remove(part)
+            raise
+        with self._lock:
+            if key not in self._index:
+                os.replace(part, blob)
+                self._total_bytes += metadata.size
+            else:
+                os.remove(part)
+            self._index[key] = {
+                "size": metadata.size,
+                "rev": metadata.rev,
+                "path_lower": metadata.path_lower,
+                "last_used": time.time(),
+            }
+            self._index.move_to_end(key)
+            self._evict()
+            self._save_index()
+
+    def _evict(self) -> None:
+        """
+        크기 제한을 넘으면 오래 쓰지 않은 항목부터 지웁니다.
+
+        다른 프로세스가 열어 두어 지울 수 없는 파일(Windows 등)은 색인과 사용량에 남겨
+        다음 정리 때 다시 시도합니다.
+        """
+        for key in list(self._index):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(self._blob_path(key))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.debug(f"캐시 파일 삭제 실패, 다음 정리 때 재시도: {key}: {e}")
+                continue
+            info = self._index.pop(key)
+            self._total_bytes -= info.get("size", 0)
+
+    def stats(self) -> dict:
+        """캐시 적중/실패 횟수와 적중률, 현재 사용량을 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+# 프로세스 전역 다운로드 캐시
+download_cache = DownloadCache()
+
+def cache_stats() -> dict:
+    """다운로드 캐시 통계를 반환합니다."""
+    return download_cache.stats()
+
+def download_file_cached(remote_path: str, local_path: str,
+                         metadata: Optional[dropbox.files.FileMetadata] = None,
+                         is_cancelled: Optional[Callable[[], bool]] = None) -> bool:
+    """
+    캐시를 거쳐 Dropbox 파일을 로컬에 저장합니다.
+
+    metadata(목록 조회 결과)가 없으면 files_get_metadata로 현재 content_hash를 확인합니다.
+    캐시에 같은 content_hash가 있으면 다운로드 없이 복사하고 True를 반환하며,
+    없으면 다운로드 후 캐시에 저장하고 False를 반환합니다.
+    """
     p = _normalize_path(remote_path)
-    _, res = dbx.files_download(p)
-    with open(local_path, "wb") as f:
-        f.write(res.content)
+    if metadata is None:
+        metadata = get_dbx().files_get_metadata(p)
+    cached = download_cache.lookup(metadata.content_hash)
+    if cached:
+        try:
+            shutil.copyfile(cached, local_path)
+            return True
+        except OSError as e:
+            # 복사 직전에 다른 스레드의 캐시 정리로 삭제된 경우 - 다시 내려받음
+            logger.debug(f"캐시 파일 복사 실패, 다시 다운로드: {remote_path}: {e}")
+    downloaded = _download_to(p, local_path, is_cancelled=is_cancelled)
+    try:
+        download_cache.store(downloaded, local_path)
+    except Exception as e:
+        # 캐시 저장 실패는 다운로드 실패가 아님 - 다음에 다시 받을 뿐
+        logger.warning(f"다운로드 캐시 저장 실패: {remote_path}: {e}")
+    return False
+
+class TransferCancelled(Exception):
+    """사용자 취소로 일괄 전송이 중단되었을 때 발생합니다."""
+
+@dataclass
+class TransferStats:
+    """일괄 전송 집계 통계"""
+    files: int = 0
+    bytes: int = 0
+    cache_hits: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """초당 전송 바이트 수"""
+        return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
 
-def upload_json(remote_path: str, data: dict) -> None:
-    """딕셔너리를 JSON으로 덤프해 Dropbox에 업로드합니다."""
+    def summary(self) -> str:
+        return (f"{self.files}개 파일, {self.bytes / (1024 * 1024):.1f}MB, {self.elapsed:.1f}초 "
+                f"({self.throughput / (1024 * 1024):.2f}MB/s, 캐시 {self.cache_hits}건)")
+
+def download_files(
+    entries: list[dropbox.files.FileMetadata],
+    local_dir: str,
+    max_workers: int = DOWNLOAD_CONCURRENCY,
+    progress_callback: Optional[Callable[[int, int, dropbox.files.FileMetadata, bool], None]] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None,
+) -> tuple[list[str], TransferStats]:
+    """
+    여러 Dropbox 파일을 스레드 풀에서 동시에 받아 local_dir에 저장합니다.
+
+    각 파일은 download_file_cached를 거치므로 캐시에 있는 파일은 복사만 합니다.
+    progress_callback(완료 수, 전체 수, 메타데이터, 캐시 사용 여부)는 호출한 스레드에서
+    파일 하나가 끝날 때마다 호출되므로 UI 갱신에 바로 쓸 수 있습니다. is_cancelled는
+    다운로드 스레드의 청크 사이에서도 확인하므로(스레드 안전해야 함) 큰 파일을 받는
+    중에도 바로 중단되며, 취소되면 대기 중인 다운로드를 버리고 TransferCancelled를 발생시킵니다.
+
+    Returns:
+        (entries 순서대로의 로컬 경로 목록, 집계 통계)
+    """
+    stats = TransferStats()
+    local_paths = [os.path.join(local_dir, entry.name) for entry in entries]
+    if not entries:
+        return local_paths, stats
+
+    started = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(entries))))
+    try:
+        futures = {
+            executor.submit(download_file_cached, entry.path_display, local_path, entry, is_cancelled): entry
+            for entry, local_path in zip(entries, local_paths)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            entry = futures[future]
+            cached = future.result()
+            stats.files += 1
+            stats.bytes += entry.size
+            stats.cache_hits += int(cached)
+            stats.elapsed = time.monotonic() - started
+            if progress_callback:
+                progress_callback(done, len(entries), entry, cached)
+            if is_cancelled and is_cancelled():
+                raise TransferCancelled()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    stats.elapsed = time.monotonic() - started
+    return local_paths, stats
+
+class RevConflict(Exception):
+    """조건부 업로드 시 원격 파일이 기준 rev 이후 다른 곳에서 변경되었을 때 발생합니다."""
+
+def upload_json(remote_path: str, data: dict, rev: Optional[str] = None) -> dropbox.files.FileMetadata:
+    """
+    딕셔너리를 JSON으로 덤프해 Dropbox에 업로드합니다.
+
+    rev를 지정하면 WriteMode.update(rev)로 조건부 업로드하며, 원격 파일의 rev가
+    달라졌으면 덮어쓰지 않고 RevConflict를 발생시킵니다.
+    """
     dbx = get_dbx()
     p = _normalize_path(remote_path)
     content = json.dumps(data, ensure_ascii=False, indent=2)
-    dbx.files_upload(content.encode("utf-8"), p, mode=dropbox.files.WriteMode.overwrite)
+    mode = dropbox.files.WriteMode.update(rev) if rev else dropbox.files.WriteMode.overwrite
+    try:
+        return dbx.files_upload(content.encode("utf-8"), p, mode=mode)
+    except dropbox.exceptions.ApiError as e:
+        err = e.error
+        if rev and isinstance(err, dropbox.files.UploadError) and err.is_path() and err.get_path().reason.is_conflict():
+            raise RevConflict(f"{p} 파일이 rev {rev} 이후 변경되었습니다.") from e
+        raise
+
+def ensure_folder(path: str) -> None:
+    """
+    Dropbox 폴더가 없으면 생성합니다.
+
+    존재 여부를 먼저 조회하지 않고 바로 생성을 시도하며, 이미 있으면(conflict) 무시합니다.
+    그 밖의 API 오류는 기록한 뒤 다시 발생시킵니다.
+    """
+    dbx = get_dbx()
+    p = _normalize_path(path)
+    try:
+        result = dbx.files_create_folder_v2(p)
+        logger.info(f"폴더 생성 완료: {result.metadata.path_display}")
+    except dropbox.exceptions.ApiError as e:
+        if isinstance(e.error, dropbox.files.CreateFolderError) and e.error.is_path() and e.error.get_path().is_conflict():
+            logger.debug(f"폴더가 이미 존재합니다: {p}")
+        else:
+            logger.error(f"폴더 생성 중 API 오류 ({p}): {e}")
+            raise
 
 def upload_file(remote_path: str, local_path: str) -> None:
     """로컬 파일을 Dropbox에 업로드합니다."""
     dbx = get_dbx()
     p = _normalize_path(remote_path)
     
-    # 디렉토리 경로 자동 생성
+    # 디렉토리 경로 자동 생성 (실패해도 업로드는 시도 - 업로드 오류로 원인이 드러남)
     folder_path = os.path.dirname(p)
     try:
-        # 폴더 존재 여부 확인
-        try:
-            dbx.files_get_metadata(folder_path)
-            print(f"폴더가 이미 존재합니다: {folder_path}")
-        except Exception:
-            # 폴더가 없으면 생성
-            print(f"폴더 생성 시도: {folder_path}")
-            try:
-                result = dbx.files_create_folder_v2(folder_path)
-                print(f"폴더 생성 완료: {result.metadata.path_display}")
-            except dropbox.exceptions.ApiError as e:
-                if isinstance(e.error, dropbox.files.CreateFolderError) and e.error.is_path() and e.error.get_path().is_conflict():
-                    print(f"폴더가 이미 존재합니다 (충돌): {folder_path}")
-                else:
-                    print(f"폴더 생성 중 API 오류: {e}")
+        ensure_folder(folder_path)
     except Exception as e:
-        print(f"폴더 확인/생성 중 오류 (무시됨): {e}")
+        logger.warning(f"폴더 확인/생성 중 오류 (무시됨): {e}")
     
     # 파일 업로드
-    print(f"파일 업로드 시작: {p}")
+    logger.info(f"파일 업로드 시작: {p}")
     try:
-        with open(local_path, "rb") as f:
-            result = dbx.files_upload(f.read(), p, mode=dropbox.files.WriteMode.overwrite)
-        print(f"파일 업로드 완료: {result.path_display}, 크기: {result.size} 바이트")
+        result = _upload_stream(dbx, local_path, p)
+        logger.info(f"파일 업로드 완료: {result.path_display}, 크기: {result.size} 바이트")
         return result.path_display
     except Exception as e:
-        print(f"파일 업로드 오류: {e}")
-        raise
\ No newline at end of file
+        logger.error(f"파일 업로드 오류: {e}")
+        raise
+
+def _incorrect_offset(error: dropbox.exceptions.ApiError) -> Optional[int]:
+    """업로드 세션 오류가 offset 불일치이면 서버가 받은 올바른 offset을 반환합니다."""
+    err = error.error
+    if isinstance(err, dropbox.files.UploadSessionFinishError):
+        if not err.is_lookup_failed():
+            return None
+        err = err.get_lookup_failed()
+    if isinstance(err, (dropbox.files.UploadSessionAppendError, dropbox.files.UploadSessionLookupError)):
+        if err.is_incorrect_offset():
+            return err.get_incorrect_offset().correct_offset
+    return None
+
+def _upload_session(dbx: dropbox.Dropbox, f, size: int, chunk_size: int = UPLOAD_CHUNK_SIZE,
+                    commit: Optional[dropbox.files.CommitInfo] = None):
+    """
+    파일 객체 f의 내용을 새 업로드 세션에 청크씩 올립니다.
+
+    commit이 있으면 마지막 청크를 files_upload_session_finish로 보내 파일 메타데이터를 반환하고,
+    없으면 마지막 청크와 함께 세션을 닫고(close) 일괄 커밋용 cursor를 반환합니다.
+    네트워크 오류나 offset 불일치가 나면 서버가 받은 위치로 되돌아가 이어서 올립니다.
+    """
+    session = dbx.files_upload_session_start(
+        f.read(chunk_size), close=commit is None and f.tell() >= size)
+    cursor = dropbox.files.UploadSessionCursor(session_id=session.session_id, offset=f.tell())
+    attempt = 0
+    while True:
+        try:
+            remaining = size - cursor.offset
+            if commit is not None and remaining <= chunk_size:
+                return dbx.files_upload_session_finish(f.read(chunk_size), cursor, commit)
+            if commit is None and remaining <= 0:
+                return cursor
+            data = f.read(chunk_size)
+            dbx.files_upload_session_append_v2(data, cursor, close=commit is None and f.tell() >= size)
+            cursor.offset = f.tell()
+            attempt = 0
+        except (dropbox.exceptions.ApiError, *_RETRYABLE_ERRORS) as e:
+            attempt += 1
+            correct = _incorrect_offset(e) if isinstance(e, dropbox.exceptions.ApiError) else cursor.offset
+            if correct is None or attempt > TRANSFER_RETRIES:
+                raise
+            logger.warning(f"업로드 중단, {correct} 바이트부터 이어올리기 재시도 ({attempt}/{TRANSFER_RETRIES}): {e}")
+            cursor.offset = correct
+            f.seek(correct)
+
+def _upload_stream(dbx: dropbox.Dropbox, local_path: str, remote_path: str,
+                   mode: dropbox.files.WriteMode = dropbox.files.WriteMode.overwrite,
+                   chunk_size: int = UPLOAD_CHUNK_SIZE) -> dropbox.files.FileMetadata:
+    """
+    로컬 파일을 업로드합니다.
+
+    chunk_size 이하의 파일은 files_upload 한 번으로 올리고, 그보다 큰 파일은
+    업로드 세션(start/append_v2/finish)으로 청크씩 올립니다 (150MB 단일 업로드 제한 없음).
+    """
+    size = os.path.getsize(local_path)
+    with open(local_path, "rb") as f:
+        if size <= chunk_size:
+            return dbx.files_upload(f.read(), remote_path, mode=mode)
+        commit = dropbox.files.CommitInfo(path=remote_path, mode=mode)
+        return _upload_session(dbx, f, size, chunk_size, commit=commit)
+
+def upload_files(
+    files: list[tuple[str, str]],
+    max_workers: int = UPLOAD_CONCURRENCY,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+) -> tuple[dict, TransferStats]:
+    """
+    여러 로컬 파일을 한 번의 일괄 커밋으로 Dropbox에 업로드합니다.
+
+    대상 폴더는 파일마다가 아니라 폴더별로 한 번만 생성하고, 파일 내용은 스레드 풀에서
+    동시에 업로드 세션으로 올린 뒤(세션 닫기까지), files_upload_session_finish_batch_v2
+    한 번으로 모두 커밋합니다 (호출당 최대 1000개).
+    progress_callback(완료 수, 전체 수, 원격 경로)는 호출한 스레드에서 파일별로 호출됩니다.
+
+    Args:
+        files: (원격 경로, 로컬 경로) 목록
+
+    Returns:
+        ({원격 경로: 커밋된 FileMetadata 또는 실패 시 None}, 집계 통계)
+    """
+    stats = TransferStats()
+    results = {}
+    if not files:
+        return results, stats
+
+    dbx = get_dbx()
+    items = [(_normalize_path(remote), local) for remote, local in files]
+    for folder in sorted({os.path.dirname(remote) for remote, _ in items}):
+        try:
+            ensure_folder(folder)
+        except Exception as e:
+            # 폴더 생성 실패는 해당 파일의 커밋 실패로 드러나므로 나머지 파일은 계속 진행
+            logger.warning(f"폴더 확인/생성 중 오류 (무시됨): {e}")
+
+    def send(remote, local):
+        size = os.path.getsize(local)
+        with open(local, "rb") as f:
+            cursor = _upload_session(dbx, f, size)
+        commit = dropbox.files.CommitInfo(path=remote, mode=dropbox.files.WriteMode.overwrite)
+        return dropbox.files.UploadSessionFinishArg(cursor=cursor, commit=commit), size
+
+    started = time.monotonic()
+    finish_args = [None] * len(items)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        futures = {executor.submit(send, remote, local): i for i, (remote, local) in enumerate(items)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            try:
+                finish_args[i], size = future.result()
+            except Exception as e:
+                # 한 파일의 실패로 이미 올린 다른 파일의 커밋까지 버리지 않도록 건너뜀
+                logger.error(f"파일 업로드 오류: {items[i][0]}: {e}")
+                results[items[i][0]] = None
+            else:
+                stats.files += 1
+                stats.bytes += size
+            if progress_callback:
+                progress_callback(done, len(items), items[i][0])
+
+    # 일괄 커밋 (요청당 최대 1000개, 업로드에 실패한 파일은 제외)
+    finish_args = [arg for arg in finish_args if arg is not None]
+    for start in range(0, len(finish_args), 1000):
+        batch = finish_args[start:start + 1000]
+        res = dbx.files_upload_session_finish_batch_v2(batch)
+        for arg, entry in zip(batch, res.entries):
+            if entry.is_success():
+                results[arg.commit.path] = entry.get_success()
+            else:
+                logger.error(f"일괄 커밋 실패: {arg.commit.path}: {entry.get_failure()}")
+                results[arg.commit.path] = None
+    stats.elapsed = time.monotonic() - started
+    return results, stats
@@ -4,11 +4,10 @@ from PyQt5.QtWidgets import (
     QPushButton, QFileDialog, QTableWidget, QTableWidgetItem, QFrame, QTextBrowser, QTextEdit,
     QSplitter, QLabel, QMessageBox, QStyledItemDelegate
 )
-from PyQt5.QtGui import QColor, QFont, QPen
+from PyQt5.QtGui import QColor, QFont, QPen, QTextCursor
 from PyQt5.QtCore import Qt
 from dotenv import load_dotenv
-import openpyxl
-import requests
+from job_executor import Job, job_executor
 
 # .env에서 GPT 키/모델 불러오기
 load_dotenv()
@@ -118,6 +117,7 @@ class ExcelGPTViewer(QMainWindow):
         btn_layout.addStretch(1)
         self.send_btn = QPushButton("질문하기")
         self.send_btn.clicked.connect(self.ask_gpt)
+        self.gpt_job = None  # 답변 대기 중인 GPT 질문 작업
         btn_layout.addWidget(self.send_btn)
         btn_layout.addStretch(1)
         btn_widget = QWidget(); btn_widget.setLayout(btn_layout)
@@ -152,6 +152,7 @@ class ExcelGPTViewer(QMainWindow):
         """)
 
     def open_excel(self):
+        import openpyxl  # 창이 빨리 뜨도록 처음 엑셀을 열 때 임포트
         path, _ = QFileDialog.getOpenFileName(self, "엑셀 파일 선택", "", "Excel Files (*.xlsx)")
         if not path:
             return
@@ -342,6 +343,10 @@ class ExcelGPTViewer(QMainWindow):
         return result
 
     def ask_gpt(self):
+        # 답변 대기 중이면 버튼은 취소 버튼으로 동작
+        if self.gpt_job is not None:
+            self.gpt_job.cancel()
+            return
         user_q = self.chat_input.toPlainText().strip()
         if not user_q or not self.json_path:
             return
@@ -351,33 +356,51 @@ class ExcelGPTViewer(QMainWindow):
             {"role": "system", "content": "아래 견적서 JSON을 참고해 질문에 답변해 주세요."},
             {"role": "user", "content": f"견적서 데이터:\n```json\n{quotation_json}\n```\n질문: {user_q}"}
         ]
-        answer = ask_gpt_api(messages, GPT_API_KEY, GPT_MODEL)
         self.chat_output.append(f"<b>질문:</b> {user_q}")
         self.chat_output.append(f"<b>GPT:</b>")
-        self.chat_output.append(answer)
+        self.chat_output.append("")
+        # GPT 호출은 작업 스레드에서, 응답 조각은 도착하는 대로 채팅창에 이어 붙임
+        def run(ctx):
+            answer = []
+            for delta in ask_gpt_api(messages, GPT_API_KEY, GPT_MODEL, is_cancelled=ctx.is_cancelled):
+                answer.append(delta)
+                ctx.partial(delta)
+            ctx.check_cancelled()
+            return "".join(answer)
+        job = Job("excel_gpt_viewer:ask_gpt", run)
+        job.signals.partial.connect(self.on_gpt_delta)
+        job.signals.result.connect(lambda _: self.log(f"[작업] GPT 질문 전송 및 응답 수신 완료"))
+        job.signals.cancelled.connect(lambda: self.chat_output.append("<i>[질문이 취소되었습니다]</i>"))
+        job.signals.finished.connect(self.on_gpt_finished)
+        self.gpt_job = job
+        self.send_btn.setText("취소")
         self.chat_input.clear()
-        self.log(f"[작업] GPT 질문 전송 및 응답 수신 완료")
+        job_executor.start(job)
+
+    def on_gpt_delta(self, delta):
+        # 스트리밍 응답 조각을 마지막 문단 끝에 이어 붙임
+        cursor = self.chat_output.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(delta)
+        self.chat_output.setTextCursor(cursor)
+        self.chat_output.ensureCursorVisible()
+
+    def on_gpt_finished(self):
+        self.gpt_job = None
+        self.send_btn.setText("질문하기")
 
-def ask_gpt_api(messages, api_key, model):
+def ask_gpt_api(messages, api_key, model, is_cancelled=None):
+    """GPT 응답 조각을 도착하는 대로 내보내는 생성기"""
     if not api_key:
-        return "[OpenAI API 키를 .env에 입력하세요]"
-    url = "https://api.openai.com/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    data = {
-        "model": model,
-        "messages": messages,
-        "max_tokens": 2048,
-        "temperature": 0.7
-    }
+        yield "[OpenAI API 키를 .env에 입력하세요]"
+        return
     try:
-        resp = requests.post(url, headers=headers, json=data, timeout=30)
-        resp.raise_for_status()
-        return resp.json()["choices"][0]["message"]["content"].strip()
+        # 대화형 질문이므로 응답 캐시 없이 스트리밍 (openai는 첫 질문 때 임포트)
+        from llm import stream_chat
+        yield from stream_chat(messages, model=model, temperature=0.7, api_key=api_key,
+                               is_cancelled=is_cancelled, max_tokens=2048)
     except Exception as e:
-        return f"[GPT 호출 오류] {e}"
+        yield f"\n[GPT 호출 오류] {e}"
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,389 @@
+# form_detection.py
+# 대용량 입찰 문서 묶음의 서식 페이지 탐지 (토큰 예산 청크 → 동시 GPT 호출 → 결과 병합)
+
+import logging
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from llm import estimate_tokens, stream_chat
+from page_index import PageIndex
+from partial_json import PartialJSONParser
+from pdf_text import Page, PromptWindow, iter_prompt_windows
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+USER_PROMPT = (
+    "아래는 PDF 텍스트 추출 내용의 일부입니다. 문서별로 구분하기 위해 다음 포맷으로 섹션을 나누었습니다:\n\n"
+    "{text}\n\n"
+    "위 각 섹션을 분석해, 제출용 '서식' 페이지를 모두 찾아 JSON으로 반환해주세요. "
+    "페이지 번호는 '--- PAGE n ---' 표시의 n을 그대로 쓰고, 서식이 없는 문서는 forms를 빈 배열 []로 두세요."
+)
+
+# 서식 제목/번호 표시
+FORM_MARKERS = [
+    re.compile(r"별지\s*(?:제\s*)?\d+\s*호"),
+    re.compile(r"서식\s*(?:제\s*)?\d+\s*호|\[\s*서식\s*\d+\s*\]"),
+    re.compile(r"입찰참가신청서|청렴계약\s*이행각서|입찰인감증명서|가격제안서|견적서"),
+    re.compile(r"위\s*임\s*장|서\s*약\s*서|확\s*약\s*서|동\s*의\s*서|신\s*청\s*서|확\s*인\s*서"),
+]
+# 작성란 표시 (빈 괄호, 밑줄, 날짜/서명란)
+BLANK_FIELDS = re.compile(
+    r"_{3,}|\(\s{2,}\)|\(\s*인\s*\)|\(\s*서명\s*\)|\(\s*날인\s*\)"
+    r"|년\s{2,}월\s{2,}일|[:：]\s*$",
+    re.MULTILINE,
+)
+# 신청/제출 문서에 자주 나오는 항목명과 문구
+FORM_KEYWORDS = [
+    "귀하", "제출합니다", "신청합니다", "확인합니다", "서약합니다", "위임합니다",
+    "상호", "대표자", "사업자등록번호", "법인등록번호", "생년월일", "주소", "전화번호", "담당자",
+]
+# 표 형태로 보는 짧은 줄 길이 (PDF 텍스트에서 표 칸은 짧은 줄로 나옴)
+SHORT_LINE_CHARS = 12
+
+def score_page(text: Optional[str]) -> float:
+    """
+    페이지가 제출용 서식일 가능성 점수 (로컬 휴리스틱, 0 이상)
+
+    - 서식 표시(별지/서식 제N호, 서식 제목) 종류마다 3점
+    - 작성란 표시 개수 × 0.5점 (최대 3점)
+    - 항목명/문구 종류 × 0.5점 (최대 3점)
+    - 짧은 줄 비율이 절반 이상이면(표 형태) 1점
+    """
+    if not text or not text.strip():
+        return 0.0
+    score = 3.0 * sum(1 for pattern in FORM_MARKERS if pattern.search(text))
+    score += min(3.0, 0.5 * len(BLANK_FIELDS.findall(text)))
+    score += min(3.0, 0.5 * sum(1 for keyword in FORM_KEYWORDS if keyword in text))
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) >= 5 and sum(1 for line in lines if len(line.strip()) <= SHORT_LINE_CHARS) * 2 >= len(lines):
+        score += 1.0
+    return score
+
+def select_candidate_pages(
+    pages: Iterable[Page],
+    threshold: Optional[float] = None,
+    neighbours: Optional[int] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> Iterator[Page]:
+    """
+    score_page()가 threshold 이상인 페이지와 그 앞뒤 neighbours 페이지만 내보냅니다.
+
+    서식 제목과 작성란이 다음 페이지로 이어지는 경우를 위해 이웃 페이지를 함께 보냅니다.
+    threshold를 낮추면 재현율이 높아지고(더 많은 페이지 전송), 0 이하면 모든 페이지를
+    그대로 내보냅니다. 앞 페이지를 보내기 위해 neighbours 페이지만 버퍼에 둡니다.
+
+    Args:
+        pages: iter_pages() 결과 (문서 순서, 페이지 순서)
+        threshold: 후보 점수 기준 (기본 settings.FORM_PREFILTER_THRESHOLD)
+        neighbours: 후보 앞뒤로 함께 보낼 페이지 수 (기본 settings.FORM_PREFILTER_NEIGHBOURS)
+        stats: 전달하면 "pages"(검사한 페이지 수), "candidates", "selected" 개수를 채움
+    """
+    threshold = settings.FORM_PREFILTER_THRESHOLD if threshold is None else threshold
+    neighbours = settings.FORM_PREFILTER_NEIGHBOURS if neighbours is None else neighbours
+    if stats is None:
+        stats = {}
+    stats.update(pages=0, candidates=0, selected=0)
+
+    previous = deque(maxlen=max(neighbours, 0) or None)
+    current_doc = None
+    forward = 0  # 후보 뒤로 더 보낼 페이지 수
+    for page in pages:
+        stats["pages"] += 1
+        if page.doc != current_doc:
+            current_doc = page.doc
+            previous.clear()
+            forward = 0
+        if threshold <= 0 or score_page(page.text) >= threshold:
+            stats["candidates"] += 1
+            while previous:
+                stats["selected"] += 1
+                yield previous.popleft()
+            forward = neighbours
+        elif forward > 0:
+            forward -= 1
+        else:
+            if neighbours > 0:
+                previous.append(page)
+            continue
+        stats["selected"] += 1
+        yield page
+
+# 서식 탐지 응답 스키마 (Structured Outputs - 최상위는 객체여야 하므로 documents 배열로 감쌈)
+FORMS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "documents": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "doc": {"type": "string"},
+                    "forms": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "page": {"type": "integer"},
+                                "title": {"type": "string"},
+                                "filename": {"type": "string"},
+                                "requires_input": {"type": "boolean"},
+                            },
+                            "required": ["page", "title", "filename", "requires_input"],
+                            "additionalProperties": False,
+                        },
+                    },
+                },
+                "required": ["doc", "forms"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["documents"],
+    "additionalProperties": False,
+}
+FORMS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "form_pages", "schema": FORMS_SCHEMA, "strict": True},
+}
+
+def validate_form(form: Any) -> Optional[Dict[str, Any]]:
+    """
+    서식 항목 하나를 검증/정리합니다 (쓸 수 없으면 None).
+
+    page는 1 이상의 정수여야 하고, 빠진 title/filename/requires_input은 기본값으로 채웁니다.
+    """
+    if not isinstance(form, dict):
+        return None
+    try:
+        page = int(form.get("page"))
+    except (TypeError, ValueError):
+        return None
+    if page < 1:
+        return None
+    title = str(form.get("title") or "서식").strip()
+    requires_input = form.get("requires_input")
+    return dict(
+        form,
+        page=page,
+        title=title,
+        filename=str(form.get("filename") or f"{page}p_{title}.pdf"),
+        requires_input=requires_input if isinstance(requires_input, bool) else True,
+    )
+
+class FormStreamParser:
+    """
+    서식 탐지 응답을 조각 단위로 받아, "forms" 배열의 항목이 닫힐 때마다 검증해 모읍니다.
+
+    응답이 중간에 잘리거나 앞뒤에 설명문, 주석, 불필요한 쉼표가 섞여도 그때까지
+    완성된 서식은 모두 사용합니다. 최상위가 documents 객체든 [{"doc", "forms"}] 배열이든
+    {"doc", "forms"} 객체든 같은 방식으로 처리합니다.
+    """
+
+    def __init__(self):
+        self.forms: List[Dict[str, Any]] = []
+        self.rejected = 0
+        # doc 없이 모은 서식과 그 문서 객체 (doc이 forms보다 뒤에 나오는 경우)
+        self._docless: List[Tuple[Dict[str, Any], Any]] = []
+        self._parser = PartialJSONParser(on_object=self._on_object, select=self._is_form)
+
+    def feed(self, text: str) -> None:
+        self._parser.feed(text)
+
+    @property
+    def found_json(self) -> bool:
+        return self._parser.started
+
+    @staticmethod
+    def _is_form(stack) -> bool:
+        """문서 객체의 "forms" 배열 바로 안에 있는 객체인지 (그 밖의 객체는 파싱하지 않음)"""
+        return len(stack) >= 2 and stack[-1].kind == "[" and stack[-2].kind == "{" and stack[-2].key == "forms"
+
+    def _on_object(self, obj: Any, stack) -> None:
+        form = validate_form(obj)
+        if form is None:
+            self.rejected += 1
+            logger.warning(f"잘못된 서식 항목 무시: {obj}")
+            return
+        # 서식 배열을 가진 문서 객체의 doc 값 (아직 안 나왔으면 doc_results()에서 채움)
+        form.setdefault("doc", stack[-2].strings.get("doc"))
+        if form["doc"] is None:
+            self._docless.append((form, stack[-2]))
+        self.forms.append(form)
+
+    def doc_results(self) -> List[Dict[str, Any]]:
+        """모은 서식을 [{"doc", "forms"}] 목록으로 반환합니다."""
+        for form, doc_frame in self._docless:
+            if form["doc"] is None:
+                form["doc"] = doc_frame.strings.get("doc")
+        by_doc: Dict[Any, List[Dict[str, Any]]] = {}
+        for form in self.forms:
+            by_doc.setdefault(form.get("doc"), []).append(form)
+        return [{"doc": doc, "forms": forms} for doc, forms in by_doc.items()]
+
+def parse_forms_response(content: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    서식 탐지 응답 전체를 [{"doc", "forms"}, ...] 목록으로 반환합니다 (JSON이 없으면 None).
+    """
+    parser = FormStreamParser()
+    parser.feed(content)
+    return parser.doc_results() if parser.found_json else None
+
+def attribute_forms(doc_results: List[Dict[str, Any]], window: PromptWindow,
+                    page_index: Optional[PageIndex] = None) -> List[Dict[str, Any]]:
+    """
+    청크 응답의 서식을 청크에 실제로 들어 있던 (문서, 페이지)에 맞춰 정리합니다.
+
+    각 서식에 doc을 채워 넣고, 문서명이 틀렸지만 페이지 번호가 청크 안의 한 문서에만
+    해당하면 그 문서로 바로잡습니다. 여러 문서에 해당하면 page_index의 제목 조회로
+    고르고, 그래도 청크에 없는 페이지를 가리키는 서식은 버립니다.
+    """
+    forms = []
+    for doc_result in doc_results:
+        if not isinstance(doc_result, dict):
+            continue
+        doc = doc_result.get("doc")
+        for form in doc_result.get("forms") or []:
+            if not isinstance(form, dict):
+                continue
+            try:
+                page = int(form.get("page"))
+            except (TypeError, ValueError):
+                logger.warning(f"페이지 번호가 없는 서식 무시: {form}")
+                continue
+            form_doc = form.get("doc") or doc
+            if page not in window.pages.get(form_doc, ()):
+                candidates = [name for name, pages in window.pages.items() if page in pages]
+                if len(candidates) > 1 and page_index is not None:
+                    key = page_index.resolve(form_doc, page, form.get("title"), candidates=candidates)
+                    candidates = [key[0]] if key and key[1] == page else []
+                if len(candidates) != 1:
+                    logger.warning(f"청크에 없는 페이지를 가리키는 서식 무시: {form_doc} {page}p")
+                    continue
+                form_doc = candidates[0]
+            forms.append(dict(form, doc=form_doc, page=page))
+    return forms
+
+def merge_forms(forms: Iterable[Dict[str, Any]], doc_order: List[str]) -> List[Dict[str, Any]]:
+    """
+    청크별 서식을 문서별 [{"doc", "forms"}] 목록으로 합칩니다.
+
+    같은 (문서, 페이지)는 처음 나온 것만 남기고, 문서는 doc_order 순서,
+    서식은 페이지 순서로 정렬합니다.
+    """
+    by_doc: Dict[str, Dict[int, Dict[str, Any]]] = {doc: {} for doc in doc_order}
+    for form in forms:
+        by_doc.setdefault(form["doc"], {}).setdefault(form["page"], form)
+    return [
+        {"doc": doc, "forms": [pages[page] for page in sorted(pages)]}
+        for doc, pages in by_doc.items()
+    ]
+
+def _ask(model: str, system_prompt: str, window: PromptWindow,
+         use_cache: bool = True) -> Tuple[Optional[List[Dict[str, Any]]], str]:
+    """청크 하나의 서식 탐지 - 응답을 받는 대로 파싱하고 (문서별 서식 또는 None, 응답 원문)을 반환"""
+    parser = FormStreamParser()
+    received = []
+    for delta in stream_chat(
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": USER_PROMPT.format(text=window.text)},
+        ],
+        model=model,
+        temperature=0,
+        use_cache=use_cache,
+        response_format=FORMS_RESPONSE_FORMAT,
+    ):
+        received.append(delta)
+        parser.feed(delta)
+    content = "".join(received)
+    return (parser.doc_results() if parser.found_json else None), content
+
+def detect_forms(
+    system_prompt: str,
+    pages: Iterable[Page],
+    model: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    log_callback: Optional[Callable[[str], None]] = None,
+    page_index: Optional[PageIndex] = None,
+    use_cache: bool = True,
+) -> Tuple[Optional[List[Dict[str, Any]]], str]:
+    """
+    페이지들을 토큰 예산 청크로 나눠 서식 탐지를 동시에 요청하고 결과를 합칩니다.
+
+    청크는 페이지 경계에서만 나뉘므로 페이지 번호와 문서 구분이 그대로 유지되고,
+    전체 소요 시간은 문서 총량이 아니라 가장 느린 청크에 좌우됩니다. 동시에 준비해
+    두는 청크는 max_workers의 두 배까지만이라 프롬프트 텍스트가 한꺼번에 메모리에
+    올라가지 않습니다.
+
+    Args:
+        system_prompt: 서식 탐지 시스템 프롬프트
+        pages: iter_pages() 결과 (문서 순서, 페이지 순서)
+        model: 모델명 (기본 settings.GPT_MODEL)
+        max_tokens: 청크 하나의 PDF 텍스트 토큰 상한 (기본 settings.FORM_CHUNK_TOKENS)
+        max_workers: 동시 요청 수 (기본 settings.FORM_DETECT_WORKERS)
+        progress_callback: (완료한 청크 수, 지금까지 만든 청크 수) 콜백
+        log_callback: 로그 메시지 콜백
+        page_index: 문서명이 모호한 서식을 제목으로 찾을 페이지 색인
+        use_cache: 응답 캐시 사용 여부 (사용자가 다시 추출을 요청한 경우처럼 새 응답이 필요하면 False)
+
+    Returns:
+        (문서별 [{"doc", "forms"}] 목록 - 파싱된 청크가 하나도 없으면 None,
+         JSON을 찾지 못한 청크의 응답 원문 - 로그/진단용)
+    """
+    max_tokens = max_tokens or settings.FORM_CHUNK_TOKENS
+    max_workers = max(1, max_workers or settings.FORM_DETECT_WORKERS)
+
+    doc_order: List[str] = []
+    forms: List[Dict[str, Any]] = []
+    unparsed: List[str] = []
+    parsed_chunks = 0
+    failed_chunks = 0
+    chunks_done = 0
+    chunk_count = 0
+
+    def collect(window, future):
+        nonlocal parsed_chunks, failed_chunks, chunks_done
+        try:
+            doc_results, content = future.result()
+        except Exception as e:
+            # 재시도 후에도 실패한 청크만 버리고, 이미 받은 다른 청크 결과는 계속 합침
+            failed_chunks += 1
+            logger.error(f"서식 탐지 청크 요청 실패 ({', '.join(window.pages)}): {type(e).__name__}: {e}")
+            if log_callback:
+                log_callback(f"서식 탐지 청크 요청 실패: {type(e).__name__}: {e}")
+        else:
+            if doc_results is None:
+                logger.warning(f"청크 응답에서 JSON을 찾지 못함 ({', '.join(window.pages)})")
+                unparsed.append(content)
+            else:
+                parsed_chunks += 1
+                forms.extend(attribute_forms(doc_results, window, page_index))
+        chunks_done += 1
+        if log_callback:
+            pages = ", ".join(f"{doc} {p[0]}-{p[-1]}p" for doc, p in window.pages.items())
+            log_callback(f"서식 탐지 청크 {chunks_done}/{chunk_count} 완료 ({pages})")
+        if progress_callback:
+            progress_callback(chunks_done, chunk_count)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        in_flight = deque()
+        for window in iter_prompt_windows(pages, max_tokens, size=estimate_tokens):
+            chunk_count += 1
+            for doc in window.pages:
+                if doc not in doc_order:
+                    doc_order.append(doc)
+            in_flight.append((window, pool.submit(_ask, model, system_prompt, window, use_cache)))
+            if len(in_flight) >= max_workers * 2:
+                collect(*in_flight.popleft())
+        while in_flight:
+            collect(*in_flight.popleft())
+
+    logger.info(f"서식 탐지: 청크 {chunk_count}개 (파싱 성공 {parsed_chunks}개, 요청 실패 {failed_chunks}개), 서식 {len(forms)}건")
+    if not parsed_chunks:
+        return None, "\n\n".join(unparsed)
+    return merge_forms(forms, doc_order), "\n\n".join(unparsed)
@@ -1,13 +1,12 @@
 import json
+import time
 import logging
-from typing import List, Dict, Any
+from itertools import chain
+from typing import List, Dict, Any, Optional, Tuple
 import os
-import tempfile
-from PyQt5.QtWidgets import QMessageBox, QProgressDialog, QApplication
-from PyQt5.QtCore import Qt
-import openai
 
-from PyPDF2 import PdfReader
+from llm import chat, estimate_tokens
+from pdf_text import Page, ensure_extracted, extract_pages, format_page, format_pages, iter_page_texts, page_store
 
 # 루트 설정 파일 임포트로 변경
 from settings import settings
@@ -46,63 +45,228 @@ SYSTEM_PROMPT = """
 
 def extract_text_from_pdf(path: str) -> str:
     """
-    PyPDF2를 사용해 PDF 전체 페이지의 텍스트를 추출하여 하나의 문자열로 반환합니다.
+    PDF 전체 페이지의 텍스트를 추출하여 하나의 문자열로 반환합니다.
+    (페이지 구간을 프로세스 풀에서 병렬 추출)
     """
     try:
-        reader = PdfReader(path)
+        pages = extract_pages(path)
     except Exception as e:
         logger.error(f"Failed to open PDF {path}: {e}")
         return ""
-    text_parts = []
-    for i, page in enumerate(reader.pages):
-        try:
-            text = page.extract_text() or ""
-        except Exception as e:
-            logger.warning(f"Failed to extract text from {path} page {i}: {e}")
-            text = ""
-        text_parts.append(f"===PAGE {i+1}===\n{text}")
-    return "\n".join(text_parts)
-
-def analyze_pdfs(pdf_paths, parent=None):
-    try:
-        # Create a temporary file to store the PDF paths
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as temp_file:
-            json.dump(pdf_paths, temp_file)
-            temp_file_path = temp_file.name
-
-        # Create progress dialog
-        progress = QProgressDialog("PDF 분석 중...", "취소", 0, 100, parent)
-        progress.setWindowModality(Qt.WindowModal)
-        progress.show()
-
-        # Initialize OpenAI client
-        client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-
-        # Read the PDF paths from the temporary file
-        with open(temp_file_path, 'r') as f:
-            pdf_paths = json.load(f)
-
-        # Process each PDF
-        for i, pdf_path in enumerate(pdf_paths):
-            if progress.wasCanceled():
+    for i, (_, error) in enumerate(pages):
+        if error is not None:
+            logger.warning(f"Failed to extract text from {path} page {i}: {error}")
+    return format_pages(pages, "===PAGE {n}===", placeholders=False)
+
+# 3) 분석 결과 스키마 (Structured Outputs용 JSON Schema, 검증에도 사용)
+_STRING_ARRAY = {"type": "array", "items": {"type": "string"}}
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "announcement_info": {
+            "type": "object",
+            "properties": {
+                "등록마감": {"type": "string"},
+                "공고명": {"type": "string"},
+                "추정가격": {"type": "string"},
+            },
+            "required": ["등록마감", "공고명", "추정가격"],
+            "additionalProperties": False,
+        },
+        "project_summary": {"type": "string"},
+        "bid_summary": _STRING_ARRAY,
+        "rfp_core_items": _STRING_ARRAY,
+        "submission_documents": _STRING_ARRAY,
+        "rfp_table_of_contents": _STRING_ARRAY,
+    },
+    "required": [
+        "announcement_info", "project_summary", "bid_summary",
+        "rfp_core_items", "submission_documents", "rfp_table_of_contents",
+    ],
+    "additionalProperties": False,
+}
+
+def validate_analysis(data: Any) -> Dict[str, Any]:
+    """
+    분석 결과를 ANALYSIS_SCHEMA에 맞춰 검증/정리합니다.
+
+    빠진 키는 빈 값으로 채우고, 배열 자리에 문자열이 오면 한 항목짜리 배열로 바꾸는 등
+    사소한 차이는 고칩니다. 최상위가 객체가 아니거나 스키마 키가 하나도 없으면
+    ValueError를 발생시킵니다.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"분석 결과가 JSON 객체가 아닙니다: {type(data).__name__}")
+    properties = ANALYSIS_SCHEMA["properties"]
+    if not any(key in data for key in properties):
+        raise ValueError(f"분석 결과에 필요한 키가 없습니다: {', '.join(data) or '(빈 객체)'}")
+
+    result = {}
+    for key, spec in properties.items():
+        value = data.get(key)
+        if value is None:
+            logger.warning(f"분석 결과에 '{key}' 항목이 없어 빈 값으로 채웁니다.")
+        if spec["type"] == "object":
+            value = value if isinstance(value, dict) else {}
+            result[key] = {name: str(value.get(name) or "") for name in spec["properties"]}
+        elif spec["type"] == "array":
+            if isinstance(value, str):
+                value = [value]
+            result[key] = [str(item) for item in value or [] if item not in (None, "")]
+        else:
+            result[key] = "" if value is None else str(value)
+    return result
+
+def build_document_text(pdf_paths: List[str], max_tokens: int,
+                        digests: Optional[Dict[str, Optional[str]]] = None) -> Tuple[str, Dict[str, Tuple[int, int]]]:
+    """
+    여러 PDF의 페이지 텍스트를 토큰 예산 안에서 하나의 프롬프트로 만듭니다.
+
+    전체가 예산 안에 들어가면 모두 넣고, 넘치면 문서마다 예산을 나눠 각 문서의 앞쪽
+    페이지부터 넣습니다 (공고 정보와 목차는 대개 앞부분에 있음). 작은 문서가 남긴 예산은
+    큰 문서가 이어서 씁니다.
+
+    저장소는 한 번만 읽습니다. 문서마다 페이지 크기를 모두 재되, 텍스트는 그 문서가
+    예산 전체를 써도 들어갈 수 있는 앞쪽 페이지까지만 보관합니다.
+
+    Args:
+        digests: ensure_extracted() 결과 (이미 추출했으면 넘겨서 다시 해시하지 않음)
+
+    Returns:
+        (프롬프트 텍스트, {문서명: (넣은 페이지 수, 전체 페이지 수)})
+    """
+    marker = "===PAGE {n}==="
+    if digests is None:
+        digests = ensure_extracted(pdf_paths)
+    paths = [path for path in pdf_paths if digests.get(path)]
+    sizes: Dict[str, List[int]] = {}
+    heads: Dict[str, List[Page]] = {}
+    for path in paths:
+        doc = os.path.basename(path)
+        sizes[path], heads[path] = [], []
+        used = 0
+        for page_no, text, _ in page_store.iter_document(digests[path]):
+            size = estimate_tokens(format_page(page_no, text, marker))
+            sizes[path].append(size)
+            used += size
+            if used <= max_tokens:
+                heads[path].append(Page(doc, page_no, text))
+
+    limits = {}
+    budget = max_tokens
+    for i, path in enumerate(sorted(paths, key=lambda p: sum(sizes[p]))):
+        share = budget // (len(paths) - i)
+        used = count = 0
+        for size in sizes[path]:
+            if used + size > share:
                 break
+            used += size
+            count += 1
+        limits[path] = count
+        budget -= used
 
-            # Update progress
-            progress.setValue(int((i / len(pdf_paths)) * 100))
-            QApplication.processEvents()
+    text = "".join(chain.from_iterable(
+        iter_page_texts(heads[path][:limits[path]], marker) for path in paths
+    ))
+    return text, {os.path.basename(path): (limits[path], len(sizes[path])) for path in paths}
 
-            # Process PDF here
-            # Add your PDF processing logic
+def analyze_pdfs(pdf_paths, prompt=None, progress_callback=None, is_cancelled=None, use_cache=True):
+    """
+    PDF 파일들을 GPT로 분석합니다. 작업 스레드에서 호출되므로 Qt 위젯을 사용하지 않습니다.
 
-        # Clean up
-        os.unlink(temp_file_path)
-        progress.setValue(100)
+    페이지 텍스트 추출(저장소 재사용) → 토큰 예산 프롬프트 구성 → GPT 호출 1회 →
+    결과 검증 순서로 진행하고, 단계별 소요 시간을 로그와 결과의 analysis_meta에 남깁니다.
+    기본 프롬프트는 Structured Outputs(ANALYSIS_SCHEMA)로 호출해 스키마 검증까지 하고,
+    다른 프롬프트(목차 가이드 등)는 JSON 모드로 호출해 파싱한 객체를 그대로 반환합니다.
 
-        return True
+    Args:
+        pdf_paths: 분석할 로컬 PDF 경로 목록
+        prompt: 시스템 프롬프트 대신 사용할 프롬프트 (없으면 SYSTEM_PROMPT)
+        progress_callback: (완료한 단계 수, 전체 단계 수)를 받는 콜백
+        is_cancelled: True를 반환하면 다음 단계로 넘어가지 않고 None을 반환하는 함수
+        use_cache: 응답 캐시 사용 여부 (사용자가 다시 분석을 요청한 경우처럼 새 응답이 필요하면 False)
 
-    except Exception as e:
-        QMessageBox.critical(parent, "오류", f"PDF 분석 중 오류가 발생했습니다: {str(e)}")
-        return False
+    Returns:
+        분석 결과 딕셔너리 (취소되면 None)
+
+    Raises:
+        ValueError: PDF에서 텍스트를 얻지 못했거나 응답이 올바른 JSON/스키마가 아닐 때
+    """
+    stages = 4
+    timings = {}
+    started = time.perf_counter()
+
+    def finish_stage(name, done):
+        nonlocal started
+        now = time.perf_counter()
+        timings[name] = round(now - started, 3)
+        started = now
+        if progress_callback:
+            progress_callback(done, stages)
+        return bool(is_cancelled and is_cancelled())
+
+    # 1) 페이지 텍스트 추출 (저장소에 있으면 재사용)
+    digests = ensure_extracted(pdf_paths)
+    if finish_stage("extract", 1):
+        return None
+
+    # 2) 토큰 예산 안에서 프롬프트 구성
+    text, pages = build_document_text(pdf_paths, settings.ANALYSIS_PROMPT_TOKENS, digests)
+    if not text.strip():
+        raise ValueError("PDF에서 텍스트를 추출할 수 없습니다 (스캔본이거나 손상된 파일).")
+    included = sum(count for count, _ in pages.values())
+    total = sum(count for _, count in pages.values())
+    user_text = f"다음은 입찰 문서 {len(pdf_paths)}개의 텍스트입니다"
+    if included < total:
+        truncated = ", ".join(
+            f"{doc} 앞쪽 {count}/{doc_total}페이지"
+            for doc, (count, doc_total) in pages.items() if count < doc_total
+        )
+        user_text += f" (분량 제한으로 일부 문서는 앞쪽 페이지만 포함: {truncated})"
+    user_text += f".\n{text}"
+    if finish_stage("prompt", 2):
+        return None
+
+    # 3) GPT 호출 (기본 프롬프트는 스키마 고정 출력, 그 외는 JSON 모드)
+    if prompt is None:
+        response_format = {
+            "type": "json_schema",
+            "json_schema": {"name": "bid_analysis", "schema": ANALYSIS_SCHEMA, "strict": True},
+        }
+    else:
+        response_format = {"type": "json_object"}
+    content = chat(
+        [
+            {"role": "system", "content": prompt or SYSTEM_PROMPT},
+            {"role": "user", "content": user_text},
+        ],
+        model=MODEL,
+        temperature=0,
+        use_cache=use_cache,
+        response_format=response_format,
+    )
+    if finish_stage("gpt", 3):
+        return None
+
+    # 4) 파싱 및 스키마 검증
+    try:
+        data = json.loads(clean_gpt_response(content))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"GPT 응답이 올바른 JSON이 아닙니다: {e}\n{content[:500]}")
+    result = validate_analysis(data) if prompt is None else data
+    finish_stage("validate", 4)
+
+    logger.info(
+        f"PDF 분석 완료: {included}/{total}페이지, "
+        + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+    )
+    if isinstance(result, dict):
+        result["analysis_meta"] = {
+            "model": MODEL,
+            "pages_included": included,
+            "pages_total": total,
+            "timings": timings,
+        }
+    return result
 
 def clean_gpt_response(content: str) -> str:
     """
@@ -0,0 +1,154 @@
+# job_executor.py
+# 네트워크/GPT 작업을 GUI 스레드 밖에서 실행하는 공용 작업 실행기 (QThreadPool 기반)
+
+import logging
+import threading
+import traceback
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from task_context import JobCancelled, TaskContext  # JobCancelled는 기존 임포트 경로 유지용
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+class JobSignals(QObject):
+    """
+    작업 스레드 → GUI 스레드 알림용 시그널
+
+    QRunnable은 QObject가 아니므로 시그널을 별도 객체에 둡니다. 연결된 슬롯은
+    (GUI 스레드에 있는 객체라면) 큐 연결로 GUI 스레드에서 실행됩니다.
+    """
+    progress = pyqtSignal(int, str)  # 진행률(0~100), 현재 단계 설명
+    log = pyqtSignal(str)            # 로그 메시지
+    partial = pyqtSignal(object)     # 중간 결과 (스트리밍 응답 조각 등)
+    result = pyqtSignal(object)      # 작업 함수의 반환값
+    error = pyqtSignal(object, str)  # 예외 객체, traceback 문자열
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()          # 성공/실패/취소와 관계없이 마지막에 한 번
+
+class JobContext(TaskContext):
+    """
+    Qt 작업용 TaskContext - 파이프라인 이벤트를 JobSignals로 보냅니다.
+
+    작업 함수는 Qt 위젯을 직접 만지지 않고 이 객체를 통해서만 GUI에 알립니다.
+    """
+
+    def __init__(self, signals, cancel_event):
+        super().__init__(cancel_event=cancel_event)
+        self._signals = signals
+
+    def emit(self, kind, value):
+        if kind == "progress":
+            self._signals.progress.emit(*value)
+        elif kind == "log":
+            self._signals.log.emit(value)
+        elif kind == "partial":
+            self._signals.partial.emit(value)
+
+class Job(QRunnable):
+    """
+    fn(ctx, *args, **kwargs)를 스레드 풀에서 실행하는 작업
+
+    결과는 signals.result, 예외는 signals.error(예외, traceback), 취소는
+    signals.cancelled로 전달됩니다.
+    """
+
+    def __init__(self, name, fn, *args, **kwargs):
+        super().__init__()
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = JobSignals()
+        self._cancel_event = threading.Event()
+        self.context = JobContext(self.signals, self._cancel_event)
+
+    def cancel(self):
+        """취소 요청 (작업 함수가 다음 확인 지점에서 중단)"""
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def run(self):
+        try:
+            result = self.fn(self.context, *self.args, **self.kwargs)
+            if self._cancel_event.is_set():
+                # 취소 확인 지점 이후에 끝난 작업의 결과는 버림
+                self.signals.cancelled.emit()
+            else:
+                self.signals.result.emit(result)
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            logger.error(f"작업 실패 ({self.name}): {e}")
+            self.signals.error.emit(e, traceback.format_exc())
+        finally:
+            self.signals.finished.emit()
+
+class JobExecutor:
+    """
+    애플리케이션 전역 작업 실행기
+
+    실행 중인 Job의 파이썬 참조를 finished까지 보관해, 시그널 객체가 작업 도중
+    가비지 컬렉션되지 않도록 합니다.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or settings.JOB_WORKERS
+        self._pool = None
+        self._jobs = set()
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = QThreadPool()
+            self._pool.setMaxThreadCount(self.max_workers)
+        return self._pool
+
+    def start(self, job):
+        """
+        Job을 스레드 풀에 넣습니다.
+
+        시그널은 start() 전에 연결해야 합니다. 빨리 끝나는 작업은 연결 전에
+        result/finished를 보내 버릴 수 있습니다.
+
+        Returns:
+            전달받은 Job (cancel()로 취소)
+        """
+        job.setAutoDelete(False)
+        with self._lock:
+            self._jobs.add(job)
+        job.signals.finished.connect(lambda: self._discard(job))
+        self.pool.start(job)
+        return job
+
+    def _discard(self, job):
+        with self._lock:
+            self._jobs.discard(job)
+
+    def active_jobs(self):
+        with self._lock:
+            return list(self._jobs)
+
+    def cancel_all(self):
+        for job in self.active_jobs():
+            job.cancel()
+
+def attach_progress_dialog(job, dialog):
+    """
+    QProgressDialog를 Job에 연결합니다.
+
+    진행률/단계 설명을 표시하고, 취소 버튼은 Job.cancel()을 호출하며,
+    작업이 끝나면 대화상자를 닫습니다.
+    """
+    def on_progress(value, text):
+        if text:
+            dialog.setLabelText(text)
+        dialog.setValue(value)
+    job.signals.progress.connect(on_progress)
+    dialog.canceled.connect(job.cancel)
+    job.signals.finished.connect(dialog.close)
+
+# 프로세스 전역 작업 실행기
+job_executor = JobExecutor()
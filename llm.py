@@ -0,0 +1,488 @@
+# llm.py
+# 공용 GPT 호출 계층 (비동기 OpenAI 클라이언트 + 요청 한도/재시도 + 영구 응답 캐시)
+
+import os
+import re
+import json
+import time
+import queue
+import random
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    GPT 응답을 (모델, 시스템 프롬프트, 사용자 내용 해시, temperature 등) 키로 저장하는 SQLite 캐시
+
+    TTL이 지난 항목은 읽을 때 버리고, 전체 크기가 상한을 넘으면 가장 오래 쓰이지
+    않은 항목부터 지웁니다. 같은 문서를 다시 분석하면 API를 호출하지 않고 바로
+    저장된 응답을 돌려줍니다.
+    """
+
+    def __init__(self, db_path: str, ttl: float, max_bytes: int):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, model TEXT, response TEXT, size INTEGER,"
+                " created REAL, last_used REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT response, created FROM responses WHERE key=?", (key,)).fetchone()
+            if row is None:
+                return None
+            with conn:
+                if self.ttl > 0 and row[1] + self.ttl < now:
+                    conn.execute("DELETE FROM responses WHERE key=?", (key,))
+                    return None
+                conn.execute("UPDATE responses SET last_used=? WHERE key=?", (now, key))
+        return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, response, size, created, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, response, size, now, now),
+                )
+                self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        if self.ttl > 0:
+            conn.execute("DELETE FROM responses WHERE created<?", (now - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 오래 쓰이지 않은 항목부터 상한 아래로 내려갈 때까지 삭제
+        excess = total - self.max_bytes
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM responses WHERE key=?", doomed)
+        logger.info(f"GPT 응답 캐시 정리: {len(doomed)}건 삭제")
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"entries": count, "bytes": size, "path": self.db_path}
+
+# 프로세스 전역 응답 캐시
+response_cache = ResponseCache(
+    settings.LLM_CACHE_DB,
+    ttl=settings.LLM_CACHE_TTL,
+    max_bytes=settings.LLM_CACHE_MAX_MB * 1024 * 1024,
+)
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 토큰 수를 어림합니다.
+
+    한글 등 비ASCII 문자는 글자당 1토큰, ASCII 문자는 4자당 1토큰으로 계산합니다
+    (한글 비중이 큰 입찰 문서에서 실제보다 약간 크게 잡히는 쪽).
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (len(text) - ascii_chars) + (ascii_chars + 3) // 4
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """x-ratelimit-reset-* 헤더 값("1s", "6m0s", "250ms")을 초로 바꿉니다."""
+    if not value:
+        return None
+    total = 0.0
+    for number, unit in re.findall(r"([\d.]+)(ms|s|m|h)", value):
+        total += float(number) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total
+
+class TokenBucket:
+    """
+    rate-limit 헤더로 한도를 맞추는 토큰 버킷 (이벤트 루프 안에서만 사용)
+
+    응답의 x-ratelimit-* 헤더를 받기 전에는 제한하지 않습니다. 헤더를 받으면 남은 양을
+    서버 값으로 맞추고, 초기화까지 남은 시간 동안 한도까지 다시 차도록 보충 속도를
+    정합니다 (초기화 시간이 없으면 분당 한도 기준).
+    """
+
+    def __init__(self):
+        self.capacity = None  # 한도 (헤더를 받기 전에는 None)
+        self.available = 0.0
+        self.rate = 0.0  # 초당 보충량
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.capacity:
+            self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float) -> None:
+        while True:
+            self._refill()
+            if not self.capacity or self.rate <= 0:
+                return
+            # 한도보다 큰 요청은 버킷이 가득 찼을 때 보냄
+            amount = min(amount, self.capacity)
+            if self.available >= amount:
+                self.available -= amount
+                return
+            await asyncio.sleep((amount - self.available) / self.rate)
+
+    def update(self, limit: Optional[str], remaining: Optional[str], reset: Optional[str]) -> None:
+        try:
+            limit, remaining = float(limit), float(remaining)
+        except (TypeError, ValueError):
+            return
+        if limit <= 0:
+            return
+        self._refill()
+        self.capacity = limit
+        self.available = min(limit, remaining)
+        reset_seconds = _parse_reset(reset)
+        if reset_seconds and remaining < limit:
+            self.rate = (limit - remaining) / reset_seconds
+        else:
+            self.rate = limit / 60
+
+class AsyncLLMClient:
+    """
+    모든 GPT 호출이 거치는 비동기 OpenAI 클라이언트
+
+    전용 이벤트 루프 스레드 하나에서 API 키별 AsyncOpenAI(HTTP 연결 풀)를 재사용하고,
+    동시 요청 수 세마포어, rate-limit 헤더 기반 요청/토큰 버킷, 429/5xx 지수 백오프를
+    적용합니다. 스레드에서는 chat(), 코루틴에서는 achat()을 씁니다.
+    """
+
+    RETRY_STATUS = (408, 409, 429, 500, 502, 503, 504)
+
+    def __init__(self, max_concurrency: int, max_retries: int, timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._clients: Dict[str, AsyncOpenAI] = {}
+        self._semaphore = None
+        self._request_bucket = TokenBucket()
+        self._token_bucket = TokenBucket()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """처음 필요할 때 이벤트 루프 스레드를 시작합니다."""
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name="llm-loop", daemon=True)
+                self._thread.start()
+                self._loop = loop
+        return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """코루틴을 이벤트 루프 스레드에서 실행하고 결과를 기다립니다 (작업 스레드용)."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def _client(self, api_key: Optional[str]) -> AsyncOpenAI:
+        api_key = api_key or settings.CHATGPT_API_KEY
+        if not api_key:
+            raise ValueError("CHATGPT_API_KEY가 설정되지 않았습니다. .env 파일을 확인하세요.")
+        client = self._clients.get(api_key)
+        if client is None:
+            # 재시도는 rate-limit 헤더를 반영하기 위해 직접 처리
+            client = self._clients[api_key] = AsyncOpenAI(api_key=api_key, max_retries=0, timeout=self.timeout)
+        return client
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1)):
+            try:
+                return float(headers[name]) * scale
+            except (KeyError, TypeError, ValueError):
+                pass
+        delay = min(settings.LLM_BACKOFF_MAX, settings.LLM_BACKOFF_BASE * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    def _should_retry(self, error: Exception) -> bool:
+        if isinstance(error, (APIConnectionError, APITimeoutError)):
+            return True
+        return isinstance(error, APIStatusError) and error.status_code in self.RETRY_STATUS
+
+    def _update_limits(self, headers) -> None:
+        self._request_bucket.update(
+            headers.get("x-ratelimit-limit-requests"),
+            headers.get("x-ratelimit-remaining-requests"),
+            headers.get("x-ratelimit-reset-requests"),
+        )
+        self._token_bucket.update(
+            headers.get("x-ratelimit-limit-tokens"),
+            headers.get("x-ratelimit-remaining-tokens"),
+            headers.get("x-ratelimit-reset-tokens"),
+        )
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _create(self, api_key: Optional[str], request: Dict[str, Any]):
+        """버킷이 허용할 때까지 기다렸다가 요청을 한 번 보냅니다 (재시도/세마포어는 호출자가 처리)."""
+        client = self._client(api_key)
+        prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in request["messages"])
+        await self._request_bucket.acquire(1)
+        await self._token_bucket.acquire(prompt_tokens + (request.get("max_tokens") or 0))
+        try:
+            raw = await client.chat.completions.with_raw_response.create(**request)
+        except Exception as e:
+            response = getattr(e, "response", None)
+            if response is not None:
+                self._update_limits(response.headers)
+            raise
+        self._update_limits(raw.headers)
+        # with_raw_response는 LegacyAPIResponse를 돌려주며 parse()는 동기 함수
+        return raw.parse()
+
+    def _retry_delay_or_raise(self, attempt: int, error: Exception) -> float:
+        if attempt >= self.max_retries or not self._should_retry(error):
+            raise error
+        delay = self._retry_delay(attempt, error)
+        logger.warning(f"GPT 호출 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}초 후): {error}")
+        return delay
+
+    async def complete(self, api_key: Optional[str] = None, **request: Any):
+        """
+        chat.completions.create(**request)를 한도/재시도 정책에 맞춰 호출하고
+        ChatCompletion 객체를 반환합니다.
+        """
+        attempt = 0
+        while True:
+            async with self.semaphore:
+                try:
+                    return await self._create(api_key, request)
+                except Exception as e:
+                    delay = self._retry_delay_or_raise(attempt, e)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def astream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        api_key: Optional[str] = None,
+        use_cache: bool = False,
+        **params: Any,
+    ) -> AsyncIterator[str]:
+        """
+        스트리밍 응답의 텍스트 조각을 도착하는 대로 내보내는 비동기 생성기
+
+        연결(첫 응답 전)까지만 재시도하고, 응답이 끝나거나 생성기가 닫힐 때까지
+        동시 요청 슬롯 하나를 차지합니다. use_cache가 True이면 저장된 응답을 한 조각으로
+        내보내고, 끝까지 받은 응답은 chat()과 같은 키로 저장합니다.
+        """
+        model = model or settings.GPT_MODEL
+        key = cache_key(model, messages, temperature, **params) if use_cache else None
+        if key:
+            cached = await asyncio.to_thread(response_cache.get, key)
+            if cached is not None:
+                logger.info(f"GPT 응답 캐시 사용 ({model})")
+                yield cached
+                return
+        request = dict(params, model=model, messages=messages, stream=True)
+        if temperature is not None:
+            request["temperature"] = temperature
+        async with self.semaphore:
+            attempt = 0
+            while True:
+                try:
+                    stream = await self._create(api_key, request)
+                    break
+                except Exception as e:
+                    delay = self._retry_delay_or_raise(attempt, e)
+                attempt += 1
+                await asyncio.sleep(delay)
+            received = []
+            finish_reason = None
+            try:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    if chunk.choices[0].delta.content:
+                        received.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.close()
+        if key and finish_reason == "stop":
+            await asyncio.to_thread(response_cache.put, key, model, "".join(received))
+
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        use_cache: bool = True,
+        api_key: Optional[str] = None,
+        **params: Any,
+    ) -> str:
+        """chat()의 코루틴 버전 (이벤트 루프 스레드에서 실행)"""
+        model = model or settings.GPT_MODEL
+        key = cache_key(model, messages, temperature, **params) if use_cache else None
+        if key:
+            cached = await asyncio.to_thread(response_cache.get, key)
+            if cached is not None:
+                logger.info(f"GPT 응답 캐시 사용 ({model})")
+                return cached
+
+        request = dict(params, model=model, messages=messages)
+        if temperature is not None:
+            request["temperature"] = temperature
+        completion = await self.complete(api_key, **request)
+        content = completion.choices[0].message.content or ""
+
+        if key and completion.choices[0].finish_reason in ("stop", None):
+            # 길이 제한 등으로 잘린 응답은 저장하지 않음
+            await asyncio.to_thread(response_cache.put, key, model, content)
+        return content
+
+# 프로세스 전역 GPT 클라이언트
+llm_client = AsyncLLMClient(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    max_retries=settings.LLM_MAX_RETRIES,
+    timeout=settings.LLM_TIMEOUT,
+)
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def cache_key(model: str, messages: List[Dict[str, str]], temperature: Optional[float], **params: Any) -> str:
+    """
+    응답 캐시 키
+
+    시스템 프롬프트는 그대로, 사용자/어시스턴트 내용은 해시로 넣고 모델, temperature,
+    그 밖의 요청 인자(max_tokens 등)를 함께 묶어 해시합니다.
+    """
+    system = [m["content"] for m in messages if m["role"] == "system"]
+    conversation = _sha256(json.dumps(
+        [(m["role"], m["content"]) for m in messages if m["role"] != "system"], ensure_ascii=False
+    ))
+    return _sha256(json.dumps(
+        {"model": model, "system": system, "user": conversation, "temperature": temperature, "params": params},
+        ensure_ascii=False, sort_keys=True,
+    ))
+
+def chat(
+    messages: List[Dict[str, str]],
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    use_cache: bool = True,
+    api_key: Optional[str] = None,
+    **params: Any,
+) -> str:
+    """
+    Chat Completions 요청을 보내고 응답 텍스트를 반환합니다.
+
+    use_cache가 True이면 같은 요청의 저장된 응답을 먼저 찾고, 새로 받은 응답은
+    캐시에 저장합니다 (대화형 질문처럼 매번 새 답이 필요한 곳은 False).
+    요청은 llm_client의 이벤트 루프에서 실행되며, 호출한 스레드는 결과를 기다립니다
+    (GUI 스레드에서 호출하지 마십시오).
+
+    Args:
+        messages: [{"role", "content"}, ...]
+        model: 모델명 (기본 settings.GPT_MODEL)
+        temperature: 샘플링 온도 (None이면 API 기본값)
+        use_cache: 응답 캐시 사용 여부
+        api_key: 설정과 다른 키를 쓸 때만 지정
+        **params: max_tokens 등 그 밖의 요청 인자
+    """
+    return llm_client.run(llm_client.achat(messages, model, temperature, use_cache, api_key, **params))
+
+def stream_chat(
+    messages: List[Dict[str, str]],
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    api_key: Optional[str] = None,
+    is_cancelled: Optional[Callable[[], bool]] = None,
+    use_cache: bool = False,
+    **params: Any,
+) -> Iterator[str]:
+    """
+    Chat Completions 스트리밍 응답의 텍스트 조각을 도착하는 대로 내보내는 생성기
+
+    작업 스레드에서 순회합니다. is_cancelled가 True를 반환하거나 생성기를 닫으면
+    요청을 중단하고(연결 종료) 순회를 끝냅니다. 요청 오류는 순회 중에 그대로 발생합니다.
+
+    Args:
+        messages: [{"role", "content"}, ...]
+        model: 모델명 (기본 settings.GPT_MODEL)
+        temperature: 샘플링 온도 (None이면 API 기본값)
+        api_key: 설정과 다른 키를 쓸 때만 지정
+        is_cancelled: 취소 여부를 반환하는 함수
+        use_cache: 응답 캐시 사용 여부 (기본은 대화형 질문용으로 사용 안 함)
+        **params: max_tokens 등 그 밖의 요청 인자
+    """
+    chunks: "queue.Queue" = queue.Queue()
+    done = object()
+
+    async def pump():
+        try:
+            async for delta in llm_client.astream(messages, model, temperature, api_key, use_cache, **params):
+                chunks.put(delta)
+        except Exception as e:
+            chunks.put(e)
+        else:
+            chunks.put(done)
+
+    future = asyncio.run_coroutine_threadsafe(pump(), llm_client.loop)
+    try:
+        while not (is_cancelled and is_cancelled()):
+            try:
+                item = chunks.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # 취소/중단 시 이벤트 루프의 요청도 취소 (스트림 연결 종료)
+        future.cancel()
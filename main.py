@@ -1,22 +1,33 @@
 # main.py
 import sys
+
+# --startup-timing: 시작 단계별 시간과 모듈 임포트 시간을 표준 오류로 출력 (다른 임포트보다 먼저 설치)
+STARTUP_TIMING = "--startup-timing" in sys.argv
+if STARTUP_TIMING:
+    from startup_timing import startup_timer
+    startup_timer.install_import_hook()
+
 import os
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
-    QTableWidget, QTableWidgetItem, QPushButton, QMessageBox,
+    QTableView, QPushButton, QMessageBox, QLineEdit,
     QHeaderView, QToolTip, QFileDialog, QHBoxLayout
 )
 from PyQt5.QtGui import QCursor
-from PyQt5.QtCore import Qt
-from dropbox_client import list_folder, download_json
-from detail_dialog import DetailDialog
-from analyzer import Analyzer
+from PyQt5.QtCore import Qt, QTimer
+from bid_table import (
+    BidTableModel, BidFilterProxyModel, ButtonDelegate, BUTTON_COLUMNS,
+    COL_NO, COL_DEADLINE, COL_TITLE, COL_PRICE, COL_PDF, COL_STATUS
+)
+from job_executor import job_executor
 from typing import List, Dict, Any
 import glob
 import json
-from openai import OpenAI
 from settings import settings
 
+# Dropbox SDK, OpenAI, PyPDF2 등 무거운 모듈(및 이를 불러오는 dropbox_client, smpp_index,
+# change_watcher, detail_dialog, analyzer, llm)은 창이 뜬 뒤 처음 쓰는 곳에서 임포트합니다.
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -40,116 +51,155 @@ class MainWindow(QMainWindow):
         self.fullscreen_button.clicked.connect(self.toggle_fullscreen)
         top_layout.addWidget(self.fullscreen_button)
         
+        # 검색창 (공고명/요약/번호)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("검색 (공고명, 요약, No)")
+        self.search_edit.setClearButtonEnabled(True)
+        top_layout.addWidget(self.search_edit)
+        
         # 상단 레이아웃을 메인 레이아웃에 추가
         layout.addLayout(top_layout)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([
-            "No", "등록마감", "공고명",
-            "추정가격", "PDF", "분석"
-        ])
+        # 모델/뷰 테이블: 셀 위젯 없이 델리게이트가 버튼을 그림
+        self.model = BidTableModel(self)
+        self.proxy = BidFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.search_edit.textChanged.connect(self.proxy.set_search_text)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(-1, Qt.AscendingOrder)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setWordWrap(False)
+        self.table.verticalHeader().setVisible(False)
+        self.button_delegate = ButtonDelegate(self.table)
+        self.button_delegate.clicked.connect(self.on_button_clicked)
+        for col in BUTTON_COLUMNS:
+            self.table.setItemDelegateForColumn(col, self.button_delegate)
         # 인터랙티브 모드: 사용자가 마우스로 열 너비 조절 가능
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setStretchLastSection(True)
         header.sectionResized.connect(self.show_section_width)
         layout.addWidget(self.table)
         # 초기 열 너비 설정 (전체 가로 1250px 기준)
-        self.table.setColumnWidth(0, 30)
-        self.table.setColumnWidth(1, 170)
-        self.table.setColumnWidth(2, 900)
-        self.table.setColumnWidth(3, 200)
-        self.table.setColumnWidth(4, 45)
-        self.table.setColumnWidth(5, 45)
-        # 공고명 클릭 시 analysis.json 상세 보기
-        self.table.cellClicked.connect(self.on_cell_clicked)
+        self.table.setColumnWidth(COL_NO, 30)
+        self.table.setColumnWidth(COL_DEADLINE, 170)
+        self.table.setColumnWidth(COL_TITLE, 600)
+        self.table.setColumnWidth(COL_PRICE, 200)
+        self.table.setColumnWidth(COL_PDF, 45)
+        self.table.setColumnWidth(COL_STATUS, 70)
+
+        self.folders = set()
+        # 진행 중인 분석 작업 (folder_name -> Job)
+        self.analysis_jobs = {}
+        # Dropbox 변경 감시 (longpoll) - 첫 데이터 로드 때 생성
+        self.watcher = None
+        # 진행 중인 smpp.json 갱신 작업, 그동안 또 변경이 오면 끝난 뒤 한 번 더 갱신
+        self.refresh_job = None
+        self.refresh_again = False
+
+    @property
+    def entries(self):
+        """현재 테이블에 표시 중인 항목 목록 (모델의 원본 순서)"""
+        return self.model.entries
+
+    def _start_watcher(self):
+        """Dropbox 변경 감시 시작 (시그널은 GUI 스레드에서 처리됨)"""
+        if self.watcher is None:
+            from change_watcher import ChangeWatcher
+            self.watcher = ChangeWatcher("입찰 2025")
+            self.watcher.folders_changed.connect(self.apply_remote_changes)
+            self.watcher.folders_removed.connect(self.remove_folders)
+            self.watcher.smpp_changed.connect(self.apply_remote_changes)
+        self.watcher.start()
 
     def load_data(self):
-        try:
-            folders = list_folder("입찰 2025")
-        except Exception as e:
-            QMessageBox.warning(self, "Dropbox 에러", f"폴더 리스트를 가져오는 중 오류 발생:\n{e}")
-            folders = []
-
-        try:
-            data = download_json("입찰 2025/smpp.json")
-        except Exception as e:
-            QMessageBox.critical(self, "Dropbox JSON 에러", f"JSON 다운로드 중 오류 발생:\n{e}")
+        """입찰 폴더 목록과 smpp.json을 작업 스레드에서 받아 테이블에 반영합니다."""
+        from job_executor import Job
+
+        def on_result(loaded):
+            folders, folder_error, data = loaded
+            if folder_error is not None:
+                QMessageBox.warning(self, "Dropbox 에러", f"폴더 리스트를 가져오는 중 오류 발생:\n{folder_error}")
+            self.folders = folders
+            self.model.set_entries([
+                item for item in data
+                if item.get("folder_name") in folders
+            ])
+            # 첫 로드 이후에는 변경 감시로 바뀐 행만 갱신
+            self._start_watcher()
+
+        def on_error(error, trace):
+            QMessageBox.critical(self, "Dropbox JSON 에러", f"JSON 다운로드 중 오류 발생:\n{error}")
+
+        self.load_button.setEnabled(False)
+        job = Job("load_data", load_bid_data)
+        job.signals.result.connect(on_result)
+        job.signals.error.connect(on_error)
+        job.signals.finished.connect(lambda: self.load_button.setEnabled(True))
+        job_executor.start(job)
+
+    def apply_remote_changes(self, changed_folders=()):
+        """
+        변경 감시 결과를 반영합니다.
+
+        smpp.json 갱신(rev가 바뀐 경우에만 다시 받음)은 네트워크 호출이고 분석 작업의
+        저장과 잠금을 공유하므로 작업 스레드에서 실행하고, 결과가 오면 모델에서
+        내용이 달라진 행만 다시 그리고 새 항목은 끝에 추가합니다.
+        """
+        from job_executor import Job
+        # 하위 항목 변경으로 온 폴더명은 대소문자가 다를 수 있으므로 알고 있는 폴더명으로 맞춤
+        known = {folder.lower(): folder for folder in self.folders}
+        self.folders.update(known.get(name.lower(), name) for name in changed_folders)
+        if self.refresh_job is not None:
+            self.refresh_again = True
             return
 
-        entries = [
-            item for item in data
-            if item.get("folder_name") in folders
-        ]
-        # 클릭 이벤트에서 참조할 용도
-        self.entries = entries
-
-        self.table.setRowCount(len(entries) * 2)
-        for idx, item in enumerate(entries):
-            info = item.get("announcement_info", {})
-            # PDF 및 analysis_status 매핑
-            pdf_text = "Yes" if item.get("has_pdfs") else "No"
-            status = item.get("analysis_status", "")
-            if status == "completed":
-                analysis_text = "분석완료"
-            elif status == "pending":
-                analysis_text = "분석가능"
-            else:
-                analysis_text = status or ""
-            # 첫 줄: 기본 정보
-            basic = [
-                str(item.get("no", "")),
-                info.get("등록마감", ""),
-                info.get("공고명", ""),
-                info.get("추정가격", ""),
-                pdf_text,
-                analysis_text,
-            ]
-            row0 = idx * 2
-            # 기본 정보 및 버튼 생성
-            self.table.setItem(row0, 0, QTableWidgetItem(basic[0]))
-            self.table.setItem(row0, 1, QTableWidgetItem(basic[1]))
-            title_btn = QPushButton(basic[2])
-            title_btn.setEnabled(status == "completed")
-            title_btn.clicked.connect(lambda _, i=idx: self.show_analysis_detail(i))
-            self.table.setCellWidget(row0, 2, title_btn)
-            self.table.setItem(row0, 3, QTableWidgetItem(basic[3]))
-            self.table.setItem(row0, 4, QTableWidgetItem(basic[4]))
-            status_btn = QPushButton(basic[5])
-            if status == "pending":
-                status_btn.clicked.connect(lambda _, i=idx: self.start_analysis(i))
-            else:
-                status_btn.clicked.connect(lambda _, i=idx: self.show_analysis_detail(i))
-            self.table.setCellWidget(row0, 5, status_btn)
-            # 두번째 줄: 입찰내용 요약 (컬럼 헤더 없음, 전체 열 span)
-            summary = info.get("입찰내용 요약", "")
-            row1 = row0 + 1
-            self.table.setSpan(row1, 0, 1, 6)
-            self.table.setItem(row1, 0, QTableWidgetItem(summary))
-            # 두 번째 줄(요약) 행 높이를 기본 높이의 2배로 설정
-            default_h = self.table.verticalHeader().defaultSectionSize()
-            self.table.setRowHeight(row1, default_h * 2)
-
-        # 테이블 내용에 맞춰 자동 조정하지 않고 초기 열 너비 유지
-        self.table.setColumnWidth(0, 30)
-        self.table.setColumnWidth(1, 170)
-        self.table.setColumnWidth(2, 900)
-        self.table.setColumnWidth(3, 200)
-        self.table.setColumnWidth(4, 45)
-        self.table.setColumnWidth(5, 45)
+        def on_result(data):
+            self.model.set_entries([
+                item for item in data
+                if item.get("folder_name") in self.folders
+            ])
+
+        def on_error(error, trace):
+            print(f"smpp.json 갱신 오류: {error}")
+
+        def on_done():
+            self.refresh_job = None
+            if self.refresh_again:
+                self.refresh_again = False
+                self.apply_remote_changes()
+
+        job = Job("smpp:refresh", refresh_smpp)
+        job.signals.result.connect(on_result)
+        job.signals.error.connect(on_error)
+        job.signals.finished.connect(on_done)
+        self.refresh_job = job_executor.start(job)
+
+    def remove_folders(self, removed_folders):
+        """삭제된 입찰 폴더의 행을 메모리의 목록에서 제거합니다."""
+        self.folders.difference_update(removed_folders)
+        self.model.set_entries([
+            item for item in self.entries
+            if item.get("folder_name") in self.folders
+        ])
 
     def show_section_width(self, index, old_size, new_size):
         # 열 크기 변경 시 마우스 위치에 픽셀 크기 툴팁 표시
         QToolTip.showText(QCursor.pos(), f"{new_size}px")
 
-    def on_cell_clicked(self, row, col):
-        # 공고명(컬럼 인덱스 2)의 첫 번째 줄 클릭 시 분석 상세 열기
-        if col == 2 and row % 2 == 0:
-            idx = row // 2
-            entry = getattr(self, 'entries', [])[idx]
+    def on_button_clicked(self, proxy_index):
+        # 정렬/검색 상태와 무관하게 원본 모델의 행 번호로 변환
+        idx = self.proxy.mapToSource(proxy_index).row()
+        entry = self.entries[idx]
+        if proxy_index.column() == COL_STATUS and entry.get("analysis_status") == "pending":
+            self.start_analysis(idx)
+        elif proxy_index.column() == COL_TITLE and entry.get("analysis_status") != "completed":
             # completed 상태만 상세 보기
-            if entry.get("analysis_status") != "completed":
-                return
+            return
+        else:
             self.show_analysis_detail(idx)
 
     def start_analysis(self, idx):
@@ -157,10 +207,17 @@ class MainWindow(QMainWindow):
         entry = self.entries[idx]
         folder = entry.get("folder_name")
         
-        # Analyzer 클래스를 사용하여 분석 수행
-        if Analyzer.analyze_folder(folder, self):
-            # 분석 성공 시 데이터 다시 로드
-            self.load_data()
+        # 같은 입찰을 중복 분석하지 않음 (다른 입찰은 동시에 분석 가능)
+        if folder in self.analysis_jobs:
+            return
+        # Analyzer 클래스를 사용하여 백그라운드에서 분석 수행
+        from analyzer import Analyzer
+        # 분석 성공 시 바뀐 항목만 다시 그림
+        self.analysis_jobs[folder] = Analyzer.analyze_folder(
+            folder, self,
+            on_finished=lambda _: self.apply_remote_changes(),
+            on_done=lambda: self.analysis_jobs.pop(folder, None),
+        )
 
     def show_analysis_detail(self, idx):
         """세부 대화상자 표시"""
@@ -168,6 +225,7 @@ class MainWindow(QMainWindow):
         folder = entry.get("folder_name")
         
         # DetailDialog 인스턴스 생성 및 표시
+        from detail_dialog import DetailDialog
         detail_dialog = DetailDialog(self, entry, folder)
         detail_dialog.exec_()
 
@@ -200,6 +258,45 @@ class MainWindow(QMainWindow):
         else:
             super().keyPressEvent(event)
 
+    def closeEvent(self, event):
+        """창 닫기 시 변경 감시 중지 및 진행 중인 작업 취소"""
+        if self.watcher is not None:
+            self.watcher.stop()
+        job_executor.cancel_all()
+        super().closeEvent(event)
+
+def load_bid_data(ctx):
+    """
+    입찰 폴더 목록과 smpp.json 항목을 가져옵니다 (작업 스레드에서 실행).
+
+    폴더 목록을 못 가져오면 빈 목록과 오류를 함께 반환하고, smpp.json 오류는 그대로 발생시킵니다.
+
+    Returns:
+        (폴더명 집합, 폴더 목록 오류 또는 None, smpp.json 항목 목록)
+    """
+    import dropbox
+    from dropbox_client import iter_folder
+    from smpp_index import smpp_index
+    folder_error = None
+    try:
+        # 페이지 수와 관계없이 전체 입찰 폴더 목록을 스트리밍으로 수집
+        folders = {
+            entry.name for entry in iter_folder("입찰 2025")
+            if isinstance(entry, dropbox.files.FolderMetadata)
+        }
+    except Exception as e:
+        folder_error = e
+        folders = set()
+    # 원격 rev가 바뀐 경우에만 smpp.json을 다시 받음
+    smpp_index.refresh()
+    return folders, folder_error, smpp_index.entries()
+
+def refresh_smpp(ctx):
+    """smpp.json을 갱신하고 항목 목록을 반환합니다 (작업 스레드에서 실행)."""
+    from smpp_index import smpp_index
+    smpp_index.refresh()
+    return smpp_index.entries()
+
 def build_prompt(pdf_files):
     docs_list = '\n'.join(pdf_files)
     return f"""
@@ -257,8 +354,7 @@ Do not hard-code filenames; dynamically discover PDFs with glob. Ensure JSON is
 """
 
 def extract_toc_and_guidelines():
-    import os
-    from settings import settings
+    from llm import chat
     pdf_files = glob.glob('*.pdf')
     if not pdf_files:
         raise FileNotFoundError("No PDF files found in current directory.")
@@ -269,16 +365,7 @@ def extract_toc_and_guidelines():
         {"role": "user", "content": prompt}
     ]
 
-    api_key = settings.CHATGPT_API_KEY
-    model = settings.GPT_MODEL
-    client = OpenAI(api_key=api_key)
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=0
-    )
-
-    content = response.choices[0].message.content.strip()
+    content = chat(messages, model=settings.GPT_MODEL, temperature=0).strip()
     try:
         result = json.loads(content)
     except json.JSONDecodeError:
@@ -289,7 +376,22 @@ def extract_toc_and_guidelines():
     print(json.dumps(result, ensure_ascii=False, indent=2))
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    if STARTUP_TIMING:
+        startup_timer.mark("모듈 임포트")
+    app = QApplication([arg for arg in sys.argv if arg != "--startup-timing"])
+    if STARTUP_TIMING:
+        startup_timer.mark("QApplication 생성")
     window = MainWindow()
+    if STARTUP_TIMING:
+        startup_timer.mark("MainWindow 생성")
     window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    if STARTUP_TIMING:
+        startup_timer.mark("show()")
+
+        # 이벤트 루프가 처음 돌 때(창이 그려진 직후) 보고서 출력
+        def report_startup():
+            startup_timer.mark("첫 이벤트 루프 (창 표시)")
+            startup_timer.uninstall_import_hook()
+            print(startup_timer.report(), file=sys.stderr)
+        QTimer.singleShot(0, report_startup)
+    sys.exit(app.exec_())
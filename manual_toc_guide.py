@@ -7,12 +7,18 @@ from PyQt5.QtCore import Qt
 import os
 import json
 import tempfile
-from dropbox_client import list_folder, download_file, upload_file, upload_json
+from dropbox_client import list_files, download_files, TransferCancelled, upload_file, upload_json
+from job_executor import Job, JobCancelled, job_executor, attach_progress_dialog
 from dotenv import load_dotenv
 from PyPDF2 import PdfReader, PdfWriter
+from pdf_text import iter_pages
+from llm import chat
 import re
 from settings import settings
 
+# 자동 분석 시 GPT에 보내는 PDF 내용 최대 글자 수
+MAX_PROMPT_CHARS = 4000
+
 class ManualTocGuideDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -31,11 +37,12 @@ class ManualTocGuideDialog(QDialog):
         self.folder = getattr(parent, 'folder', None)
         
         # PDF 파일 목록 가져오기
+        self.pdf_entries = []
         self.pdf_files = []
         if self.folder:
             try:
-                files = list_folder(f"입찰 2025/{self.folder}")
-                self.pdf_files = [f for f in files if f.lower().endswith('.pdf')]
+                self.pdf_entries = list_files(f"입찰 2025/{self.folder}", ".pdf")
+                self.pdf_files = [entry.name for entry in self.pdf_entries]
             except Exception as e:
                 QMessageBox.warning(self, "PDF 목록 오류", f"PDF 파일 목록을 가져오는 중 오류 발생:\n{e}")
         
@@ -128,107 +135,139 @@ class ManualTocGuideDialog(QDialog):
             QMessageBox.warning(self, "폴더 없음", f"로컬 폴더를 찾을 수 없습니다:\n{folder_path}")
     
     def auto_analyze(self):
-        """PDF 자동 분석"""
+        """PDF 자동 분석 (백그라운드)"""
         if not self.folder or not self.pdf_files:
             return
             
-        try:
-            # 진행 상태 대화상자 생성
-            progress = QProgressDialog("PDF 분석 중...", "취소", 0, 100, self)
-            progress.setWindowTitle("목차 가이드 생성")
-            progress.setModal(True)
-            progress.show()
-            
-            # 임시 폴더 생성
-            temp_dir = tempfile.mkdtemp()
-            local_paths = []
-            
-            # PDF 파일 다운로드
-            progress.setLabelText("PDF 파일 다운로드 중...")
-            for i, pdf in enumerate(self.pdf_files):
-                progress.setValue(int(i / len(self.pdf_files) * 10))
-                if progress.wasCanceled():
-                    return
-                local_path = os.path.join(temp_dir, pdf)
-                download_file(f"입찰 2025/{self.folder}/{pdf}", local_path)
-                local_paths.append(local_path)
-            
-            # PDF 내용 추출 및 목차/가이드 페이지 추출
-            progress.setLabelText("PDF 내용 분석 중...")
-            progress.setValue(20)
-            
-            all_text = ""
-            toc_writer = PdfWriter()
-            keywords = ["목차", "작성 가이드", "제안서 작성 안내"]
-            found_pages = 0
-            for pdf_path in local_paths:
-                reader = PdfReader(pdf_path)
-                for i, page in enumerate(reader.pages):
-                    text = page.extract_text() or ""
-                    all_text += text + "\n\n"
-                    if any(keyword in text for keyword in keywords):
-                        toc_writer.add_page(page)
-                        found_pages += 1
-            
-            # 목차.pdf 저장
-            folder_path = os.path.join(self.local_base_path, self.folder)
-            if not os.path.exists(folder_path):
-                os.makedirs(folder_path)
-            toc_pdf_path = os.path.join(folder_path, "목차.pdf")
-            if found_pages > 0:
-                with open(toc_pdf_path, "wb") as f:
-                    toc_writer.write(f)
-            
-            # ChatGPT API 호출 (openai 최신 방식)
-            progress.setLabelText("ChatGPT 분석 중...")
-            progress.setValue(40)
-            import openai
-            from openai import OpenAI
-            api_key = os.getenv("CHATGPT_API_KEY")
-            if not api_key:
-                raise ValueError(".env 파일에 CHATGPT_API_KEY가 없습니다.")
-            client = OpenAI(api_key=api_key)
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "당신은 입찰 제안서 작성 전문가입니다."},
-                    {"role": "user", "content": f"{self.prompt_text}\n\nPDF 내용:\n{all_text[:4000]}"}
-                ]
-            )
-            result = response.choices[0].message.content
-            
-            # 결과를 JSON으로 변환
-            progress.setLabelText("결과 저장 중...")
-            progress.setValue(80)
-            toc_match = re.search(r'\[목차\](.*?)(?=\[작성 가이드\]|$)', result, re.DOTALL)
-            guide_match = re.search(r'\[작성 가이드\](.*?)$', result, re.DOTALL)
-            toc_content = toc_match.group(1).strip() if toc_match else ""
-            guide_content = guide_match.group(1).strip() if guide_match else ""
-            json_data = {
-                "toc": toc_content,
-                "guide": guide_content,
-                "source_files": self.pdf_files
-            }
-            # JSON 파일 저장
-            json_path = os.path.join(folder_path, "목차가이드.json")
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(json_data, f, ensure_ascii=False, indent=2)
-            # 텍스트 파일 저장
-            txt_path = os.path.join(folder_path, "목차가이드.txt")
-            with open(txt_path, "w", encoding="utf-8") as f:
-                f.write(result)
-            # Dropbox에 업로드
-            upload_json(f"입찰 2025/{self.folder}/목차가이드.json", json_data)
-            progress.setValue(100)
+        # 진행 상태 대화상자 생성
+        progress = QProgressDialog("PDF 분석 중...", "취소", 0, 100, self)
+        progress.setWindowTitle("목차 가이드 생성")
+        progress.setModal(True)
+        progress.setAutoClose(False)
+        progress.show()
+        
+        job = Job(
+            f"manual_toc:{self.folder}", ManualTocGuideDialog._run_auto_analyze,
+            self.folder, self.pdf_entries, self.pdf_files, self.prompt_text, self.local_base_path,
+        )
+        attach_progress_dialog(job, progress)
+        
+        def on_result(result):
+            text, folder_path = result
             QMessageBox.information(self, "완료", 
                 f"목차 가이드 생성이 완료되었습니다.\n"
                 f"저장 위치: {folder_path}\n"
                 f"- 목차가이드.txt\n"
                 f"- 목차가이드.json\n"
                 f"- 목차.pdf (목차/가이드 관련 페이지)\n")
-            self.result_edit.setPlainText(result)
-        except Exception as e:
-            QMessageBox.critical(self, "분석 오류", f"PDF 분석 중 오류가 발생했습니다:\n{str(e)}")
+            self.result_edit.setPlainText(text)
+        
+        job.signals.result.connect(on_result)
+        job.signals.error.connect(
+            lambda error, trace: QMessageBox.critical(self, "분석 오류", f"PDF 분석 중 오류가 발생했습니다:\n{str(error)}"))
+        job_executor.start(job)
+    
+    @staticmethod
+    def _run_auto_analyze(ctx, folder, pdf_entries, pdf_files, prompt_text, local_base_path):
+        """
+        자동 분석 파이프라인 (작업 스레드에서 실행, Qt 위젯 사용 안 함)
+        
+        Returns:
+            (GPT 결과 텍스트, 로컬 저장 폴더)
+        """
+        # 임시 폴더 생성
+        temp_dir = tempfile.mkdtemp()
+        
+        # PDF 파일 동시 다운로드
+        ctx.progress(0, "PDF 파일 다운로드 중...")
+        def on_downloaded(done, total, entry, cached):
+            ctx.progress(int(done / total * 10))
+        try:
+            local_paths, _ = download_files(
+                pdf_entries, temp_dir,
+                progress_callback=on_downloaded,
+                is_cancelled=ctx.is_cancelled,
+            )
+        except TransferCancelled:
+            raise JobCancelled()
+        
+        # PDF 내용 추출 및 목차/가이드 페이지 추출
+        ctx.progress(20, "PDF 내용 분석 중...")
+        
+        # GPT에는 앞부분 MAX_PROMPT_CHARS자만 보내므로 그만큼만 모음
+        text_parts = []
+        text_size = 0
+        toc_writer = PdfWriter()
+        keywords = ["목차", "작성 가이드", "제안서 작성 안내"]
+        found_pages = 0
+        matches = {}  # 파일명 → 키워드가 나온 페이지 번호(1부터)
+        # 페이지 텍스트 저장소에 있으면 재사용, 없으면 병렬 추출 후 저장
+        for page in iter_pages(local_paths):
+            text = page.text or ""
+            if text_size < MAX_PROMPT_CHARS:
+                part = (text + "\n\n")[:MAX_PROMPT_CHARS - text_size]
+                text_parts.append(part)
+                text_size += len(part)
+            if any(keyword in text for keyword in keywords):
+                matches.setdefault(page.doc, []).append(page.page_no)
+        ctx.check_cancelled()
+        all_text = "".join(text_parts)
+        for pdf_path in local_paths:
+            pages = matches.get(os.path.basename(pdf_path))
+            if pages:
+                # 목차.pdf용 페이지 객체가 필요한 경우에만 PDF를 엶
+                reader = PdfReader(pdf_path)
+                for page_no in pages:
+                    toc_writer.add_page(reader.pages[page_no - 1])
+                    found_pages += 1
+        
+        # 목차.pdf 저장
+        folder_path = os.path.join(local_base_path, folder)
+        if not os.path.exists(folder_path):
+            os.makedirs(folder_path)
+        toc_pdf_path = os.path.join(folder_path, "목차.pdf")
+        if found_pages > 0:
+            with open(toc_pdf_path, "wb") as f:
+                toc_writer.write(f)
+        
+        # ChatGPT API 호출 (openai 최신 방식)
+        ctx.progress(40, "ChatGPT 분석 중...")
+        api_key = os.getenv("CHATGPT_API_KEY")
+        if not api_key:
+            raise ValueError(".env 파일에 CHATGPT_API_KEY가 없습니다.")
+        result = chat(
+            [
+                {"role": "system", "content": "당신은 입찰 제안서 작성 전문가입니다."},
+                {"role": "user", "content": f"{prompt_text}\n\nPDF 내용:\n{all_text}"}
+            ],
+            model="gpt-4",
+            api_key=api_key,
+        )
+        ctx.check_cancelled()
+        
+        # 결과를 JSON으로 변환
+        ctx.progress(80, "결과 저장 중...")
+        toc_match = re.search(r'\[목차\](.*?)(?=\[작성 가이드\]|$)', result, re.DOTALL)
+        guide_match = re.search(r'\[작성 가이드\](.*?)$', result, re.DOTALL)
+        toc_content = toc_match.group(1).strip() if toc_match else ""
+        guide_content = guide_match.group(1).strip() if guide_match else ""
+        json_data = {
+            "toc": toc_content,
+            "guide": guide_content,
+            "source_files": pdf_files
+        }
+        # JSON 파일 저장
+        json_path = os.path.join(folder_path, "목차가이드.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(json_data, f, ensure_ascii=False, indent=2)
+        # 텍스트 파일 저장
+        txt_path = os.path.join(folder_path, "목차가이드.txt")
+        with open(txt_path, "w", encoding="utf-8") as f:
+            f.write(result)
+        # Dropbox에 업로드
+        upload_json(f"입찰 2025/{folder}/목차가이드.json", json_data)
+        ctx.progress(100)
+        return result, folder_path
     
     def save_result(self):
         """결과 저장"""
@@ -0,0 +1,160 @@
+# page_index.py
+# 여러 PDF 페이지의 (문서, 페이지) 색인 - 전체 페이지 번호, 텍스트 지문, 제목 줄 조회
+
+import hashlib
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from pdf_text import Page, PageTextStore, page_store
+
+# 비교 시 무시하는 문자 (공백, 문장부호, 괄호 등 - 한글/영문/숫자만 남김)
+_NOISE = re.compile(r"[^0-9A-Za-z가-힣]+")
+# 제목 후보로 색인하는 줄의 최대 길이 (정규화 후)
+TITLE_LINE_CHARS = 40
+# 정규화한 제목이 이보다 짧으면 페이지 본문 포함 여부로는 찾지 않음 (오탐 방지)
+MIN_TITLE_CHARS = 2
+
+PageKey = Tuple[str, int]
+
+def normalize(text: str) -> str:
+    """비교용 정규화 - 공백/문장부호를 지우고 영문은 소문자로 (예: "[별지 제1호] 위 임 장" → "별지제1호위임장")"""
+    return _NOISE.sub("", text).lower()
+
+def fingerprint(text: Optional[str]) -> str:
+    """페이지 텍스트 지문 (정규화한 텍스트의 해시 앞 16자리, 텍스트가 없으면 빈 문자열)"""
+    if not text:
+        return ""
+    return hashlib.sha1(normalize(text).encode("utf-8")).hexdigest()[:16]
+
+class PageIndex:
+    """
+    텍스트 추출 중 쌓는 페이지 색인
+
+    - (문서, 페이지) → 텍스트 지문
+    - 문서별 전체 페이지 번호 시작 위치 (여러 PDF를 이어 붙인 순서 기준)
+    - 제목처럼 짧은 줄의 정규화 텍스트 → 그 줄이 있는 (문서, 페이지) 목록
+
+    GPT가 doc을 빠뜨리거나 틀린 서식도 제목 한 번 조회로 실제 페이지를 찾을 수 있어,
+    PDF를 다시 열어 페이지 수를 확인할 필요가 없습니다. 페이지 본문은 보관하지 않으므로
+    메모리는 묶음 크기가 아니라 제목 줄 수에 비례하고, 본문 확인(page_contains)이
+    필요하면 해당 페이지 하나만 텍스트 저장소에서 다시 읽습니다.
+    """
+
+    def __init__(self, digests: Optional[Dict[str, str]] = None, store: PageTextStore = page_store):
+        """
+        Args:
+            digests: {문서명(파일명): 내용 해시} - 본문 확인 때 저장소에서 페이지를 찾는 키
+                     (없는 문서는 본문 확인을 하지 않음)
+            store: 페이지 텍스트 저장소
+        """
+        self.digests = dict(digests or {})
+        self.store = store
+        self.fingerprints: Dict[PageKey, str] = {}
+        self.page_counts: Dict[str, int] = {}
+        self.offsets: Dict[str, int] = {}       # 문서 → 그 문서 앞까지의 페이지 수
+        self._docs: List[str] = []              # 추가된 순서
+        self._starts: List[int] = []            # _docs와 같은 순서의 offsets 값
+        self._titles: Dict[str, List[PageKey]] = {}
+        self.total_pages = 0                    # page_counts 값의 합 (add()마다 갱신)
+
+    def add(self, page: Page) -> None:
+        """페이지 하나를 색인에 추가합니다 (이미 있는 페이지는 무시)."""
+        key = (page.doc, page.page_no)
+        if key in self.fingerprints:
+            return
+        if page.doc not in self.offsets:
+            self.offsets[page.doc] = self.total_pages
+            self._docs.append(page.doc)
+            self._starts.append(self.total_pages)
+        count = self.page_counts.get(page.doc, 0)
+        if page.page_no > count:
+            self.page_counts[page.doc] = page.page_no
+            self.total_pages += page.page_no - count
+        self.fingerprints[key] = fingerprint(page.text)
+        seen: Set[str] = set()
+        for line in (page.text or "").splitlines():
+            line_key = normalize(line)
+            if MIN_TITLE_CHARS <= len(line_key) <= TITLE_LINE_CHARS and line_key not in seen:
+                seen.add(line_key)
+                self._titles.setdefault(line_key, []).append(key)
+
+    def track(self, pages: Iterable[Page]) -> Iterator[Page]:
+        """페이지를 그대로 내보내면서 색인에 추가하는 생성기 (iter_pages()를 감싸 사용)"""
+        for page in pages:
+            self.add(page)
+            yield page
+
+    def has_page(self, doc: Optional[str], page_no: int) -> bool:
+        return (doc, page_no) in self.fingerprints
+
+    def global_page(self, doc: str, page_no: int) -> int:
+        """문서 내 페이지 번호 → 전체 묶음에서의 페이지 번호 (1부터)"""
+        return self.offsets[doc] + page_no
+
+    def locate(self, global_page: int) -> Optional[PageKey]:
+        """전체 페이지 번호 → (문서, 문서 내 페이지 번호)"""
+        i = bisect_right(self._starts, global_page - 1) - 1
+        if i < 0:
+            return None
+        doc = self._docs[i]
+        page_no = global_page - self._starts[i]
+        return (doc, page_no) if self.has_page(doc, page_no) else None
+
+    def find_title(self, title: str) -> List[PageKey]:
+        """제목과 같은 줄이 있는 (문서, 페이지) 목록 (색인 순서)"""
+        return list(self._titles.get(normalize(title or ""), ()))
+
+    def page_contains(self, key: PageKey, title: str) -> bool:
+        """페이지 본문에 제목이 (공백/문장부호 무시하고) 들어 있는지 (본문은 저장소에서 읽음)"""
+        title_key = normalize(title or "")
+        digest = self.digests.get(key[0])
+        if len(title_key) < MIN_TITLE_CHARS or not digest or not self.fingerprints.get(key):
+            return False
+        page = self.store.get_page(digest, key[1])
+        return bool(page and page[0]) and title_key in normalize(page[0])
+
+    def resolve(self, doc: Optional[str], page_no: int, title: Optional[str] = None,
+                candidates: Optional[Sequence[str]] = None) -> Optional[PageKey]:
+        """
+        GPT가 알려 준 (문서, 페이지, 제목)을 실제 (문서, 페이지)로 바로잡습니다.
+
+        1. 지정 문서의 해당 페이지에 제목이 있으면 (또는 제목/텍스트가 없으면) 그대로
+        2. 제목 줄 색인에서 같은 페이지 번호를 가진 문서
+        3. 지정 문서에 그 페이지가 없을 때만: 지정 문서의 다른 페이지 (여럿이면 지정한
+           페이지 번호에 가장 가까운 것), 또는 유일한 결과 (여러 문서에 같은 내용의
+           페이지가 있으면 지문이 같으므로 첫 문서)
+        4. 같은 페이지 번호를 가진 문서 중 본문에 제목이 들어 있는 문서
+        5. 그래도 없으면 지정 문서, 그다음 해당 페이지가 있는 첫 문서
+
+        Args:
+            candidates: 찾을 문서 범위 (기본은 색인의 모든 문서)
+
+        Returns:
+            (문서, 페이지) - 해당 페이지가 어디에도 없으면 None
+        """
+        docs = [d for d in (candidates or self._docs) if d in self.offsets]
+        in_docs = [(d, page_no) for d in docs if self.has_page(d, page_no)]
+        exact = (doc, page_no) if doc in docs and self.has_page(doc, page_no) else None
+
+        if exact and (not title or not self.fingerprints[exact] or self.page_contains(exact, title)):
+            return exact
+        if title:
+            hits = [key for key in self.find_title(title) if key[0] in docs]
+            same_page = [key for key in hits if key[1] == page_no]
+            if same_page:
+                return same_page[0]
+            if exact is None:
+                # 목차 등 다른 페이지의 같은 줄로 옮겨 가지 않도록 지정한 (문서, 페이지)가 없을 때만 사용
+                same_doc = [key for key in hits if key[0] == doc]
+                if same_doc:
+                    # 목차와 본문에 같은 줄이 있으면 GPT가 말한 페이지에 가까운 쪽
+                    return min(same_doc, key=lambda key: abs(key[1] - page_no))
+                if hits and len({self.fingerprints[key] for key in hits}) == 1:
+                    return hits[0]
+            for key in in_docs:
+                if self.page_contains(key, title):
+                    return key
+        if exact:
+            return exact
+        return in_docs[0] if in_docs else None
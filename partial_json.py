@@ -0,0 +1,190 @@
+# partial_json.py
+# 조각으로 들어오는 GPT 응답 JSON을 한 번만 훑으며 구조를 추적하고, 잘리거나 조금 깨진 JSON을 복구
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+class _Frame:
+    """열려 있는 객체/배열 하나 (start는 정리된 텍스트에서의 시작 위치)"""
+    __slots__ = ("kind", "start", "key", "expect_key", "strings")
+
+    def __init__(self, kind: str, start: int):
+        self.kind = kind
+        self.start = start
+        self.key = None          # 객체에서 마지막으로 읽은 키
+        self.expect_key = kind == "{"
+        self.strings: Dict[str, str] = {}  # 객체의 문자열 값 (키 → 값)
+
+class PartialJSONParser:
+    """
+    GPT 응답을 조각 단위로 받아 JSON 구조를 추적하는 증분 파서
+
+    - 첫 '{' 또는 '[' 앞의 설명문/코드 블록 표시와 최상위 값 뒤의 텍스트는 무시합니다.
+    - 문자열 밖의 // 및 /* */ 주석, 닫는 괄호 앞의 쉼표는 지우고 정리된 텍스트를 만듭니다.
+    - 객체가 닫힐 때마다 on_object(객체, 조상 프레임 목록)를 호출하므로, 응답이 끝나기
+      전에 완성된 항목부터 검증/사용할 수 있습니다. select(조상 프레임 목록)를 주면
+      True인 위치의 객체만 파싱해 넘깁니다.
+    - value()는 지금까지 받은 부분에서 마지막으로 완성된 값까지를 닫아 파싱합니다
+      (응답이 잘려도 앞부분은 살림).
+
+    구조 추적은 각 문자를 한 번만 훑습니다. on_object로 넘기는 객체는 닫힐 때 그 부분을
+    한 번 더 파싱하므로, 최상위 객체처럼 다른 객체를 품은 객체까지 모두 넘기면 비용이
+    중첩 깊이만큼 늘어납니다 - 필요한 항목만 select로 고르십시오.
+    """
+
+    def __init__(self, on_object: Optional[Callable[[Any, List[_Frame]], None]] = None,
+                 select: Optional[Callable[[List[_Frame]], bool]] = None):
+        self.on_object = on_object
+        self.select = select
+        self.out: List[str] = []       # 주석/불필요한 쉼표를 지운 텍스트
+        self.stack: List[_Frame] = []
+        self.started = False
+        self.done = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._comment = None           # None, "//", "/*"
+        self._pending_slash = False
+        self._prev = ""                # 주석 안에서 직전 문자 (*/ 확인용)
+        # (정리된 텍스트 길이, 그 시점에 열려 있던 괄호들) - 잘린 응답 복구 지점
+        self._cuts: List[Tuple[int, str]] = []
+
+    def feed(self, text: str) -> None:
+        for ch in text:
+            if self.done:
+                return
+            self._feed_char(ch)
+
+    def _feed_char(self, ch: str) -> None:
+        if not self.started:
+            if ch in "{[":
+                self.started = True
+                self._open(ch)
+            return
+
+        if self._in_string:
+            self.out.append(ch)
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                self._close_string()
+            return
+
+        if self._comment == "//":
+            if ch == "\n":
+                self._comment = None
+            return
+        if self._comment == "/*":
+            if self._prev == "*" and ch == "/":
+                self._comment = None
+            self._prev = ch
+            return
+        if self._pending_slash:
+            self._pending_slash = False
+            if ch in "/*":
+                self._comment = "//" if ch == "/" else "/*"
+                self._prev = ""
+                return
+            self.out.append("/")
+
+        if ch == "/":
+            self._pending_slash = True
+        elif ch == '"':
+            self._in_string = True
+            self._string_start = len(self.out)
+            self.out.append(ch)
+        elif ch in "{[":
+            self._open(ch)
+        elif ch in "}]":
+            self._close(ch)
+        elif ch == ",":
+            self._strip_trailing(",")
+            frame = self.stack[-1]
+            self._cuts.append((len(self.out), "".join(f.kind for f in self.stack)))
+            self.out.append(ch)
+            if frame.kind == "{":
+                frame.expect_key = True
+        elif ch == ":":
+            self.out.append(ch)
+            self.stack[-1].expect_key = False
+        else:
+            self.out.append(ch)
+
+    def _open(self, ch: str) -> None:
+        self.stack.append(_Frame(ch, len(self.out)))
+        self.out.append(ch)
+
+    def _close(self, ch: str) -> None:
+        frame = self.stack[-1]
+        if (frame.kind == "{") != (ch == "}"):
+            # 괄호 짝이 맞지 않으면 열린 쪽에 맞춰 닫음
+            ch = "}" if frame.kind == "{" else "]"
+        self._strip_trailing(",")
+        self.out.append(ch)
+        self.stack.pop()
+        self._cuts.append((len(self.out), "".join(f.kind for f in self.stack)))
+        if frame.kind == "{" and self.on_object and (self.select is None or self.select(self.stack)):
+            try:
+                obj = json.loads("".join(self.out[frame.start:]))
+            except json.JSONDecodeError:
+                obj = None
+            if obj is not None:
+                self.on_object(obj, self.stack)
+        if not self.stack:
+            self.done = True
+
+    def _close_string(self) -> None:
+        frame = self.stack[-1]
+        if frame.kind != "{":
+            return
+        try:
+            value = json.loads("".join(self.out[self._string_start:]))
+        except json.JSONDecodeError:
+            return
+        if frame.expect_key:
+            frame.key = value
+        elif frame.key is not None:
+            frame.strings[frame.key] = value
+
+    def _strip_trailing(self, char: str) -> None:
+        """직전 의미 있는 문자가 char이면 지웁니다 (예: ',]' / ',,')."""
+        i = len(self.out) - 1
+        while i >= 0 and self.out[i].isspace():
+            i -= 1
+        if i >= 0 and self.out[i] == char:
+            del self.out[i]
+
+    def value(self) -> Any:
+        """
+        지금까지 받은 텍스트의 값
+
+        완성된 JSON이면 그대로, 잘린 경우 마지막으로 완성된 항목까지를 닫아서 파싱합니다.
+        쓸 수 있는 부분이 없으면 ValueError를 발생시킵니다.
+        """
+        if not self.started:
+            raise ValueError("응답에 JSON이 없습니다.")
+        text = "".join(self.out)
+        if self.done:
+            return json.loads(text)
+        closers = {"{": "}", "[": "]"}
+        for length, kinds in reversed(self._cuts):
+            candidate = text[:length] + "".join(closers[k] for k in reversed(kinds))
+            try:
+                return json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+        # 완성된 항목이 하나도 없으면 빈 최상위 값
+        return {} if self.stack[0].kind == "{" else []
+
+def loads_tolerant(text: str) -> Any:
+    """
+    설명문, 코드 블록 표시, 주석, 불필요한 쉼표가 섞이거나 끝이 잘린 JSON을 최대한 파싱합니다.
+
+    쓸 수 있는 JSON이 없으면 ValueError를 발생시킵니다.
+    """
+    parser = PartialJSONParser()
+    parser.feed(text)
+    return parser.value()
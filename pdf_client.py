@@ -9,12 +9,14 @@ import re
 import tempfile
 import shutil
 from dotenv import load_dotenv
-from PyPDF2 import PdfReader, PdfWriter
-from openai import OpenAI
 from settings import settings
 
 # Dropbox 클라이언트 임포트
-from dropbox_client import upload_file, upload_json
+from dropbox_client import upload_files, upload_json
+from pdf_text import ensure_extracted, extract_pages, format_pages, iter_pages, page_store
+from form_detection import detect_forms, select_candidate_pages
+from pdf_split import PageSplit, split_pages
+from page_index import PageIndex
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -31,26 +33,16 @@ DROPBOX_SHARED_FOLDER_NAME = os.getenv("DROPBOX_SHARED_FOLDER_NAME", "입찰 202
 DEBUG = False
 
 def extract_text_from_pdf(path: str) -> str:
-    """PDF 파일에서 텍스트 추출"""
+    """PDF 파일에서 텍스트 추출 (페이지 구간을 프로세스 풀에서 병렬 추출)"""
     try:
-        reader = PdfReader(path)
-        text_parts = []
-        
-        for i, page in enumerate(reader.pages):
-            try:
-                text = page.extract_text() or ""
-                if text.strip():
-                    text_parts.append(f"--- PAGE {i+1} ---\n{text}")
-                else:
-                    text_parts.append(f"--- PAGE {i+1} ---\n[Page {i+1} has no extractable text]")
-            except Exception as e:
-                logger.warning(f"페이지 {i+1} 텍스트 추출 오류: {e}")
-                text_parts.append(f"--- PAGE {i+1} ---\n[Error: {str(e)}]")
-        
-        return "\n".join(text_parts)
+        pages = extract_pages(path)
     except Exception as e:
         logger.error(f"PDF 파일 텍스트 추출 오류: {e}")
         return f"[Error extracting text: {str(e)}]"
+    for i, (_, error) in enumerate(pages):
+        if error is not None:
+            logger.warning(f"페이지 {i+1} 텍스트 추출 오류: {error}")
+    return format_pages(pages, "--- PAGE {n} ---")
 
 def find_dropbox_folder():
     """Dropbox 폴더 찾기"""
@@ -168,7 +160,8 @@ def analyze_form_templates(
     pdf_paths: List[str], 
     progress_callback: Optional[Callable[[int], None]] = None,
     log_callback: Optional[Callable[[str], None]] = None,
-    folder_name: Optional[str] = None  # 명시적 폴더명 인자 추가
+    folder_name: Optional[str] = None,  # 명시적 폴더명 인자 추가
+    use_cache: bool = True,
 ) -> Dict[str, Any]:
     """
     PDF 파일 목록에서 서식 페이지를 찾아 분석하는 함수
@@ -178,6 +171,7 @@ def analyze_form_templates(
         progress_callback: 진행률 콜백 함수 (0-100)
         log_callback: 로그 메시지 콜백 함수
         folder_name: 명시적 폴더명 지정
+        use_cache: 서식 탐지 응답 캐시 사용 여부
         
     Returns:
         분석 결과 딕셔너리 (doc, forms 키를 포함)
@@ -188,9 +182,6 @@ def analyze_form_templates(
             log_callback(log_msg)
         raise ValueError(log_msg)
     
-    # 최신 openai 방식
-    client = OpenAI(api_key=CHATGPT_API_KEY)
-    
     # 임시 폴더 생성 (중간 처리용)
     output_dir = tempfile.mkdtemp()
     log_msg = f"임시 처리 폴더 생성: {output_dir}"
@@ -233,88 +224,101 @@ def analyze_form_templates(
                 "timestamp": os.path.getmtime(path) if os.path.exists(path) else 0
             })
         
-        # PDF 텍스트 추출
-        all_texts = []
-        for i, path in enumerate(pdf_paths):
-            filename = os.path.basename(path)
-            log_msg = f"PDF 텍스트 추출 중: {filename}"
-            logger.info(log_msg)
-            if log_callback:
-                log_callback(log_msg)
-            
-            text = extract_text_from_pdf(path)
-            all_texts.append(f"\n=== FILE: {filename} ===\n{text}")
-            
-            # 진행률 업데이트 (텍스트 추출 단계: 0-30%)
-            if progress_callback:
-                progress_callback(i * 30 // len(pdf_paths))
+        # PDF 텍스트 추출 (모든 파일의 페이지 구간을 하나의 프로세스 풀에서 병렬 처리)
+        log_msg = f"PDF 텍스트 추출 중: {len(pdf_paths)}개 파일"
+        logger.info(log_msg)
+        if log_callback:
+            log_callback(log_msg)
+        digests = ensure_extracted(pdf_paths)
+        for path, digest in digests.items():
+            if digest is None:
+                log_msg = f"PDF를 열 수 없어 건너뜀: {os.path.basename(path)}"
+                logger.warning(log_msg)
+                if log_callback:
+                    log_callback(log_msg)
+        total_pages = sum(page_store.get_page_count(digest) or 0 for digest in digests.values() if digest)
         
-        # 모든 PDF 텍스트 결합
-        combined_text = "\n\n".join(all_texts)
+        # 진행률 업데이트 (텍스트 추출 완료: 30%)
+        if progress_callback:
+            progress_callback(30)
         
         # 프롬프트 준비
         system_prompt = "당신은 대한민국 공공 입찰 서류의 '제출용 서식(양식)' 페이지를 정확히 식별하는 전문가입니다.\n"\
         "여러 개의 PDF 문서를 분석하여, **입찰 참여자가 작성·제출해야 하는 모든 '서식' 페이지**를 찾아내세요.\n"\
         "'서식'이란 AcroForm이든 스캔본이든 상관없이 \"입찰참가신청서\", \"청렴계약 이행각서\", \"별지 제1호 서식\" 등 제출용 양식을 말합니다.\n\n"\
-        "**출력 형식** (JSON 배열, 순수 JSON만):\n"\
-        "[\n"\
-        "  {\n"\
-        "    \"doc\": \"문서 파일명.pdf\",\n"\
-        "    \"forms\": [\n"\
-        "      {\n"\
-        "        \"page\": 페이지 번호,\n"\
-        "        \"title\": \"서식 정확한 제목\",\n"\
-        "        \"filename\": \"12p_입찰참가신청서.pdf\",\n"\
-        "        \"requires_input\": true\n"\
-        "      },\n"\
-        "      ...\n"\
-        "    ]\n"\
-        "  },\n"\
-        "  ...\n"\
-        "]\n"\
+        "**출력 형식** (JSON 객체, 순수 JSON만):\n"\
+        "{\n"\
+        "  \"documents\": [\n"\
+        "    {\n"\
+        "      \"doc\": \"문서 파일명.pdf\",\n"\
+        "      \"forms\": [\n"\
+        "        {\n"\
+        "          \"page\": 페이지 번호,\n"\
+        "          \"title\": \"서식 정확한 제목\",\n"\
+        "          \"filename\": \"12p_입찰참가신청서.pdf\",\n"\
+        "          \"requires_input\": true\n"\
+        "        },\n"\
+        "        ...\n"\
+        "      ]\n"\
+        "    },\n"\
+        "    ...\n"\
+        "  ]\n"\
+        "}\n"\
         "forms가 없으면 빈 배열 (\"forms\": [])로 반환\n"\
         "추가 설명, 주석, 텍스트는 절대 포함 금지"
         
-        # 사용자 프롬프트 구성
-        user_text = f"아래는 {len(pdf_paths)}개 PDF의 텍스트 추출 내용입니다. 문서별로 구분하기 위해 다음 포맷으로 섹션을 나누었습니다:\n\n{combined_text}\n\n위 각 섹션을 분석해, 제출용 '서식' 페이지를 모두 찾아 JSON으로 반환해주세요."
-        
-        # 진행률 업데이트 (API 호출 준비: 30%)
-        if progress_callback:
-            progress_callback(30)
-        
-        # OpenAI API 호출
-        log_msg = "OpenAI API 호출 중..."
+        # 서식 후보 페이지(+앞뒤 페이지)만 골라 토큰 예산 청크별로 동시 호출 (OpenAI API)
+        log_msg = f"OpenAI API 호출 중... ({total_pages}페이지 중 서식 후보만, 청크당 최대 {settings.FORM_CHUNK_TOKENS}토큰)"
         logger.info(log_msg)
         if log_callback:
             log_callback(log_msg)
         
-        response = client.chat.completions.create(
+        prefilter_stats = {}
+        # 후보 선별이 모든 페이지를 훑는 동안 (문서, 페이지) 색인도 함께 만듦
+        page_index = PageIndex({os.path.basename(path): digest for path, digest in digests.items() if digest})
+        def on_chunk_done(done, submitted):
+            # 진행률 업데이트 (API 호출 단계: 30-60%, 후보 선별이 훑은 페이지 기준)
+            if progress_callback:
+                progress_callback(30 + prefilter_stats.get("pages", 0) * 30 // max(total_pages, 1))
+        
+        json_result, content = detect_forms(
+            system_prompt,
+            select_candidate_pages(page_index.track(iter_pages(pdf_paths)), stats=prefilter_stats),
             model=GPT_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_text}
-            ]
+            progress_callback=on_chunk_done,
+            log_callback=log_callback,
+            page_index=page_index,
+            use_cache=use_cache,
         )
+        log_msg = f"서식 후보 페이지: {prefilter_stats['candidates']}개, 전송 {prefilter_stats['selected']}/{prefilter_stats['pages']}페이지"
+        logger.info(log_msg)
+        if log_callback:
+            log_callback(log_msg)
+        
+        if prefilter_stats["pages"] and not prefilter_stats["selected"]:
+            # 후보가 하나도 없으면 (스캔본 등 휴리스틱이 못 잡는 경우) 전체 페이지로 다시 탐지
+            log_msg = "서식 후보 페이지가 없어 전체 페이지로 다시 탐지합니다."
+            logger.info(log_msg)
+            if log_callback:
+                log_callback(log_msg)
+            json_result, content = detect_forms(
+                system_prompt, iter_pages(pdf_paths),
+                model=GPT_MODEL,
+                log_callback=log_callback,
+                page_index=page_index,
+                use_cache=use_cache,
+            )
         
         # 진행률 업데이트 (API 호출 완료: 60%)
         if progress_callback:
             progress_callback(60)
-        
-        # API 응답 처리
-        content = response.choices[0].message.content
         if DEBUG:
-            logger.info(f"API 응답: {content}")
+            logger.info(f"API 응답: {json_result or content}")
         
         # JSON 추출 (텍스트에서 JSON 부분만 추출)
         try:
-            # JSON 시작/끝 위치 찾기 (배열이나 객체 형태)
-            json_start = min(content.find("["), content.find("{")) if content.find("[") >= 0 and content.find("{") >= 0 else max(content.find("["), content.find("{"))
-            json_end = max(content.rfind("]"), content.rfind("}")) + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_content = content[json_start:json_end]
-                json_result = json.loads(json_content)
-                
+            # 청크별 응답은 detect_forms에서 파싱/병합됨 (문서별 배열)
+            if json_result is not None:
                 # 배열인 경우 첫 번째 항목을 기본 문서로 처리하고 나머지는 통합
                 if isinstance(json_result, list):
                     # 결과가 배열 형태인 경우, 모든 서식을 통합
@@ -322,8 +326,10 @@ def analyze_form_templates(
                     doc_name = ""
                     
                     for doc_result in json_result:
-                        if doc_result.get("forms"):
-                            all_forms.extend(doc_result.get("forms", []))
+                        for form in doc_result.get("forms") or []:
+                            # 서식이 나온 문서를 서식 항목에 기록 (페이지 추출 시 원본 문서 확인용)
+                            form.setdefault("doc", doc_result.get("doc"))
+                            all_forms.append(form)
                         if not doc_name and doc_result.get("doc"):
                             doc_name = doc_result.get("doc")
                     
@@ -360,80 +366,61 @@ def analyze_form_templates(
                         temp_folder_name = os.path.splitext(pdf_name)[0]
                         dropbox_forms_path = f"{DROPBOX_SHARED_FOLDER_NAME}/{temp_folder_name}/서식"
                     
-                    # 각 서식별 PDF 파일 생성
-                    successful_forms = []
-                    for i, form in enumerate(result["forms"]):
+                    # 서식별 원본 PDF와 저장 경로 결정 (페이지 색인으로 찾음 - PDF를 다시 열지 않음)
+                    paths_by_doc = {}
+                    for path in pdf_paths:
+                        paths_by_doc.setdefault(os.path.basename(path), path)
+                    splits = []
+                    for form in result["forms"]:
                         page = form.get("page")
                         if page is None:
                             continue
                         
+                        # 서식이 발견된 원본 문서/페이지 확인 (doc이 없거나 틀리면 제목으로 찾음)
+                        target = page_index.resolve(form.get("doc"), page, form.get("title"))
+                        if target is None:
+                            error_msg = f"서식 추출 오류 (페이지 {page}): 해당 페이지가 있는 PDF가 없습니다."
+                            logger.error(error_msg)
+                            if log_callback:
+                                log_callback(error_msg)
+                            continue
+                        if target != (form.get("doc"), page):
+                            log_msg = f"서식 위치 보정: {form.get('doc')} {page}p → {target[0]} {target[1]}p ({form.get('title')})"
+                            logger.info(log_msg)
+                            if log_callback:
+                                log_callback(log_msg)
+                            form["doc"], form["page"] = target
+                        source, page = paths_by_doc[target[0]], target[1]
+                        
                         # 파일명 생성
                         filename = form.get("filename", f"{page}p_서식.pdf")
                         filename = re.sub(r'[\\/*?:"<>|]', "", filename)
                         
-                        # 임시 경로와 최종 경로 설정 - 항상 드롭박스 폴더 우선 사용
-                        if forms_dir:
-                            # 드롭박스 폴더가 있으면 최종 파일은 드롭박스에 저장
-                            final_output_path = os.path.join(forms_dir, filename)
-                            # 임시 파일은 더 이상 필요 없음 (직접 최종 경로에 저장)
-                            temp_output_path = final_output_path
-                        else:
-                            # 드롭박스 폴더가 없으면 임시 폴더에 저장
-                            temp_output_path = os.path.join(temp_forms_dir, filename)
-                            final_output_path = temp_output_path
-                        
-                        log_msg = f"서식 파일 생성 중: {filename}"
-                        logger.info(log_msg)
-                        if log_callback:
-                            log_callback(log_msg)
-                        
-                        # 서식 파일이 있는 PDF 및 페이지 번호 찾기
-                        target_doc = form.get("doc")
-                        
-                        # 서식이 발견된 원본 문서 확인
-                        target_paths = [p for p in pdf_paths if os.path.basename(p) == target_doc] if target_doc else pdf_paths
-                        
-                        # 대상 문서가 지정되지 않았으면 모든 PDF 확인
-                        if not target_paths:
-                            target_paths = pdf_paths
-                            
-                        # 해당 페이지가 있는 PDF 찾기
-                        for pdf_path in target_paths:
-                            try:
-                                reader = PdfReader(pdf_path)
-                                if page <= len(reader.pages):
-                                    # 0-기반 인덱스로 변환
-                                    page_idx = page - 1
-                                    
-                                    # 단일 페이지 추출
-                                    writer = PdfWriter()
-                                    writer.add_page(reader.pages[page_idx])
-                                    
-                                    # 파일로 저장 (최종 경로에 직접 저장)
-                                    with open(final_output_path, "wb") as out_file:
-                                        writer.write(out_file)
-                                    
-                                    log_msg = f"서식 파일 저장 완료: {final_output_path}"
-                                    logger.info(log_msg)
-                                    if log_callback:
-                                        log_callback(log_msg)
-                                    
-                                    # 원본 파일 경로 추가
-                                    form["source_pdf"] = os.path.basename(pdf_path)
-                                    form["output_path"] = final_output_path  # 이제 출력 경로는 최종 경로와 동일
-                                    form["final_path"] = final_output_path  # 최종 경로도 설정
-                                    form["dropbox_path"] = f"{dropbox_forms_path}/{filename}"  # Dropbox 경로 추가
-                                    successful_forms.append(form)
-                                    break
-                            except Exception as e:
-                                error_msg = f"서식 추출 오류 (페이지 {page}): {e}"
-                                logger.error(error_msg)
-                                if log_callback:
-                                    log_callback(error_msg)
-                        
-                        # 진행률 업데이트 (PDF 생성 진행: 70-90%)
-                        if progress_callback:
-                            progress_callback(70 + (i * 20) // len(result["forms"]))
+                        # 항상 드롭박스 폴더 우선 사용 (없으면 임시 폴더)
+                        final_output_path = os.path.join(forms_dir or temp_forms_dir, filename)
+                        splits.append((form, PageSplit(source, page, final_output_path)))
+                    
+                    log_msg = f"서식 파일 생성 중: {len(splits)}개 (원본 PDF {len({split.source for _, split in splits})}개)"
+                    logger.info(log_msg)
+                    if log_callback:
+                        log_callback(log_msg)
+                    
+                    # 원본 PDF별로 한 번만 열어 모든 서식 페이지 저장
+                    split_errors = split_pages([split for _, split in splits], log_callback=log_callback)
+                    
+                    successful_forms = []
+                    for form, split in splits:
+                        if split_errors[split] is None:
+                            # 원본 파일 경로 추가
+                            form["source_pdf"] = os.path.basename(split.source)
+                            form["output_path"] = split.output_path  # 출력 경로는 최종 경로와 동일
+                            form["final_path"] = split.output_path  # 최종 경로도 설정
+                            form["dropbox_path"] = f"{dropbox_forms_path}/{os.path.basename(split.output_path)}"  # Dropbox 경로 추가
+                            successful_forms.append(form)
+                    
+                    # 진행률 업데이트 (PDF 생성 완료: 90%)
+                    if progress_callback:
+                        progress_callback(90)
                     
                     # 결과 업데이트
                     result["forms"] = successful_forms
@@ -468,23 +455,34 @@ def analyze_form_templates(
                         if log_callback:
                             log_callback(log_msg)
                             
-                        # 서식 파일 업로드
-                        for form in result["forms"]:
-                            output_path = form.get("output_path")
-                            if output_path and os.path.exists(output_path):
-                                dropbox_path = form.get("dropbox_path")
-                                if dropbox_path:
-                                    try:
-                                        upload_file(dropbox_path, output_path)
-                                        log_msg = f"Dropbox 업로드 완료: {os.path.basename(output_path)}"
-                                        logger.info(log_msg)
-                                        if log_callback:
-                                            log_callback(log_msg)
-                                    except Exception as e:
-                                        log_msg = f"Dropbox 업로드 실패: {e}"
-                                        logger.error(log_msg)
-                                        if log_callback:
-                                            log_callback(log_msg)
+                        # 서식 파일 일괄 업로드 (폴더 생성 1회 + 동시 전송 + 일괄 커밋)
+                        upload_targets = [
+                            (form["dropbox_path"], form["output_path"])
+                            for form in result["forms"]
+                            if form.get("dropbox_path") and form.get("output_path")
+                            and os.path.exists(form["output_path"])
+                        ]
+                        
+                        def on_uploaded(done, total, remote_path):
+                            log_msg = f"Dropbox 전송 완료 ({done}/{total}): {os.path.basename(remote_path)}"
+                            logger.info(log_msg)
+                            if log_callback:
+                                log_callback(log_msg)
+                        
+                        try:
+                            uploaded, stats = upload_files(upload_targets, progress_callback=on_uploaded)
+                            failed = [path for path, metadata in uploaded.items() if metadata is None]
+                            log_msg = f"Dropbox 업로드 완료: {stats.summary()}"
+                            if failed:
+                                log_msg += f" (커밋 실패 {len(failed)}건: {', '.join(os.path.basename(p) for p in failed)})"
+                            logger.info(log_msg)
+                            if log_callback:
+                                log_callback(log_msg)
+                        except Exception as e:
+                            log_msg = f"Dropbox 업로드 실패: {e}"
+                            logger.error(log_msg)
+                            if log_callback:
+                                log_callback(log_msg)
                         
                         # 결과 JSON 업로드
                         json_path = f"{dropbox_forms_path}/서식분석결과.json"
@@ -518,160 +516,20 @@ def analyze_form_templates(
             if log_callback:
                 log_callback(error_msg)
         
-        # JSON 파싱 실패 시 백업 처리
-        try:
-            # 정규식으로 페이지, 제목 추출
-            result = {
-                "doc": os.path.basename(pdf_paths[0]) if pdf_paths else "", 
-                "forms": [],
-                "analyzed_files": analyzed_files
-            }
-            
-            log_msg = "JSON 파싱 실패, 백업 처리 시작..."
-            logger.info(log_msg)
-            if log_callback:
-                log_callback(log_msg)
-            
-            # 다양한 패턴으로 검색 시도
-            patterns = [
-                r'page[^\d]*(\d+).*?title[^\w가-힣]*([\w가-힣]+)',  # 기본 패턴
-                r'"page"[^\d]*(\d+).*?"title"[^\w가-힣]*"([\w가-힣]+)"',  # JSON 스타일
-                r'서식.*?페이지.*?(\d+).*?제목.*?[\'"]([^\'"]+)[\'"]',  # 한글 설명 패턴
-                r'별지\s*제\s*(\d+)\s*호',  # 별지 서식 패턴
-                r'서식\s*제\s*(\d+)\s*호',  # 서식 번호 패턴
-                r'(입찰참가신청서|청렴계약\s*이행각서|입찰인감증명서|가격제안서|견적서)'  # 일반적인 서식명
-            ]
-            
-            # 각 패턴별로 매칭 시도
-            forms_found = []
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE | re.DOTALL)
-                if matches:
-                    for match in matches:
-                        if isinstance(match, tuple) and len(match) >= 2:
-                            # 페이지 번호와 서식명이 있는 경우
-                            try:
-                                page = int(match[0])
-                                title = match[1].strip()
-                                forms_found.append({
-                                    "page": page,
-                                    "title": title,
-                                    "filename": f"{page}p_{title}.pdf",
-                                    "requires_input": True
-                                })
-                            except:
-                                pass
-                        elif isinstance(match, str):
-                            # 서식명만 있는 경우 (페이지는 불명확)
-                            forms_found.append({
-                                "title": match.strip(),
-                                "requires_input": True
-                            })
-            
-            # 중복 제거 및 페이지 번호별 정렬
-            if forms_found:
-                seen_titles = set()
-                unique_forms = []
-                
-                for form in forms_found:
-                    title = form.get("title", "")
-                    if title and title not in seen_titles:
-                        seen_titles.add(title)
-                        unique_forms.append(form)
-                
-                # 페이지 번호가 있는 항목들 우선 정렬
-                result["forms"] = sorted(
-                    [f for f in unique_forms if "page" in f],
-                    key=lambda x: x.get("page", 999)
-                ) + [f for f in unique_forms if "page" not in f]
-                
-                # 백업 처리로 서식 폴더에 저장
-                if forms_dir:
-                    backup_forms_dir = forms_dir
-                else:
-                    backup_forms_dir = temp_forms_dir
-                
-                log_msg = f"백업 처리: 서식 폴더 사용 {backup_forms_dir}"
-                logger.info(log_msg)
-                if log_callback:
-                    log_callback(log_msg)
-                
-                # 페이지 번호가 있는 서식만 처리
-                for form in [f for f in result["forms"] if "page" in f]:
-                    page = form.get("page")
-                    if page is None:
-                        continue
-                        
-                    # 파일명 생성
-                    filename = form.get("filename", f"{page}p_서식.pdf")
-                    filename = re.sub(r'[\\/*?:"<>|]', "", filename)
-                    final_output_path = os.path.join(backup_forms_dir, filename)
-                    
-                    # 첫 번째 PDF에서 해당 페이지 추출 시도
-                    if pdf_paths:
-                        try:
-                            reader = PdfReader(pdf_paths[0])
-                            if page <= len(reader.pages):
-                                # 0-기반 인덱스로 변환
-                                page_idx = page - 1
-                                
-                                # 단일 페이지 추출
-                                writer = PdfWriter()
-                                writer.add_page(reader.pages[page_idx])
-                                
-                                # 최종 위치에 저장
-                                with open(final_output_path, "wb") as out_file:
-                                    writer.write(out_file)
-                                
-                                log_msg = f"백업 처리: 서식 파일 저장 {final_output_path}"
-                                logger.info(log_msg)
-                                if log_callback:
-                                    log_callback(log_msg)
-                                    
-                                # 경로 정보 추가    
-                                form["final_path"] = final_output_path
-                        except Exception as e:
-                            error_msg = f"백업 처리 서식 추출 오류 (페이지 {page}): {e}"
-                            logger.error(error_msg)
-                            if log_callback:
-                                log_callback(error_msg)
-                
-                # 분석 결과 JSON 파일도 저장
-                result_json_path = os.path.join(backup_forms_dir, "서식분석결과.json")
-                try:
-                    with open(result_json_path, "w", encoding="utf-8") as f:
-                        json.dump(result, f, ensure_ascii=False, indent=2)
-                    log_msg = f"백업 처리: 분석 결과 JSON 저장 완료 {result_json_path}"
-                    logger.info(log_msg)
-                    if log_callback:
-                        log_callback(log_msg)
-                except Exception as e:
-                    error_msg = f"백업 처리 JSON 저장 오류: {e}"
-                    logger.error(error_msg)
-                    if log_callback:
-                        log_callback(error_msg)
-            
-            # 최종 저장 위치 기록
-            result["forms_dir"] = forms_dir or temp_forms_dir
-            
-            # 진행률 업데이트 (완료: 100%)
-            if progress_callback:
-                progress_callback(100)
-            
-            return result
-        except Exception as e:
-            error_msg = f"백업 처리 오류: {e}"
-            logger.error(error_msg)
-            if log_callback:
-                log_callback(error_msg)
-            return {
-                "doc": "", 
-                "forms": [], 
-                "error": str(e),
-                "analyzed_files": analyzed_files,
-                "forms_dir": forms_dir or temp_forms_dir
-            }
+        # 쓸 수 있는 JSON이 하나도 없는 경우 (청크별 응답은 이미 관대한 파서로 복구를 시도함)
+        error_msg = "서식 탐지 응답에서 JSON을 찾지 못했습니다."
+        logger.error(error_msg)
+        if log_callback:
+            log_callback(error_msg)
+        if progress_callback:
+            progress_callback(100)
+        return {
+            "doc": os.path.basename(pdf_paths[0]) if pdf_paths else "",
+            "forms": [],
+            "error": error_msg,
+            "analyzed_files": analyzed_files,
+            "forms_dir": forms_dir or temp_forms_dir
+        }
     
     except Exception as e:
         error_msg = f"서식 분석 오류: {e}"
@@ -712,8 +570,8 @@ def save_form_templates(
         # 결과 JSON 파일 저장
         upload_json(f"{dropbox_prefix}/{destination_folder}/서식분석결과.json", result)
         
-        # 서식 파일이 있으면 PDF 업로드
-        successful = 0
+        # 서식 파일이 있으면 PDF 일괄 업로드
+        upload_targets = []
         for form in result.get("forms", []):
             output_path = form.get("output_path")
             if not output_path or not os.path.exists(output_path):
@@ -721,13 +579,21 @@ def save_form_templates(
                 
             filename = os.path.basename(output_path)
             remote_path = f"{dropbox_prefix}/{destination_folder}/서식/{filename}"
-            
-            try:
-                # 파일 업로드
-                upload_file(remote_path, output_path)
-                successful += 1
-            except Exception as e:
-                logger.error(f"서식 파일 업로드 오류 ({filename}): {e}")
+            upload_targets.append((remote_path, output_path))
+        
+        successful = 0
+        try:
+            uploaded, _ = upload_files(
+                upload_targets,
+                progress_callback=lambda done, total, path: logger.info(f"서식 파일 전송 ({done}/{total}): {path}")
+            )
+            for path, metadata in uploaded.items():
+                if metadata is None:
+                    logger.error(f"서식 파일 업로드 오류: {path}")
+                else:
+                    successful += 1
+        except Exception as e:
+            logger.error(f"서식 파일 업로드 오류: {e}")
         
         logger.info(f"서식 저장 완료: {successful}/{len(result.get('forms', []))} 파일")
         return successful
@@ -9,21 +9,18 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtGui import QPainter, QImage, QFont, QPixmap, QColor
 from PyQt5.QtCore import Qt, QRectF, QObject, pyqtSignal
 from PyPDF2 import PdfReader
+from pdf_split import PageSplit, split_pages
+from pdf_text import iter_pages
 import tempfile
 import json
-import openai
 import shutil
 import re
 import threading
+import importlib.util
 from dotenv import load_dotenv
-from openai import OpenAI
 
-# PDF2Image 라이브러리 사용 (poppler 대체)
-try:
-    from pdf2image import convert_from_path
-    PDF_RENDERER_AVAILABLE = True
-except ImportError:
-    PDF_RENDERER_AVAILABLE = False
+# PDF2Image 라이브러리 사용 (poppler 대체) - 설치 여부만 확인하고 임포트는 첫 렌더링 때
+PDF_RENDERER_AVAILABLE = importlib.util.find_spec("pdf2image") is not None
 
 
 class PdfFormEditor(QMainWindow):
@@ -137,6 +134,7 @@ class PdfFormEditor(QMainWindow):
         if PDF_RENDERER_AVAILABLE and not self.page_images[self.page_index]:
             try:
                 # pdf2image로 현재 페이지만 렌더링
+                from pdf2image import convert_from_path
                 images = convert_from_path(
                     self.pdf_path,
                     first_page=self.page_index + 1,
@@ -476,29 +474,28 @@ class PdfFormEditor(QMainWindow):
         with open(os.path.join(save_dir, "서식분석결과.json"), "w", encoding="utf-8") as f:
             json.dump(result, f, ensure_ascii=False, indent=2)
         
-        # 각 서식 페이지 추출 및 저장
-        successful = 0
+        # 각 서식 페이지 추출 요청 모으기
+        splits = []
         for form in result.get('forms', []):
             page = form.get('page')
             if page is None:
                 continue
                 
-            # 0부터 시작하는 페이지 인덱스로 조정
-            page_idx = page - 1
-            if page_idx < 0 or page_idx >= len(self.pdf_pages):
+            # 페이지 범위 확인 (1부터 시작하는 페이지 번호)
+            if page < 1 or page > len(self.pdf_pages):
                 continue
                 
             # 파일명 생성 (특수문자 제거)
             filename = form.get('filename', f"{page}p_서식.pdf")
             filename = re.sub(r'[\\/*?:"<>|]', "", filename)
-            output_path = os.path.join(forms_dir, filename)
-            
-            try:
-                # PDF로 단일 페이지 저장
-                self._extract_pdf_page(page_idx, output_path)
-                successful += 1
-            except Exception as e:
-                print(f"페이지 {page} 저장 중 오류: {e}")
+            splits.append(PageSplit(self.pdf_path, page, os.path.join(forms_dir, filename)))
+        
+        # 원본 PDF를 한 번만 열어 모든 서식 페이지 저장
+        split_errors = split_pages(splits)
+        for split, error in split_errors.items():
+            if error:
+                print(f"페이지 {split.page} 저장 중 오류: {error}")
+        successful = sum(1 for error in split_errors.values() if error is None)
         
         # 완료 메시지
         QMessageBox.information(
@@ -506,22 +503,6 @@ class PdfFormEditor(QMainWindow):
             f"서식 페이지 추출 완료: {successful}개 파일이 '{forms_dir}'에 저장되었습니다."
         )
     
-    def _extract_pdf_page(self, page_idx, output_path):
-        """단일 페이지 PDF로 저장"""
-        from PyPDF2 import PdfWriter, PdfReader
-        
-        # 원본 PDF 열기
-        reader = PdfReader(self.pdf_path)
-        writer = PdfWriter()
-        
-        # 페이지 추가
-        writer.add_page(reader.pages[page_idx])
-        
-        # 새 PDF로 저장
-        with open(output_path, "wb") as out_file:
-            writer.write(out_file)
-
-
 class FormExtractor(QObject):
     """ChatGPT API를 이용한 서식 페이지 추출 워커"""
     progress_updated = pyqtSignal(int)
@@ -545,14 +526,13 @@ class FormExtractor(QObject):
             # 진행률 업데이트
             self.progress_updated.emit(10)
             
-            # PDF 텍스트 추출
-            reader = PdfReader(self.pdf_path)
-            text_content = ""
-            for i, page in enumerate(reader.pages):
-                text_content += f"\n--- PAGE {i+1} ---\n"
-                text_content += page.extract_text() or f"[Page {i+1} has no extractable text]"
-                # 진행률 업데이트 (페이지당)
-                self.progress_updated.emit(10 + (i * 40) // len(reader.pages))
+            # PDF 텍스트 추출 (페이지 텍스트 저장소에 있으면 재사용)
+            text_content = "".join(
+                f"\n--- PAGE {page.page_no} ---\n" + (page.text or f"[Page {page.page_no} has no extractable text]")
+                for page in iter_pages([self.pdf_path])
+            )
+            if not text_content:
+                raise ValueError(f"PDF를 열 수 없습니다: {self.pdf_path}")
             
             # API 요청 준비
             self.progress_updated.emit(50)
@@ -576,21 +556,21 @@ Return a JSON array of these document objects. Do **not** include any extra comm
             filename = os.path.basename(self.pdf_path)
             
             # OpenAI API 호출
-            client = OpenAI(api_key=self.api_key)
             self.progress_updated.emit(60)
-            response = client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
+            from llm import chat
+            content = chat(
+                [
                     {"role": "system", "content": prompt},
                     {"role": "user", "content": f"Analyze this PDF content from file '{filename}':\n\n{text_content}"}
                 ],
+                model="gpt-4.1-mini",
                 temperature=0.2,
-                max_tokens=1500
+                max_tokens=1500,
+                api_key=self.api_key,
             )
             self.progress_updated.emit(90)
             
             # 결과 파싱
-            content = response.choices[0].message.content
             
             # JSON 추출 (텍스트에서 JSON 부분만 추출)
             try:
@@ -0,0 +1,104 @@
+# pdf_split.py
+# 서식 페이지 분할 - 원본 PDF별로 요청 페이지를 묶어 문서마다 한 번만 열고 단일 페이지 PDF로 저장
+
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from PyPDF2 import PdfReader, PdfWriter
+
+from pdf_text import extract_workers, get_pool, reset_pool
+
+logger = logging.getLogger(__name__)
+
+class PageSplit(NamedTuple):
+    """페이지 하나를 단일 페이지 PDF로 저장하는 요청 (page는 1부터)"""
+    source: str
+    page: int
+    output_path: str
+
+def _split_document(source: str, items: List[Tuple[int, str]]) -> List[Optional[str]]:
+    """
+    원본 PDF 하나를 한 번만 파싱해 요청 페이지들을 저장합니다 (워커 프로세스에서도 실행).
+
+    Returns:
+        items 순서대로 오류 메시지 (성공하면 None)
+    """
+    try:
+        reader = PdfReader(source)
+        page_count = len(reader.pages)
+    except Exception as e:
+        return [f"PDF 열기 실패: {e}"] * len(items)
+
+    errors = []
+    for page, output_path in items:
+        if not 1 <= page <= page_count:
+            errors.append(f"페이지 범위 초과 ({page}/{page_count})")
+            continue
+        try:
+            writer = PdfWriter()
+            writer.add_page(reader.pages[page - 1])
+            with open(output_path, "wb") as out_file:
+                writer.write(out_file)
+            errors.append(None)
+        except Exception as e:
+            errors.append(str(e))
+    return errors
+
+def split_pages(
+    requests: Iterable[PageSplit],
+    parallel: bool = True,
+    log_callback: Optional[Callable[[str], None]] = None,
+) -> Dict[PageSplit, Optional[str]]:
+    """
+    여러 페이지를 단일 페이지 PDF로 저장합니다.
+
+    요청을 원본 PDF별로 묶어 문서마다 한 번만 파싱하므로, 400페이지 묶음에서 서식 20개를
+    꺼내도 파싱은 한 번입니다. 원본이 여러 개이면 문서 단위로 pdf_text의 프로세스 풀에
+    나눠 처리합니다.
+
+    Args:
+        requests: PageSplit 목록
+        parallel: 원본이 여러 개일 때 프로세스 풀 사용 여부
+        log_callback: 파일별 저장/오류 로그 콜백
+
+    Returns:
+        {요청: 오류 메시지 (성공하면 None)}
+    """
+    groups: Dict[str, List[PageSplit]] = OrderedDict()
+    for request in requests:
+        groups.setdefault(request.source, []).append(request)
+
+    def items(group):
+        return [(request.page, request.output_path) for request in group]
+
+    outcomes: Dict[str, List[Optional[str]]] = {}
+    if parallel and len(groups) > 1 and extract_workers() > 1:
+        try:
+            pool = get_pool()
+            futures = {source: pool.submit(_split_document, source, items(group)) for source, group in groups.items()}
+            for source, future in futures.items():
+                outcomes[source] = future.result()
+        except BrokenProcessPool as e:
+            # 워커 프로세스가 죽은 경우 남은 문서는 현재 프로세스에서 처리
+            logger.warning(f"병렬 페이지 분할 실패, 순차 처리로 전환: {e}")
+            reset_pool()
+    for source, group in groups.items():
+        if source not in outcomes:
+            outcomes[source] = _split_document(source, items(group))
+
+    results: Dict[PageSplit, Optional[str]] = {}
+    for source, group in groups.items():
+        for request, error in zip(group, outcomes[source]):
+            results[request] = error
+            if error:
+                log_msg = f"서식 추출 오류 ({os.path.basename(request.source)} {request.page}페이지): {error}"
+                logger.error(log_msg)
+            else:
+                log_msg = f"서식 파일 저장 완료: {request.output_path}"
+                logger.info(log_msg)
+            if log_callback:
+                log_callback(log_msg)
+    return results
@@ -0,0 +1,416 @@
+# pdf_text.py
+# PDF 페이지 텍스트 병렬 추출 (프로세스 풀) 및 영구 페이지 텍스트 저장소
+
+import os
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import PyPDF2
+from PyPDF2 import PdfReader
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 이 페이지 수 미만인 작업은 프로세스 간 전송 비용이 더 크므로 현재 프로세스에서 추출
+PARALLEL_MIN_PAGES = 8
+# 워커 하나가 한 번에 맡는 연속 페이지 수 (워커마다 PDF를 새로 열기 때문에 너무 잘게 나누지 않음)
+PAGES_PER_TASK = 16
+
+# 추출 엔진 식별자 - 라이브러리 버전이 바뀌면 저장된 텍스트를 다시 추출
+ENGINE = f"pypdf2-{PyPDF2.__version__}"
+# 파일 해시 계산 시 읽기 단위
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# (텍스트, 오류 메시지) - 추출에 실패한 페이지는 텍스트가 None
+PageText = Tuple[Optional[str], Optional[str]]
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def extract_workers() -> int:
+    """추출 워커 프로세스 수 (PDF_EXTRACT_WORKERS, 0이면 CPU 코어 수)"""
+    return settings.PDF_EXTRACT_WORKERS or os.cpu_count() or 1
+
+def get_pool() -> ProcessPoolExecutor:
+    """
+    프로세스 풀을 처음 필요할 때 만들어 재사용합니다 (워커 기동 비용이 크므로).
+
+    PDF 페이지 분할(pdf_split)도 같은 풀을 씁니다.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=extract_workers())
+        return _pool
+
+def reset_pool() -> None:
+    """워커 프로세스가 죽어 풀을 쓸 수 없을 때 버립니다 (다음 get_pool()에서 새로 만듦)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+def _extract_range(path: str, start: int, stop: int) -> List[PageText]:
+    """[start, stop) 페이지의 텍스트를 추출합니다 (워커 프로세스에서 실행)."""
+    reader = PdfReader(path)
+    results = []
+    for i in range(start, min(stop, len(reader.pages))):
+        try:
+            results.append((reader.pages[i].extract_text() or "", None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+_hash_memo: Dict[tuple, str] = {}
+_hash_lock = threading.Lock()
+
+def file_hash(path: str) -> str:
+    """파일 내용의 SHA-256 해시 (같은 (경로, 크기, 수정시각)은 프로세스 안에서 재사용)"""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _hash_lock:
+        cached = _hash_memo.get(key)
+    if cached:
+        return cached
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    with _hash_lock:
+        _hash_memo[key] = digest
+    return digest
+
+class PageTextStore:
+    """
+    파일 내용 해시 + 페이지 번호를 키로 하는 SQLite 페이지 텍스트 저장소
+
+    같은 PDF는 경로나 Dropbox 다운로드 위치가 달라도 내용이 같으면 한 번만
+    추출됩니다. 문서 전체가 추출되면 documents 테이블에 페이지 수를 기록하고,
+    일부 페이지만 추출된 경우(뷰어의 '이 페이지만' 질문 등)에는 pages 행만 남깁니다.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " hash TEXT, engine TEXT, page_count INTEGER, created REAL,"
+                " PRIMARY KEY (hash, engine))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " hash TEXT, engine TEXT, page INTEGER, text TEXT, error TEXT,"
+                " PRIMARY KEY (hash, engine, page))"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get_document(self, digest: str) -> Optional[List[PageText]]:
+        """문서 전체 페이지 텍스트 (전체 추출 기록이 없으면 None)"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT page_count FROM documents WHERE hash=? AND engine=?", (digest, ENGINE)
+            ).fetchone()
+            if row is None:
+                return None
+            rows = conn.execute(
+                "SELECT text, error FROM pages WHERE hash=? AND engine=? ORDER BY page",
+                (digest, ENGINE),
+            ).fetchall()
+        if len(rows) != row[0]:
+            return None
+        return [(text, error) for text, error in rows]
+
+    def has_document(self, digest: str) -> bool:
+        return self.get_page_count(digest) is not None
+
+    def get_page_count(self, digest: str) -> Optional[int]:
+        """전체 추출이 끝난 문서의 페이지 수 (기록이 없으면 None)"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT page_count FROM documents WHERE hash=? AND engine=?", (digest, ENGINE)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put_pages(self, digest: str, first_page: int, pages: List[PageText]) -> None:
+        """first_page(1부터)부터 연속된 페이지들을 저장합니다."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO pages (hash, engine, page, text, error) VALUES (?, ?, ?, ?, ?)",
+                    [(digest, ENGINE, first_page + i, text, error) for i, (text, error) in enumerate(pages)],
+                )
+
+    def finish_document(self, digest: str, page_count: int) -> None:
+        """문서의 모든 페이지가 저장되었음을 기록합니다."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO documents (hash, engine, page_count, created) VALUES (?, ?, ?, ?)",
+                    (digest, ENGINE, page_count, time.time()),
+                )
+
+    def iter_document(self, digest: str, batch_size: int = PAGES_PER_TASK) -> Iterator[Tuple[int, Optional[str], Optional[str]]]:
+        """
+        (페이지 번호, 텍스트, 오류)를 페이지 순서대로 batch_size개씩 읽어 내보냅니다.
+
+        잠금은 배치를 읽는 동안만 잡으므로, 소비가 느려도 다른 스레드를 막지 않습니다.
+        """
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT page, text, error FROM pages WHERE hash=? AND engine=? AND page>?"
+                    " ORDER BY page LIMIT ?",
+                    (digest, ENGINE, last, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last = rows[-1][0]
+
+    def get_page(self, digest: str, page_no: int) -> Optional[PageText]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT text, error FROM pages WHERE hash=? AND engine=? AND page=?",
+                (digest, ENGINE, page_no),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put_page(self, digest: str, page_no: int, page: PageText) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO pages (hash, engine, page, text, error) VALUES (?, ?, ?, ?, ?)",
+                    (digest, ENGINE, page_no, page[0], page[1]),
+                )
+
+    def stats(self) -> dict:
+        with self._lock:
+            conn = self._connect()
+            documents = conn.execute("SELECT COUNT(*) FROM documents WHERE engine=?", (ENGINE,)).fetchone()[0]
+            pages = conn.execute("SELECT COUNT(*) FROM pages WHERE engine=?", (ENGINE,)).fetchone()[0]
+        return {"documents": documents, "pages": pages, "path": self.db_path}
+
+# 프로세스 전역 페이지 텍스트 저장소
+page_store = PageTextStore(settings.PAGE_TEXT_DB)
+
+def page_count(path: str) -> int:
+    return len(PdfReader(path).pages)
+
+def ensure_extracted(paths: List[str]) -> Dict[str, Optional[str]]:
+    """
+    page_store에 없는 문서만 추출해 저장하고, 경로별 내용 해시를 반환합니다.
+
+    각 PDF를 PAGES_PER_TASK 단위 구간으로 나눠 모든 파일의 구간을 한꺼번에
+    프로세스 풀에 넣으므로, 큰 파일 하나와 작은 파일 여러 개가 섞여 있어도 코어가
+    고르게 쓰입니다. 구간 결과는 도착하는 대로 저장소에 쓰고 버리며, 내용이 같은
+    파일은 한 번만 추출합니다.
+
+    Returns:
+        {경로: 내용 해시} - 열 수 없는 PDF는 None
+    """
+    digests: Dict[str, Optional[str]] = {}
+    pending: Dict[str, Tuple[str, int]] = {}  # 해시 → (대표 경로, 페이지 수)
+    for path in paths:
+        try:
+            digest = file_hash(path)
+            if digest not in pending and not page_store.has_document(digest):
+                pending[digest] = (path, page_count(path))
+            digests[path] = digest
+        except Exception as e:
+            logger.error(f"PDF 열기 실패 {path}: {e}")
+            digests[path] = None
+    if pending:
+        _extract_documents(pending)
+    return digests
+
+def _extract_documents(documents: Dict[str, Tuple[str, int]]) -> None:
+    """{해시: (경로, 페이지 수)}의 모든 페이지를 추출해 page_store에 저장합니다."""
+    tasks = [
+        (digest, path, start, min(start + PAGES_PER_TASK, count))
+        for digest, (path, count) in documents.items()
+        for start in range(0, count, PAGES_PER_TASK)
+    ]
+    total_pages = sum(count for _, count in documents.values())
+    if extract_workers() <= 1 or total_pages < PARALLEL_MIN_PAGES:
+        for digest, path, start, stop in tasks:
+            page_store.put_pages(digest, start + 1, _extract_range(path, start, stop))
+    else:
+        try:
+            pool = get_pool()
+            futures = deque(pool.submit(_extract_range, path, start, stop) for _, path, start, stop in tasks)
+            for digest, _, start, _ in tasks:
+                page_store.put_pages(digest, start + 1, futures.popleft().result())
+        except BrokenProcessPool as e:
+            # 워커 프로세스가 죽은 경우 (메모리 부족 등) 현재 프로세스에서 다시 추출
+            logger.warning(f"병렬 추출 실패, 순차 추출로 전환: {e}")
+            reset_pool()
+            for digest, path, start, stop in tasks:
+                page_store.put_pages(digest, start + 1, _extract_range(path, start, stop))
+    for digest, (_, count) in documents.items():
+        page_store.finish_document(digest, count)
+
+def extract_pages_many(paths: List[str]) -> Dict[str, Optional[List[PageText]]]:
+    """
+    여러 PDF의 페이지 텍스트를 페이지 순서대로 반환합니다 (page_store를 거쳐 추출).
+
+    문서 전체를 목록으로 돌려주므로, 큰 묶음을 순서대로 처리만 할 때는
+    iter_pages()를 쓰십시오.
+
+    Returns:
+        {경로: [(텍스트, 오류), ...]} - 열 수 없는 PDF는 None
+    """
+    digests = ensure_extracted(paths)
+    return {
+        path: page_store.get_document(digest) if digest else None
+        for path, digest in digests.items()
+    }
+
+class Page(NamedTuple):
+    """iter_pages()가 내보내는 페이지 단위 (doc은 파일명, page_no는 1부터, 추출 실패 시 text는 None)"""
+    doc: str
+    page_no: int
+    text: Optional[str]
+
+def iter_pages(paths: List[str]) -> Iterator[Page]:
+    """
+    여러 PDF의 페이지를 문서 순서, 페이지 순서대로 하나씩 내보내는 생성기
+
+    추출은 ensure_extracted()로 먼저 끝내고(저장소에 있으면 생략), 텍스트는
+    저장소에서 조금씩 읽어 오므로 메모리에는 한 번에 몇 페이지만 올라갑니다.
+    열 수 없는 PDF는 건너뜁니다 (로그에 기록).
+    """
+    digests = ensure_extracted(paths)
+    for path in paths:
+        digest = digests.get(path)
+        if not digest:
+            continue
+        doc = os.path.basename(path)
+        for page_no, text, _ in page_store.iter_document(digest):
+            yield Page(doc, page_no, text)
+
+def extract_pages(path: str) -> List[PageText]:
+    """
+    PDF 한 개의 페이지 텍스트를 페이지 순서대로 반환합니다.
+
+    PDF를 열 수 없으면 PdfReader의 예외를 그대로 발생시킵니다.
+    """
+    pages = extract_pages_many([path])[path]
+    if pages is None:
+        page_count(path)  # 원래 예외를 다시 발생시킴
+    return pages
+
+def extract_page(path: str, page_no: int) -> PageText:
+    """
+    한 페이지(1부터 시작)의 텍스트를 반환합니다.
+
+    문서 전체가 저장돼 있지 않아도 해당 페이지만 추출해 저장합니다.
+    """
+    digest = file_hash(path)
+    page = page_store.get_page(digest, page_no)
+    if page is None:
+        extracted = _extract_range(path, page_no - 1, page_no)
+        if not extracted:
+            raise IndexError(f"페이지 범위를 벗어났습니다: {page_no}")
+        page = extracted[0]
+        page_store.put_page(digest, page_no, page)
+    return page
+
+def format_page(page_no: int, text: Optional[str], marker: str = "--- PAGE {n} ---",
+                placeholders: bool = True, error: Optional[str] = None) -> str:
+    """페이지 하나를 구분자와 함께 문자열로 만듭니다 ({n}은 1부터 시작하는 페이지 번호)."""
+    if placeholders and (text is None or error is not None):
+        text = f"[Error: {error or '텍스트를 추출할 수 없습니다'}]"
+    elif placeholders and not text.strip():
+        text = f"[Page {page_no} has no extractable text]"
+    return f"{marker.format(n=page_no)}\n{text or ''}"
+
+def format_pages(pages: List[PageText], marker: str = "--- PAGE {n} ---", placeholders: bool = True) -> str:
+    """
+    페이지 텍스트를 페이지 구분자와 함께 하나의 문자열로 합칩니다.
+
+    Args:
+        pages: extract_pages() 결과
+        marker: 페이지 구분자 형식 ({n}은 1부터 시작하는 페이지 번호)
+        placeholders: 빈 페이지/오류 페이지에 안내 문구를 넣을지 여부
+    """
+    return "\n".join(
+        format_page(i + 1, text, marker, placeholders, error)
+        for i, (text, error) in enumerate(pages)
+    )
+
+def iter_page_texts(pages: Iterable[Page], marker: str = "--- PAGE {n} ---",
+                    file_header: str = "\n=== FILE: {doc} ===\n") -> Iterator[str]:
+    """
+    페이지들을 프롬프트용 조각으로 바꿔 내보냅니다.
+
+    문서가 바뀔 때마다 file_header 조각을 먼저 내보내므로, 조각들을 그대로
+    이어 붙이면 문서별 섹션과 페이지 구분자가 들어간 텍스트가 됩니다.
+    """
+    current = None
+    for page in pages:
+        if page.doc != current:
+            current = page.doc
+            yield file_header.format(doc=page.doc)
+        yield format_page(page.page_no, page.text, marker) + "\n"
+
+class PromptWindow(NamedTuple):
+    """iter_prompt_windows()가 내보내는 청크 (pages는 파일명 → 포함된 페이지 번호 목록)"""
+    text: str
+    pages: Dict[str, List[int]]
+
+def iter_prompt_windows(pages: Iterable[Page], max_size: int, size: Callable[[str], int] = len,
+                        marker: str = "--- PAGE {n} ---",
+                        file_header: str = "\n=== FILE: {doc} ===\n") -> Iterator[PromptWindow]:
+    """
+    페이지들을 크기가 max_size 이하인 프롬프트 청크로 묶어 내보냅니다.
+
+    크기는 size(조각)의 합으로 계산합니다 (기본은 글자 수, 토큰 추정 함수를 넘길 수 있음).
+    페이지 중간에서 자르지 않으며(한 페이지가 max_size보다 크면 그 페이지만으로 된
+    청크가 됨), 문서 중간에서 새 청크가 시작되면 file_header를 다시 붙여 어느
+    문서의 페이지인지 알 수 있게 합니다. 메모리에는 청크 하나만 유지됩니다.
+    """
+    parts: List[str] = []
+    window_pages: Dict[str, List[int]] = {}
+    total = 0
+    current = None
+    for page in pages:
+        piece = format_page(page.page_no, page.text, marker) + "\n"
+        header = file_header.format(doc=page.doc)
+        if page.doc != current:
+            piece = header + piece
+            current = page.doc
+        piece_size = size(piece)
+        if parts and total + piece_size > max_size:
+            yield PromptWindow("".join(parts), window_pages)
+            parts, window_pages, total = [], {}, 0
+            if not piece.startswith(header):
+                piece = header + piece
+                piece_size = size(piece)
+        parts.append(piece)
+        window_pages.setdefault(page.doc, []).append(page.page_no)
+        total += piece_size
+    if parts:
+        yield PromptWindow("".join(parts), window_pages)
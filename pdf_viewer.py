@@ -1,15 +1,15 @@
 import sys
-import fitz  # PyMuPDF
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, 
     QHBoxLayout, QPushButton, QFileDialog, QLabel,
     QScrollArea, QFrame, QListWidget, QListWidgetItem, QSizePolicy, QSplitter, QToolTip, QTextEdit, QLineEdit, QCheckBox, QComboBox, QTextBrowser, QSlider
 )
-from PyQt5.QtGui import QPixmap, QImage, QIcon, QFont, QColor
+from PyQt5.QtGui import QPixmap, QImage, QIcon, QFont, QColor, QTextCursor
 from PyQt5.QtCore import Qt, QSize, QPoint
-import requests
 import os
 from dotenv import load_dotenv
+from job_executor import Job, job_executor
+from pdf_text import extract_page, extract_pages
 
 # .env 파일 로드
 load_dotenv()
@@ -171,6 +171,8 @@ class PDFViewer(QMainWindow):
         btn_layout.addStretch(1)
         self.send_btn = QPushButton("질문하기")
         self.send_btn.clicked.connect(self.ask_gpt)
+        # 진행 중인 GPT 호출 (없으면 None)
+        self.gpt_job = None
         btn_layout.addWidget(self.send_btn)
         btn_layout.addStretch(1)
         btn_widget = QWidget()
@@ -182,6 +184,7 @@ class PDFViewer(QMainWindow):
         
         # PDF 관련 변수 초기화
         self.current_doc = None
+        self.current_path = None
         self.current_page = 0
         self.total_pages = 0
     
@@ -193,6 +196,7 @@ class PDFViewer(QMainWindow):
     
     def open_pdf(self):
         """PDF 파일 열기"""
+        import fitz  # PyMuPDF (창이 빨리 뜨도록 처음 쓸 때 임포트)
         file_path, _ = QFileDialog.getOpenFileName(
             self, "PDF 파일 선택", "", "PDF Files (*.pdf)"
         )
@@ -205,6 +209,7 @@ class PDFViewer(QMainWindow):
                 
                 # 새 문서 열기
                 self.current_doc = fitz.open(file_path)
+                self.current_path = file_path
                 self.total_pages = len(self.current_doc)
                 self.current_page = 0
                 
@@ -222,6 +227,7 @@ class PDFViewer(QMainWindow):
     
     def create_thumbnails(self):
         """썸네일 목록 생성"""
+        import fitz
         self.thumbnail_list.clear()
         thumb_w = 200
         for page_num in range(self.total_pages):
@@ -274,6 +280,7 @@ class PDFViewer(QMainWindow):
     
     def display_page(self):
         """현재 페이지 표시"""
+        import fitz
         if not self.current_doc:
             return
         try:
@@ -328,41 +335,72 @@ class PDFViewer(QMainWindow):
         event.accept()
 
     def ask_gpt(self):
+        # 답변 대기 중이면 버튼은 취소 버튼으로 동작
+        if self.gpt_job is not None:
+            self.gpt_job.cancel()
+            return
         question = self.chat_input.toPlainText().strip()
         if not question:
             return
         self.chat_output.append(f"<b>질문:</b> {question}")
-        QApplication.processEvents()
-        # PDF 텍스트 추출
-        if self.page_only_checkbox.isChecked():
-            context = self.extract_page_text(self.current_page)
-        else:
-            context = self.extract_all_text()
-        # GPT 호출 (env의 모델만 사용)
-        answer = ask_gpt_api(question, context, self.gpt_api_key, self.gpt_model)
+        page_only = self.page_only_checkbox.isChecked()
+        page_num = self.current_page
+        path = self.current_path
         self.chat_output.append("<b>GPT:</b>")
-        self.chat_output.setMarkdown(answer)
+        self.chat_output.append("")
+        # PDF 텍스트 추출과 GPT 호출 모두 작업 스레드에서 (env의 모델만 사용)
+        # 응답은 조각이 도착하는 대로 partial 시그널로 채팅창에 이어 붙임
+        def run(ctx):
+            context = self.extract_page_text(page_num, path) if page_only else self.extract_all_text(path)
+            ctx.check_cancelled()
+            answer = []
+            for delta in ask_gpt_api(question, context, self.gpt_api_key, self.gpt_model,
+                                     is_cancelled=ctx.is_cancelled):
+                answer.append(delta)
+                ctx.partial(delta)
+            ctx.check_cancelled()
+            return "".join(answer)
+        job = Job("pdf_viewer:ask_gpt", run)
+        job.signals.partial.connect(self.on_gpt_delta)
+        job.signals.cancelled.connect(lambda: self.chat_output.append("<i>[질문이 취소되었습니다]</i>"))
+        job.signals.finished.connect(self.on_gpt_finished)
+        self.gpt_job = job
+        self.send_btn.setText("취소")
         self.chat_input.clear()
+        job_executor.start(job)
+
+    def on_gpt_delta(self, delta):
+        # 스트리밍 응답 조각을 마지막 문단 끝에 이어 붙임
+        cursor = self.chat_output.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(delta)
+        self.chat_output.setTextCursor(cursor)
+        self.chat_output.ensureCursorVisible()
 
-    def extract_page_text(self, page_num):
-        if self.current_doc is None:
+    def on_gpt_finished(self):
+        self.gpt_job = None
+        self.send_btn.setText("질문하기")
+
+    def extract_page_text(self, page_num, path=None):
+        # 페이지 텍스트 저장소를 거쳐 추출 (분석/서식 추출과 같은 텍스트 재사용)
+        path = path or self.current_path
+        if path is None:
             return ""
         try:
-            page = self.current_doc[page_num]
-            return page.get_text()
+            text, _ = extract_page(path, page_num + 1)
+            return text or ""
         except Exception:
             return ""
 
-    def extract_all_text(self):
-        if self.current_doc is None:
+    def extract_all_text(self, path=None):
+        path = path or self.current_path
+        if path is None:
             return ""
-        texts = []
-        for i in range(self.total_pages):
-            try:
-                texts.append(self.current_doc[i].get_text())
-            except Exception:
-                continue
-        return "\n".join(texts)
+        try:
+            pages = extract_pages(path)
+        except Exception:
+            return ""
+        return "\n".join(text for text, _ in pages if text is not None)
 
     def on_zoom_slider(self, value):
         self.zoom_percent = value
@@ -374,30 +412,22 @@ class PDFViewer(QMainWindow):
         self.fit_to_width = True
         self.display_page()
 
-# --- GPT API 호출 함수 (API키, 모델 인자로 받음) ---
-def ask_gpt_api(question, context, api_key, model):
+# --- GPT API 호출 함수 (API키, 모델 인자로 받음, 응답 조각을 도착하는 대로 내보냄) ---
+def ask_gpt_api(question, context, api_key, model, is_cancelled=None):
     if not api_key:
-        return "[OpenAI API 키를 .env에 입력하세요]"
-    url = "https://api.openai.com/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    data = {
-        "model": model,
-        "messages": [
-            {"role": "system", "content": "아래 context를 참고해서 사용자의 질문에 답변해줘."},
-            {"role": "user", "content": f"context: {context}\n\n질문: {question}"}
-        ],
-        "max_tokens": 2048,
-        "temperature": 0.7
-    }
+        yield "[OpenAI API 키를 .env에 입력하세요]"
+        return
+    messages = [
+        {"role": "system", "content": "아래 context를 참고해서 사용자의 질문에 답변해줘."},
+        {"role": "user", "content": f"context: {context}\n\n질문: {question}"}
+    ]
     try:
-        resp = requests.post(url, headers=headers, json=data, timeout=30)
-        resp.raise_for_status()
-        return resp.json()["choices"][0]["message"]["content"].strip()
+        # 대화형 질문이므로 응답 캐시 없이 스트리밍 (openai는 첫 질문 때 임포트)
+        from llm import stream_chat
+        yield from stream_chat(messages, model=model, temperature=0.7, api_key=api_key,
+                               is_cancelled=is_cancelled, max_tokens=2048)
     except Exception as e:
-        return f"[GPT 호출 오류] {e}"
+        yield f"\n[GPT 호출 오류] {e}"
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
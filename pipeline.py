@@ -0,0 +1,412 @@
+# pipeline.py
+# GUI 없는 분석 파이프라인 (폴더 분석, 목차 가이드, 서식 추출)
+#
+# 이 모듈은 Qt를 임포트하지 않습니다. 각 함수는 첫 인자로 task_context.TaskContext를 받아
+# 진행/로그/취소를 주고받으므로, Qt 대화상자(job_executor.JobContext)와 batch.py 같은
+# 헤드리스 실행기가 같은 파이프라인을 실행합니다.
+
+import os
+import re
+import json
+import shutil
+import logging
+import tempfile
+
+from dropbox_client import list_files, download_files, TransferCancelled, upload_json, upload_files
+from gpt_client import analyze_pdfs
+from pdf_split import PageSplit, split_pages
+from pdf_text import ensure_extracted, page_store
+from smpp_index import smpp_index
+from task_context import JobCancelled
+
+logger = logging.getLogger(__name__)
+
+class NoPdfError(Exception):
+    """분석할 PDF가 폴더에 없을 때"""
+    pass
+
+def run_analysis(ctx, folder):
+    """
+    폴더 분석 파이프라인 (작업 스레드에서 실행, Qt 위젯 사용 안 함)
+
+    Args:
+        ctx: TaskContext (진행률 보고/취소 확인)
+        folder: 분석할 폴더명
+
+    Returns:
+        분석 결과 딕셔너리
+    """
+    pdfs = list_files(f"입찰 2025/{folder}", ".pdf")
+    if not pdfs:
+        raise NoPdfError(f"{folder} 폴더에 PDF 파일이 없습니다.")
+
+    # 내려받은 PDF는 분석이 끝나면 임시 폴더째 삭제 (텍스트는 page_store에 남음)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # 다운로드 진행 상태 표시 (동시 다운로드, 캐시에 있으면 복사)
+        ctx.progress(0, "PDF 파일 다운로드 중...")
+        def on_downloaded(done, total, entry, cached):
+            ctx.progress(int(done / total * 20))  # 다운로드는 20%까지
+        try:
+            paths, stats = download_files(
+                pdfs, temp_dir,
+                progress_callback=on_downloaded,
+                is_cancelled=ctx.is_cancelled,
+            )
+        except TransferCancelled:
+            raise JobCancelled()
+        logger.info(f"PDF 다운로드 완료: {stats.summary()}")
+
+        # 분석 진행 상태 표시 (다운로드 완료, 분석 시작)
+        ctx.progress(20, "PDF 내용 분석 중...")
+        def on_analyzed(done, total):
+            ctx.progress(20 + int(done / total * 60))  # 분석은 80%까지
+        # 분석 버튼은 새 결과를 원할 때 누르므로 이전 응답을 재생하지 않음
+        analysis = analyze_pdfs(paths, progress_callback=on_analyzed, is_cancelled=ctx.is_cancelled, use_cache=False)
+    ctx.check_cancelled()
+
+    # 분석 결과 업로드 (분석 완료, 업로드 시작)
+    ctx.progress(80, "분석 결과 업로드 중...")
+    upload_json(f"입찰 2025/{folder}/analysis.json", analysis)
+
+    # smpp.json 업데이트 (해당 항목만 패치, rev 기반 조건부 저장)
+    ctx.progress(90, "메타데이터 업데이트 중...")
+    def apply_analysis(item):
+        info = item.setdefault("announcement_info", {})
+        ann = analysis.get("announcement_info", {})
+        info["등록마감"] = ann.get("등록마감", info.get("등록마감"))
+        info["공고명"] = ann.get("공고명", info.get("공고명"))
+        info["추정가격"] = ann.get("추정가격", info.get("추정가격"))
+        info["입찰내용 요약"] = analysis.get("project_summary", info.get("입찰내용 요약"))
+        item["analysis_status"] = "completed"
+    smpp_index.patch_entry(folder, apply_analysis)
+
+    ctx.progress(100)
+    return analysis
+
+def run_toc_guide(ctx, folder):
+    """
+    목차 가이드 생성 파이프라인 (작업 스레드에서 실행, Qt 위젯 사용 안 함)
+
+    Args:
+        ctx: TaskContext (진행률 보고/취소 확인)
+        folder: 분석할 폴더명
+
+    Returns:
+        목차 가이드 데이터
+    """
+    # 폴더 내 PDF 파일 목록 가져오기
+    pdfs = list_files(f"입찰 2025/{folder}", ".pdf")
+    if not pdfs:
+        raise FileNotFoundError(f"{folder} 폴더에 PDF 파일이 없습니다.")
+
+    # 임시 폴더 생성 및 PDF 다운로드 (작업이 끝나면 폴더째 삭제)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # 다운로드 진행 상태 표시
+        ctx.progress(0, "PDF 파일 다운로드 중...")
+        def on_downloaded(done, total, entry, cached):
+            ctx.progress(int(done / total * 20))
+        try:
+            paths, _ = download_files(
+                pdfs, temp_dir,
+                progress_callback=on_downloaded,
+                is_cancelled=ctx.is_cancelled,
+            )
+        except TransferCancelled:
+            raise JobCancelled()
+
+        # 목차 가이드 생성 프롬프트
+        prompt = build_toc_prompt(paths)
+
+        # 분석 진행 상태 표시
+        ctx.progress(20, "PDF 내용 분석 중...")
+
+        # GPT API 호출하여 목차 가이드 생성
+        guide_data = analyze_pdfs(paths, prompt, is_cancelled=ctx.is_cancelled, use_cache=False)
+    ctx.check_cancelled()
+
+    # Dropbox에 업로드
+    ctx.progress(90, "목차 가이드 업로드 중...")
+    upload_json(f"입찰 2025/{folder}/목차가이드.json", guide_data)
+    ctx.progress(100)
+    return guide_data
+
+def build_toc_prompt(pdf_files):
+    """목차 가이드 생성 프롬프트 (임시 폴더 경로가 아니라 파일명만 넣음)"""
+    docs_list = '\n'.join(os.path.basename(path) for path in pdf_files)
+    # 최종 조정된 한국어 프롬프트
+    return f"""
+당신은 입찰 제안서 작성 전문가 어시스턴트입니다. 현재 작업 디렉터리에 있는 모든 PDF 파일은 하나의 입찰 제안서를 작성하기 위한 안내 문서입니다. 이 문서들 안에 제안서 작성요령 항목이 있습니다. 이 문서를 종합 분석하여, 이 입찰이 요구하는 제안서 목차와 작성 가이드라인을 자동 추출하세요:
+{docs_list}
+
+각 PDF 문서에 대해:
+1. **목차(Table of Contents) 추출**
+   - 제안서 구조를 정의하는 주요 장(chapter) 제목과 모든 소항목(sub-section)을 문서에 나타난 그대로 캡처합니다.
+   - 장 및 소항목에 해당하는 페이지 번호를 정확히 기록합니다.
+2. **작성 가이드라인 추출**
+   - "작성 방법", "제안서 구성", "작성 가이드" 등 제목의 섹션이나 단락을 찾아 원문 그대로 캡처합니다.
+   - 이 가이드라인은 제안서 각 섹션을 어떻게 작성해야 하는지 지시하는 내용입니다.
+3. **메타데이터 기록**
+   - `documents_processed`: 처리된 모든 PDF 파일명을 배열로 나열합니다.
+   - `source_references`: 추출된 각 장, 소항목, 가이드라인마다 아래 형식으로 기록합니다:
+     {{
+       "document": "<파일명>",
+       "page": <페이지번호>,
+       "location": "<heading table|paragraph|ocr_table>",
+       "description": "추출 항목에 대한 간단 설명"
+     }}
+4. 필요 시 OCR을 사용해 스캔된 표나 이미지로 된 목차를 처리합니다.
+5. **최종 출력은 순수 JSON**이어야 하며, 아래 스키마를 엄격히 준수해야 합니다:
+```json
+{{
+  "documents_processed": ["file1.pdf", "file2.pdf"],
+  "source_references": [...],
+  "table_of_contents": [
+    {{
+      "title": "Ⅰ. 사업 개요",
+      "page": 2,
+      "subsections": [
+        {{"title": "1. 사업개요", "page": 2}},
+        {{"title": "2. 사업목적", "page": 3}}
+      ]
+    }}
+    // 추가 장
+  ],
+  "writing_guidelines": [
+    {{"text": "제안서 구성은 다음과 같이 작성해야 합니다...", "source": {{"document":"file.pdf","page":5}}}}
+    // 추가 가이드라인
+  ]
+}}
+```
+- `documents_processed`, `source_references`, `table_of_contents`, `writing_guidelines` 네 가지 최상위 키가 반드시 포함되어야 합니다.
+- 파일명은 glob을 사용해 동적으로 검색하며, 하드코딩하지 마세요.
+- 각 소항목별 페이지 정보를 정확히 기록해야 합니다.
+- JSON에 추가 필드나 주석을 포함하지 마십시오.
+"""
+
+def run_form_extraction(ctx, folder):
+    """
+    서식 분석 파이프라인 (작업 스레드에서 실행, Qt 위젯 사용 안 함)
+
+    내려받은 원본 PDF는 끝나면 삭제하고, 로컬에 저장한 서식 폴더(임시 폴더/서식)만 남깁니다.
+
+    Returns:
+        작업이 끝난 뒤 GUI에서 표시할 알림 목록 [(level, title, message)]
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        return _extract_forms(ctx, folder, temp_dir)
+    finally:
+        for name in os.listdir(temp_dir):
+            if name != "서식":
+                path = os.path.join(temp_dir, name)
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+        if not os.listdir(temp_dir):
+            os.rmdir(temp_dir)
+
+def _extract_forms(ctx, folder, temp_dir):
+    log_callback = ctx.log
+    notices = []
+
+    # 해당 폴더의 PDF 파일 목록 가져오기
+    pdf_entries = list_files(f"입찰 2025/{folder}", ".pdf")
+    pdfs = [entry.name for entry in pdf_entries]
+
+    if not pdfs:
+        raise FileNotFoundError(f"{folder} 폴더에 PDF 파일이 없습니다.")
+
+    # 최초 로그 메시지
+    log_callback(f"서식 분석 시작: {folder} ({len(pdfs)}개 PDF 파일)")
+
+    # pdf_client 모듈 사용
+    from pdf_client import analyze_form_templates
+
+    # 분석 실행 (임시 폴더에 PDF 다운로드 후 분석)
+    # PDF 파일 동시 다운로드 (파일별 완료 로그)
+    def on_downloaded(done, total, entry, cached):
+        source = "캐시" if cached else "다운로드"
+        log_callback(f"PDF {source} 완료 ({done}/{total}): {entry.name}")
+    try:
+        local_paths, stats = download_files(
+            pdf_entries, temp_dir,
+            progress_callback=on_downloaded,
+            is_cancelled=ctx.is_cancelled,
+        )
+    except TransferCancelled:
+        raise JobCancelled()
+    log_callback(f"PDF 준비 완료: {stats.summary()}")
+
+    # 서식 분석 실행
+    log_callback("서식 페이지 분석 중...")
+
+    # 분석 및 결과 저장 (프로그레스바 없이 로그 콜백만 사용)
+    result = analyze_form_templates(
+        local_paths, 
+        progress_callback=None,  # 프로그레스바 콜백 제거
+        log_callback=log_callback,
+        folder_name=folder,  # 현재 폴더명 전달
+        use_cache=False,  # 다시 추출을 요청하면 이전 응답을 재생하지 않음
+    )
+    ctx.check_cancelled()
+
+    if not result or not result.get('forms'):
+        log_callback("서식 페이지를 찾을 수 없습니다.")
+
+        # 결과 없음으로 JSON 저장
+        # PDF 파일 목록 확인
+        analyzed_files = result.get('analyzed_files', []) if result else []
+        if not analyzed_files:
+            analyzed_files = [{"filename": pdf} for pdf in pdfs]
+
+        result_json = {
+            "doc": folder, 
+            "forms": [], 
+            "message": "서식 페이지를 찾을 수 없습니다.",
+            "analyzed_files": analyzed_files
+        }
+
+        # 결과 저장 - pdf_client에서 이미 저장한 경우 생략
+        json_saved = False
+        for path in local_paths:
+            forms_dir = os.path.dirname(path)
+            result_path = os.path.join(forms_dir, "서식분석결과.json")
+            if os.path.exists(result_path):
+                json_saved = True
+                break
+
+        if not json_saved:
+            # Dropbox에 업로드 (내려받은 PDF와 함께 임시 폴더는 삭제되므로 로컬에는 남기지 않음)
+            upload_json(f"입찰 2025/{folder}/서식분석결과.json", result_json)
+            log_callback(f"서식분석결과.json 파일 Dropbox 업로드 완료")
+            notices.append(("information", "알림",
+                "서식 페이지를 찾을 수 없습니다.\n서식분석결과.json 파일이 Dropbox에 저장되었습니다."))
+
+        return notices
+
+    # 서식 파일 생성 완료 확인
+    forms_saved = False
+    for form in result.get('forms', []):
+        if form.get('final_path') and os.path.exists(form.get('final_path')):
+            forms_saved = True
+            break
+
+    if forms_saved:
+        # 이미 pdf_client.py에서 서식 파일 저장 완료
+        forms_dir = os.path.dirname(result['forms'][0].get('final_path'))
+        log_callback(f"서식 파일 저장 완료: {len(result.get('forms', []))}개 파일")
+        notices.append(("information", "완료",
+            f"서식 페이지 분석 완료: {len(result.get('forms', []))}개 서식 PDF가 '{forms_dir}'에 저장되었습니다."))
+        return notices
+
+    # 서식 파일이 저장되지 않은 경우 (백업 처리)
+    try:
+        # 원본 PDF 폴더에 저장
+        if local_paths:
+            original_dir = os.path.dirname(local_paths[0])
+            forms_dir = os.path.join(original_dir, "서식")
+            os.makedirs(forms_dir, exist_ok=True)
+            log_callback(f"서식 폴더 생성: {forms_dir}")
+
+            # 각 서식 파일 추출 및 저장
+            saved_count = 0
+            splits = []
+            page_counts = None
+            for form in result.get('forms', []):
+                page = form.get('page')
+                if page is None:
+                    continue
+
+                output_path = form.get('output_path')
+                if output_path and os.path.exists(output_path):
+                    # 이미 생성된 파일 복사
+                    filename = os.path.basename(output_path)
+                    dest_path = os.path.join(forms_dir, filename)
+                    shutil.copy2(output_path, dest_path)
+                    log_callback(f"서식 파일 복사: {filename}")
+                    saved_count += 1
+                    continue
+
+                # 페이지가 있는 PDF 찾기 (페이지 수는 분석 때 채운 텍스트 저장소 값 사용)
+                if page_counts is None:
+                    page_counts = {
+                        path: page_store.get_page_count(digest) or 0
+                        for path, digest in ensure_extracted(local_paths).items() if digest
+                    }
+                source = next((path for path in local_paths if page <= page_counts.get(path, 0)), None)
+                if source is None:
+                    log_callback(f"서식 추출 오류 (페이지 {page}): 해당 페이지가 있는 PDF가 없습니다.")
+                    continue
+                filename = form.get('filename', f"{page}p_서식.pdf")
+                filename = re.sub(r'[\\/*?:"<>|]', "", filename)
+                splits.append(PageSplit(source, page, os.path.join(forms_dir, filename)))
+
+            # 원본 PDF별로 한 번만 열어 페이지 추출
+            if splits:
+                split_errors = split_pages(splits)
+                for split in splits:
+                    if split_errors[split] is None:
+                        log_callback(f"서식 파일 생성: {os.path.basename(split.output_path)}")
+                        saved_count += 1
+                    else:
+                        log_callback(f"서식 추출 오류 (페이지 {split.page}): {split_errors[split]}")
+
+            # 결과 JSON 파일 저장 (서식 폴더는 작업 후에도 남음)
+            result_path = os.path.join(forms_dir, "서식분석결과.json")
+            with open(result_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+
+            log_callback(f"서식분석결과.json 파일 저장: {result_path}")
+
+            # Dropbox에 업로드
+            upload_json(f"입찰 2025/{folder}/서식분석결과.json", result)
+            log_callback(f"서식분석결과.json 파일 Dropbox 업로드 완료")
+
+            # 완료 메시지 표시
+            notices.append(("information", "완료",
+                f"서식 페이지 분석 완료: {saved_count}개 서식 PDF가 '{forms_dir}'에 저장되었습니다."))
+        else:
+            # Dropbox API 사용
+            forms_dir = f"입찰 2025/{folder}/서식"
+            saved_count = 0
+            log_callback(f"Dropbox 폴더 생성: {forms_dir}")
+
+            # 서식 파일을 Dropbox에 일괄 업로드
+            upload_targets = [
+                (f"{forms_dir}/{os.path.basename(form['output_path'])}", form['output_path'])
+                for form in result.get('forms', [])
+                if form.get('output_path') and os.path.exists(form['output_path'])
+            ]
+            try:
+                uploaded, _ = upload_files(
+                    upload_targets,
+                    progress_callback=lambda done, total, path: log_callback(
+                        f"서식 파일 업로드 ({done}/{total}): {os.path.basename(path)}")
+                )
+                saved_count = sum(1 for metadata in uploaded.values() if metadata is not None)
+            except Exception as e:
+                error_msg = f"파일 업로드 오류: {e}"
+                log_callback(error_msg)
+
+            # 결과 JSON 파일 저장
+            upload_json(f"입찰 2025/{folder}/서식/서식분석결과.json", result)
+            log_callback(f"서식분석결과.json 파일 업로드 완료")
+
+            # 완료 메시지 표시
+            notices.append(("information", "완료",
+                f"서식 페이지 분석 완료: {saved_count}개 서식 PDF가 Dropbox에 저장되었습니다."))
+
+    except Exception as e:
+        error_msg = f"서식 파일 저장 중 오류 발생: {str(e)}"
+        log_callback(error_msg)
+        notices.append(("warning", "저장 오류", error_msg))
+        # 로컬 경로 비상 대책 안내
+        temp_forms_dir = os.path.join(temp_dir, "서식")
+        if os.path.exists(temp_forms_dir) and os.listdir(temp_forms_dir):
+            log_callback(f"임시 저장 위치: {temp_forms_dir}")
+            notices.append(("information", "임시 저장 위치",
+                f"서식 파일이 다음 임시 폴더에 저장되어 있습니다:\n{temp_forms_dir}\n"
+                f"이 폴더의 내용을 수동으로 복사하세요."))
+
+    return notices
@@ -26,5 +26,42 @@ class Settings:
     CHATGPT_API_KEY: str = os.getenv("CHATGPT_API_KEY", "")
     GPT_MODEL: str = os.getenv("CHATGPT_MODEL", "gpt-4.1-mini")
 
+    # 백그라운드 작업 (분석/서식 추출/GPT 호출) 동시 실행 수
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+    # 헤드리스 일괄 분석(batch.py)에서 동시에 처리할 폴더 수
+    BATCH_WORKERS: int = int(os.getenv("BATCH_WORKERS", "4"))
+
+    # PDF 텍스트 추출 프로세스 수 (0이면 CPU 코어 수)
+    PDF_EXTRACT_WORKERS: int = int(os.getenv("PDF_EXTRACT_WORKERS", "0"))
+    # 추출한 페이지 텍스트 저장소 (파일 내용 해시 + 페이지 번호 키)
+    PAGE_TEXT_DB: str = os.getenv("PAGE_TEXT_DB", os.path.join(os.path.expanduser("~"), ".govbid_cache", "page_text.sqlite3"))
+
+    # 서식 탐지 시 GPT 요청 하나에 넣을 PDF 텍스트 토큰 상한 (페이지 단위로 나눔)
+    FORM_CHUNK_TOKENS: int = int(os.getenv("FORM_CHUNK_TOKENS", "12000"))
+    # 서식 탐지 청크 동시 요청 수
+    FORM_DETECT_WORKERS: int = int(os.getenv("FORM_DETECT_WORKERS", "4"))
+    # 서식 후보 페이지 점수 기준 (낮출수록 더 많은 페이지를 GPT에 보냄, 0이면 전체 전송)
+    FORM_PREFILTER_THRESHOLD: float = float(os.getenv("FORM_PREFILTER_THRESHOLD", "3"))
+    # 후보 페이지 앞뒤로 함께 보낼 페이지 수
+    FORM_PREFILTER_NEIGHBOURS: int = int(os.getenv("FORM_PREFILTER_NEIGHBOURS", "1"))
+
+    # GPT 응답 캐시 (같은 모델/프롬프트/문서 내용이면 API를 다시 호출하지 않음)
+    LLM_CACHE_DB: str = os.getenv("LLM_CACHE_DB", os.path.join(os.path.expanduser("~"), ".govbid_cache", "llm_cache.sqlite3"))
+    # 캐시 보관 기간 (초, 0이면 만료 없음) - 기본 7일
+    LLM_CACHE_TTL: int = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+    # 캐시 최대 크기 (MB)
+    LLM_CACHE_MAX_MB: int = int(os.getenv("LLM_CACHE_MAX_MB", "200"))
+    # GPT 동시 요청 수 (모든 입찰 분석/질문 합계)
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    # 429/5xx/연결 오류 재시도 횟수와 지수 백오프 (초)
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "5"))
+    LLM_BACKOFF_BASE: float = float(os.getenv("LLM_BACKOFF_BASE", "1"))
+    LLM_BACKOFF_MAX: float = float(os.getenv("LLM_BACKOFF_MAX", "60"))
+    # GPT 요청 하나의 타임아웃 (초)
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", "120"))
+
+    # 입찰 폴더 분석(analysis.json) 프롬프트에 넣을 PDF 텍스트 토큰 상한
+    ANALYSIS_PROMPT_TOKENS: int = int(os.getenv("ANALYSIS_PROMPT_TOKENS", "60000"))
+
 # 단일 settings 인스턴스 생성
 settings = Settings() 
\ No newline at end of file
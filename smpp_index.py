@@ -0,0 +1,121 @@
+# smpp_index.py
+# 입찰 목록(smpp.json)의 로컬 색인 사본과 rev 기반 조건부 갱신
+
+import os
+import copy
+import json
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+from dropbox_client import (
+    CACHE_DIR, RevConflict, download_json_with_rev, get_metadata, upload_json
+)
+
+logger = logging.getLogger(__name__)
+
+# Dropbox상의 입찰 목록 파일 경로
+SMPP_PATH = "입찰 2025/smpp.json"
+# 조건부 업로드 충돌 시 최신본을 다시 받아 재적용하는 최대 횟수
+PATCH_RETRIES = 5
+
+class SmppIndex:
+    """
+    smpp.json의 로컬 사본을 folder_name 기준으로 색인해 보관하는 클래스
+
+    - refresh(): 원격 rev만 조회해 로컬 사본과 같으면 다운로드하지 않습니다.
+    - patch_entry(): 한 항목에 대한 패치 함수를 받아, 로컬 사본의 rev를 기준으로
+      WriteMode.update(rev) 조건부 업로드를 합니다. 그 사이 다른 사용자가 저장해
+      rev가 달라졌으면 덮어쓰지 않고 최신본을 받아 같은 패치를 다시 적용합니다.
+    """
+
+    def __init__(self, remote_path: str = SMPP_PATH, local_path: Optional[str] = None):
+        self.remote_path = remote_path
+        self.local_path = local_path or os.path.join(CACHE_DIR, "smpp_index.json")
+        self.rev = None
+        self._items: List[Dict] = []
+        self._by_folder: Dict[str, Dict] = {}
+        self._lock = threading.RLock()
+        self._load_local()
+
+    def _load_local(self) -> None:
+        """디스크에 저장된 마지막 사본을 불러옵니다."""
+        try:
+            with open(self.local_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            self._set(saved.get("items", []), saved.get("rev"), save=False)
+        except (OSError, ValueError):
+            pass
+
+    def _set(self, items: List[Dict], rev: Optional[str], save: bool = True) -> None:
+        self._items = items
+        self._by_folder = {item.get("folder_name"): item for item in items if item.get("folder_name")}
+        self.rev = rev
+        if save:
+            os.makedirs(os.path.dirname(self.local_path), exist_ok=True)
+            tmp_path = self.local_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"rev": rev, "items": items}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.local_path)
+
+    def refresh(self) -> bool:
+        """
+        원격 rev가 로컬 사본과 다를 때만 smpp.json을 다운로드합니다.
+
+        Returns:
+            로컬 사본이 갱신되었으면 True
+        """
+        with self._lock:
+            remote_rev = get_metadata(self.remote_path).rev
+            if remote_rev == self.rev and self._items:
+                return False
+            items, rev = download_json_with_rev(self.remote_path, rev=remote_rev)
+            self._set(items, rev)
+            logger.info(f"smpp.json 갱신: rev={rev}, {len(items)}개 항목")
+            return True
+
+    def entries(self) -> List[Dict]:
+        """전체 항목 목록을 반환합니다 (원본 순서)."""
+        with self._lock:
+            return list(self._items)
+
+    def get(self, folder_name: str) -> Optional[Dict]:
+        """folder_name에 해당하는 항목을 반환합니다."""
+        with self._lock:
+            return self._by_folder.get(folder_name)
+
+    def patch_entry(self, folder_name: str, patch: Callable[[Dict], None]) -> Optional[Dict]:
+        """
+        한 항목만 변경해 smpp.json에 조건부로 반영합니다.
+
+        Args:
+            folder_name: 변경할 항목의 폴더명
+            patch: 항목 딕셔너리를 제자리에서 수정하는 함수
+
+        Returns:
+            반영된 항목 (해당 폴더가 목록에 없으면 None)
+        """
+        with self._lock:
+            if self.rev is None:
+                self.refresh()
+            for attempt in range(PATCH_RETRIES):
+                current = self._by_folder.get(folder_name)
+                if current is None:
+                    return None
+                # entries()로 내준 항목은 GUI 스레드가 읽고 있으므로 사본을 수정해 교체
+                item = copy.deepcopy(current)
+                patch(item)
+                items = [item if other is current else other for other in self._items]
+                try:
+                    metadata = upload_json(self.remote_path, items, rev=self.rev)
+                except RevConflict:
+                    logger.info(f"smpp.json 충돌, 최신본으로 재적용 ({attempt + 1}/{PATCH_RETRIES})")
+                    items, rev = download_json_with_rev(self.remote_path)
+                    self._set(items, rev)
+                    continue
+                self._set(items, metadata.rev)
+                return item
+            raise RevConflict(f"smpp.json 갱신이 {PATCH_RETRIES}회 연속 충돌했습니다: {folder_name}")
+
+# 프로세스 전역 smpp.json 색인
+smpp_index = SmppIndex()
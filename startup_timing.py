@@ -0,0 +1,77 @@
+# startup_timing.py
+# 앱 시작 시간 측정 (--startup-timing) - 단계별 경과 시간과 -X importtime 형식의 모듈 임포트 시간
+#
+# Qt나 다른 무거운 모듈을 임포트하지 않으므로 main.py 맨 앞에서 불러도 측정을 왜곡하지 않습니다.
+
+import sys
+import time
+import builtins
+from typing import Dict, List, Tuple
+
+class StartupTimer:
+    """
+    시작 단계(mark)와 모듈 임포트 시간을 기록합니다.
+
+    install_import_hook() 이후 처음 임포트되는 모듈마다 자체 시간(하위 임포트 제외)과
+    누적 시간(하위 임포트 포함)을 기록합니다. 보고서는 -X importtime처럼 두 값을
+    마이크로초로 보여 주되, 누적 시간이 큰 최상위 임포트 순으로 정렬합니다.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+        # 모듈명 → (자체 시간, 누적 시간, 중첩 깊이)
+        self.imports: Dict[str, Tuple[float, float, int]] = {}
+        self._stack: List[List[float]] = []  # 진행 중인 임포트별 [하위 임포트 누적 시간]
+        self._original_import = None
+
+    def install_import_hook(self) -> None:
+        if self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        original = self._original_import
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            depth = len(self._stack)
+            self._stack.append([0.0])
+            start = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                elapsed = time.perf_counter() - start
+                children = self._stack.pop()[0]
+                if self._stack:
+                    self._stack[-1][0] += elapsed
+                self.imports.setdefault(name, (elapsed - children, elapsed, depth))
+
+        builtins.__import__ = timed_import
+
+    def uninstall_import_hook(self) -> None:
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def mark(self, label: str) -> None:
+        """현재까지의 경과 시간을 단계 이름과 함께 기록합니다."""
+        self.marks.append((label, time.perf_counter()))
+
+    def report(self, top: int = 20) -> str:
+        lines = ["[startup] 단계별 경과 시간"]
+        previous = self.started
+        for label, at in self.marks:
+            lines.append(f"  {label:<28} {(at - self.started) * 1000:8.1f} ms  (+{(at - previous) * 1000:.1f} ms)")
+            previous = at
+        roots = sorted(
+            ((name, self_time, total) for name, (self_time, total, depth) in self.imports.items() if depth == 0),
+            key=lambda item: item[2], reverse=True,
+        )
+        lines.append(f"[startup] 최상위 임포트 (누적 시간 상위 {min(top, len(roots))}개 / {len(self.imports)}개 모듈)")
+        lines.append("  import time: self [us] | cumulative | imported package")
+        for name, self_time, total in roots[:top]:
+            lines.append(f"  import time: {self_time * 1e6:10.0f} | {total * 1e6:10.0f} | {name}")
+        return "\n".join(lines)
+
+# 프로세스 전역 타이머 (main.py가 --startup-timing일 때 사용)
+startup_timer = StartupTimer()
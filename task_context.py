@@ -0,0 +1,51 @@
+# task_context.py
+# 작업 함수의 진행/로그/취소 콜백 규약 (Qt 없이 사용 가능 - Qt 쪽은 job_executor.JobContext)
+
+import threading
+from typing import Any, Callable, Optional
+
+class JobCancelled(Exception):
+    """사용자가 작업을 취소했을 때 작업 함수 안에서 발생시키는 예외"""
+    pass
+
+class TaskContext:
+    """
+    파이프라인 함수에 첫 번째 인자로 전달되는 진행/로그/취소 인터페이스
+
+    모든 알림은 on_event(종류, 값) 하나로 전달됩니다.
+      - "progress": (진행률 0~100, 현재 단계 설명 - 바뀌지 않았으면 "")
+      - "log": 로그 메시지
+      - "partial": 최종 결과 전의 중간 결과 (스트리밍 응답 조각 등)
+    on_event는 작업 스레드에서 호출되므로 GUI를 직접 만지면 안 됩니다
+    (Qt 쪽은 JobContext가 시그널로 바꿔 GUI 스레드로 보냄).
+    """
+
+    def __init__(self, on_event: Optional[Callable[[str, Any], None]] = None,
+                 cancel_event: Optional[threading.Event] = None):
+        self._on_event = on_event
+        self._cancel_event = cancel_event or threading.Event()
+
+    def emit(self, kind: str, value: Any) -> None:
+        if self._on_event:
+            self._on_event(kind, value)
+
+    def progress(self, value, text=""):
+        self.emit("progress", (int(value), text))
+
+    def log(self, message):
+        self.emit("log", str(message))
+
+    def partial(self, value):
+        """최종 결과 전에 중간 결과를 보냅니다 (예: GPT 응답 조각)."""
+        self.emit("partial", value)
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """취소 요청이 있으면 JobCancelled를 발생시킵니다 (단계 사이에 호출)."""
+        if self._cancel_event.is_set():
+            raise JobCancelled()
@@ -0,0 +1,7 @@
+# tests/conftest.py
+# 모듈이 저장소 최상위에 있으므로 테스트에서 바로 임포트할 수 있게 경로에 추가
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
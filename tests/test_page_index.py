@@ -0,0 +1,102 @@
+# tests/test_page_index.py
+# PageIndex - 전체 페이지 번호, 제목 조회, GPT가 알려 준 서식 위치 바로잡기(resolve)
+
+import pytest
+
+from page_index import PageIndex, fingerprint, normalize
+from pdf_text import Page, PageTextStore
+
+TOC = "목 차\nⅠ. 입찰 안내\n위임장\n청렴서약서"
+PROXY = "[별지 제1호]\n위 임 장\n본인은 아래 사람에게 입찰에 관한 권한을 위임합니다."
+PLEDGE = "[별지 제2호]\n청렴서약서\n본인은 입찰 과정에서 청렴을 서약합니다."
+
+@pytest.fixture
+def build(tmp_path):
+    """{문서명: [페이지 텍스트, ...]} → PageIndex (본문은 임시 텍스트 저장소에 저장)"""
+    store = PageTextStore(str(tmp_path / "pages.db"))
+
+    def build_index(docs):
+        index = PageIndex({doc: f"hash-{doc}" for doc in docs}, store=store)
+        for doc, texts in docs.items():
+            store.put_pages(f"hash-{doc}", 1, [(text, None) for text in texts])
+            for page_no, text in enumerate(texts, start=1):
+                index.add(Page(doc, page_no, text))
+        return index
+    return build_index
+
+def test_normalize_ignores_spacing_and_punctuation():
+    assert normalize("[별지 제1호] 위 임 장") == "별지제1호위임장"
+    assert normalize("Form A-1") == "forma1"
+
+def test_global_pages_and_locate(build):
+    index = build({"a.pdf": ["1", "2", "3"], "b.pdf": ["4", "5"]})
+    assert index.total_pages == 5
+    assert index.page_counts == {"a.pdf": 3, "b.pdf": 2}
+    assert index.global_page("b.pdf", 2) == 5
+    assert index.locate(3) == ("a.pdf", 3)
+    assert index.locate(4) == ("b.pdf", 1)
+    assert index.locate(6) is None
+
+def test_add_ignores_duplicate_pages(build):
+    index = build({"a.pdf": ["1", "2"]})
+    index.add(Page("a.pdf", 2, "다른 내용"))
+    assert index.total_pages == 2
+    assert index.fingerprints[("a.pdf", 2)] == fingerprint("2")
+
+def test_exact_page_is_kept(build):
+    index = build({"a.pdf": ["표지", TOC, PROXY]})
+    assert index.resolve("a.pdf", 3, "위임장") == ("a.pdf", 3)
+    # 제목이 없거나 텍스트가 없는 페이지는 확인할 수 없으므로 그대로
+    assert index.resolve("a.pdf", 1) == ("a.pdf", 1)
+
+def test_missing_doc_uses_title_on_same_page(build):
+    index = build({"a.pdf": ["표지", "본문"], "b.pdf": ["표지", PROXY]})
+    assert index.resolve(None, 2, "위임장") == ("b.pdf", 2)
+
+def test_wrong_doc_uses_title_on_same_page(build):
+    index = build({"a.pdf": ["표지", "본문"], "b.pdf": ["표지", PROXY]})
+    # 존재하는 다른 문서를 잘못 지정한 경우와 색인에 없는 문서명을 지정한 경우
+    assert index.resolve("a.pdf", 2, "[별지 제1호] 위임장") == ("b.pdf", 2)
+    assert index.resolve("없는문서.pdf", 2, "위임장") == ("b.pdf", 2)
+
+def test_wrong_doc_without_title_falls_back_to_first_doc_with_page(build):
+    index = build({"a.pdf": ["1"], "b.pdf": ["1", "2"]})
+    assert index.resolve("c.pdf", 2) == ("b.pdf", 2)
+    assert index.resolve("c.pdf", 9) is None
+
+def test_title_on_toc_page_does_not_replace_existing_page(build):
+    index = build({"a.pdf": ["표지", TOC, "본문", PROXY]})
+    # 지정한 페이지가 있으면 목차의 같은 줄로 옮겨 가지 않음
+    assert index.resolve("a.pdf", 3, "위임장") == ("a.pdf", 3)
+    assert index.resolve("a.pdf", 4, "위임장") == ("a.pdf", 4)
+
+def test_out_of_range_page_prefers_nearest_title_over_toc(build):
+    index = build({"a.pdf": ["표지", TOC, "본문", PROXY, PLEDGE]})
+    # 인쇄 쪽번호 등으로 페이지가 어긋나 문서에 없는 번호를 준 경우
+    assert index.resolve("a.pdf", 7, "청렴서약서") == ("a.pdf", 5)
+
+def test_duplicate_pages_across_documents(build):
+    index = build({"a.pdf": ["표지", PROXY], "b.pdf": [PROXY]})
+    assert index.fingerprints[("a.pdf", 2)] == index.fingerprints[("b.pdf", 1)]
+    # 같은 내용의 페이지가 여러 문서에 있으면 첫 문서
+    assert index.resolve(None, 9, "위임장") == ("a.pdf", 2)
+    # 찾을 문서 범위를 좁히면 그 안에서
+    assert index.resolve(None, 9, "위임장", candidates=["b.pdf"]) == ("b.pdf", 1)
+    # 같은 페이지 번호가 있는 문서가 우선
+    assert index.resolve(None, 1, "위임장") == ("b.pdf", 1)
+
+def test_ambiguous_title_in_different_pages_is_not_guessed(build):
+    other = PROXY + "\n(공동수급체용)"
+    index = build({"a.pdf": [PROXY], "b.pdf": ["표지", other]})
+    assert index.resolve(None, 5, "위임장") is None
+
+def test_title_inside_page_body(build):
+    index = build({"a.pdf": ["표지", "본문"], "b.pdf": ["표지", "아래 사람에게 위임장을 제출합니다."]})
+    assert index.resolve(None, 2, "위임장") == ("b.pdf", 2)
+
+def test_page_body_is_read_from_store(build):
+    index = build({"a.pdf": ["표지", "아래 사람에게 위임장을 제출합니다."]})
+    assert index.page_contains(("a.pdf", 2), "위임장")
+    # 저장소 키가 없는 문서는 본문 확인을 하지 않음
+    index.digests.clear()
+    assert not index.page_contains(("a.pdf", 2), "위임장")
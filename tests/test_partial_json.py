@@ -0,0 +1,89 @@
+# tests/test_partial_json.py
+# PartialJSONParser / FormStreamParser - 잘리거나 깨진 GPT 응답 처리
+
+import pytest
+
+from form_detection import FormStreamParser, parse_forms_response
+from partial_json import PartialJSONParser, loads_tolerant
+
+def feed_in_pieces(parser, text, size=3):
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+
+def test_complete_json_with_surrounding_text():
+    text = '분석 결과입니다:\n```json\n{"a": [1, 2], "b": "x"}\n```\n끝.'
+    assert loads_tolerant(text) == {"a": [1, 2], "b": "x"}
+
+def test_truncated_keeps_last_complete_item():
+    assert loads_tolerant('{"items": [{"n": 1}, {"n": 2}, {"n": 3') == {"items": [{"n": 1}, {"n": 2}]}
+    assert loads_tolerant('[1, 2, 3, "ab') == [1, 2, 3]
+
+def test_truncated_before_any_item_returns_empty_root():
+    assert loads_tolerant('{"items": [') == {}
+    assert loads_tolerant('[{"n": ') == []
+
+def test_no_json_raises():
+    with pytest.raises(ValueError):
+        loads_tolerant("서식을 찾지 못했습니다.")
+
+def test_comments_are_removed():
+    text = '{\n  "a": 1, // 첫 값\n  /* 여러 줄\n     주석 */ "b": 2\n}'
+    assert loads_tolerant(text) == {"a": 1, "b": 2}
+
+def test_slashes_inside_strings_are_kept():
+    text = '{"url": "https://example.com/a//b", "note": "/* 주석 아님 */"} // 끝'
+    assert loads_tolerant(text) == {"url": "https://example.com/a//b", "note": "/* 주석 아님 */"}
+
+def test_escaped_quote_inside_string():
+    assert loads_tolerant(r'{"t": "say \"hi\" // no"}') == {"t": 'say "hi" // no'}
+
+def test_trailing_commas_are_removed():
+    assert loads_tolerant('{"a": [1, 2, ], "b": {"c": 3,},}') == {"a": [1, 2], "b": {"c": 3}}
+
+def test_mismatched_bracket_closes_open_frame():
+    assert loads_tolerant('{"a": [1, 2}') == {"a": [1, 2]}
+    assert loads_tolerant('[{"a": 1]') == [{"a": 1}]
+
+def test_on_object_select_limits_parsing():
+    seen = []
+    parser = PartialJSONParser(
+        on_object=lambda obj, stack: seen.append(obj),
+        select=lambda stack: len(stack) == 2,
+    )
+    feed_in_pieces(parser, '{"list": [{"n": 1, "inner": {"x": 1}}, {"n": 2}]}')
+    assert seen == [{"n": 1, "inner": {"x": 1}}, {"n": 2}]
+    assert parser.done
+
+def test_form_stream_collects_forms_per_document():
+    text = (
+        '{"documents": [\n'
+        '  {"doc": "a.pdf", "forms": [{"title": "위임장", "page": 3}, {"title": "서약서", "page": "5"}]},\n'
+        '  {"doc": "b.pdf", "forms": [{"title": "확약서", "page": 2, "requires_input": false}]}\n'
+        ']}'
+    )
+    parser = FormStreamParser()
+    feed_in_pieces(parser, text)
+    results = parser.doc_results()
+    assert [r["doc"] for r in results] == ["a.pdf", "b.pdf"]
+    assert [f["page"] for f in results[0]["forms"]] == [3, 5]
+    assert results[0]["forms"][0]["filename"] == "3p_위임장.pdf"
+    assert results[1]["forms"][0]["requires_input"] is False
+
+def test_form_stream_doc_after_forms():
+    text = '{"documents": [{"forms": [{"title": "위임장", "page": 4}], "doc": "c.pdf"}]}'
+    assert parse_forms_response(text) == [{
+        "doc": "c.pdf",
+        "forms": [{"title": "위임장", "page": 4, "filename": "4p_위임장.pdf", "requires_input": True, "doc": "c.pdf"}],
+    }]
+
+def test_form_stream_truncated_and_invalid_items():
+    text = '{"documents": [{"doc": "a.pdf", "forms": [{"title": "x", "page": 0}, {"title": "위임장", "page": 7}, {"title": "잘'
+    parser = FormStreamParser()
+    parser.feed(text)
+    assert parser.rejected == 1
+    assert parser.doc_results() == [{"doc": "a.pdf", "forms": [
+        {"title": "위임장", "page": 7, "filename": "7p_위임장.pdf", "requires_input": True, "doc": "a.pdf"},
+    ]}]
+
+def test_form_stream_without_json():
+    assert parse_forms_response("해당 없음") is None